@@ -1,11 +1,12 @@
 """Main module"""
+import os
 import sys
 
 from PyQt6.QtCore import Qt
 from PyQt6.QtWidgets import QApplication
 
-from src.app import DoImageViewer
 from src.core.config import Config
+from src.core.instancia import InstanciaUnica
 
 
 def main() -> None:
@@ -18,8 +19,26 @@ def main() -> None:
     except IndexError:
         caminho_arquivo = ""
 
+    # a instância em execução pode estar em outro diretório de trabalho
+    if caminho_arquivo and os.path.exists(caminho_arquivo):
+        caminho_arquivo = os.path.abspath(caminho_arquivo)
+
     app = QApplication(sys.argv)
 
+    # com o programa já aberto, a imagem é exibida em uma nova janela do processo existente
+    instancia = InstanciaUnica()
+    if instancia.enviar(caminho_arquivo):
+        sys.exit(0)
+
+    # a interface só é importada quando esta é a primeira instância, a entrega do caminho acima não precisa dela
+    from src.app import DoImageViewer
+
+    instancia.escutar()
+    # noinspection PyUnresolvedReferences
+    instancia.abrir.connect(lambda caminho: DoImageViewer.abrir_janela(app, caminho))
+    # noinspection PyUnresolvedReferences
+    app.aboutToQuit.connect(instancia.encerrar)
+
     window = DoImageViewer(app, caminho_arquivo)
 
     if len(sys.argv) == 3:
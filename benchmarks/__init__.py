@@ -0,0 +1,18 @@
+"""
+Medições de desempenho, executadas à parte dos testes: python -m benchmarks.<módulo> [argumentos]
+"""
+from PIL import Image
+
+
+def foto_sintetica(largura: int, altura: int) -> Image.Image:
+    """
+    Fotografia sintética: gradientes suaves, ruído e áreas saturadas
+    :param largura: largura em pixels
+    :param altura: altura em pixels
+    :return: imagem RGB
+    """
+    return Image.merge('RGB', (
+        Image.linear_gradient('L').resize((largura, altura)),
+        Image.radial_gradient('L').resize((largura, altura)),
+        Image.effect_noise((largura, altura), 60)
+    ))
@@ -0,0 +1,47 @@
+"""
+Leitura de uma cor pelo amostrador comparada com a captura do widget: python -m benchmarks.amostragem
+"""
+import sys
+import time
+
+from PyQt6.QtCore import QRect
+from PyQt6.QtGui import QColor, QImage, QPixmap
+from PyQt6.QtWidgets import QApplication, QLabel
+
+from src.core.amostragem import AmostradorCor
+
+
+def main() -> None:
+    app = QApplication(sys.argv)
+
+    imagem = QImage(6000, 4000, QImage.Format.Format_RGB32)
+    imagem.fill(QColor(10, 20, 30))
+    amostrador = AmostradorCor(imagem)
+
+    widget = QLabel()
+    widget.setPixmap(QPixmap.fromImage(imagem).scaled(958, 640))
+    widget.resize(958, 640)
+
+    for descricao, funcao in (
+            ('widget inteiro (grab)', lambda: widget.grab().toImage().pixelColor(10, 10)),
+            ('1 pixel (grab)', lambda: widget.grab(QRect(10, 10, 1, 1)).toImage().pixelColor(0, 0)),
+            ('amostrador 1x1', lambda: amostrador.cor(500, 100)),
+            ('amostrador 9x9', lambda: amostrador.cor(500, 100, 9))
+    ):
+        inicio = time.perf_counter()
+        for _ in range(200):
+            funcao()
+        print(f'{descricao:<24}{(time.perf_counter() - inicio) * 1e6 / 200:>10.1f} µs')
+
+    # criar o amostrador não copia os pixels
+    exibida = QPixmap.fromImage(imagem).toImage()
+    inicio = time.perf_counter()
+    AmostradorCor(exibida)
+    print(f'{"criação do amostrador":<24}{(time.perf_counter() - inicio) * 1e6:>10.1f} µs '
+          f'({exibida.width()}x{exibida.height()})')
+
+    app.quit()
+
+
+if __name__ == '__main__':
+    main()
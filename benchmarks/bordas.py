@@ -0,0 +1,34 @@
+"""
+Detecção das margens em imagens grandes: python -m benchmarks.bordas
+"""
+import time
+
+from PIL import Image
+
+from src.core.bordas import detectar_bordas
+
+
+def gerar_scan(largura: int, altura: int) -> Image.Image:
+    # borda branca irregular: o conteúdo é deslocado para não passar pelo centro de nenhum lado
+    fundo = Image.new('RGB', (largura, altura), (250, 250, 250))
+    ruido = Image.effect_noise((largura // 2, altura // 3), 60).convert('RGB')
+    fundo.paste(ruido, (largura // 10, altura // 8))
+    marca = Image.new('RGB', (largura // 20, altura // 20), (20, 20, 20))
+    fundo.paste(marca, (largura - largura // 6, altura // 2))
+    return fundo
+
+
+def main() -> None:
+    for total in (12_000_000, 24_000_000, 50_000_000):
+        largura = int((total * 3 / 2) ** .5)
+        altura = total // largura
+        imagem = gerar_scan(largura, altura)
+
+        inicio = time.perf_counter()
+        caixa = detectar_bordas(imagem)
+        decorrido = time.perf_counter() - inicio
+        print(f'{largura}x{altura} ({total / 1e6:.0f} MP): {caixa} em {decorrido * 1000:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
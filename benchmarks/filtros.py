@@ -0,0 +1,53 @@
+"""
+Filtros pela tabela de cor comparados com o pilgram: python -m benchmarks.filtros [IMAGEM]
+Um filtro só vale a pena pela tabela quando o pilgram custa mais que uma passada dela (ver FILTROS_LUT)
+"""
+import sys
+import time
+
+import pilgram
+from PIL import Image
+
+from benchmarks import foto_sintetica
+from src.core.edicao import FILTROS, aplicar_filtro
+from src.core.filtros import FILTROS_LUT, TAMANHO_LUT, lut_filtro
+
+
+def medir(funcao, repeticoes: int = 3) -> float:
+    # menor tempo entre as repetições, em ms
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+
+    return min(tempos) * 1000
+
+
+def main(arquivo: str = None) -> None:
+    if arquivo:
+        with Image.open(arquivo) as original:
+            imagem = original.convert('RGB')
+    else:
+        imagem = foto_sintetica(4000, 3000)
+
+    # as tabelas e os gradientes são calculados antes das medições
+    for nome in FILTROS:
+        aplicar_filtro(imagem.resize((64, 48)), nome)
+        aplicar_filtro(imagem, nome)
+
+    passada = medir(lambda: imagem.filter(lut_filtro(FILTROS_LUT[0])))
+    print(f'{imagem.width}x{imagem.height} ({imagem.width * imagem.height / 1e6:.0f} MP), '
+          f'uma passada da tabela {TAMANHO_LUT}³: {passada:.0f} ms')
+    print(f'{"filtro":<11}{"via":<9}{"pilgram (ms)":>14}{"aplicado (ms)":>15}{"ganho":>8}')
+
+    for nome in FILTROS:
+        tempo_pilgram = medir(lambda: getattr(pilgram, nome)(imagem))
+        tempo_aplicado = medir(lambda: aplicar_filtro(imagem, nome))
+        via = 'tabela' if nome in FILTROS_LUT else 'pilgram'
+
+        print(f'{nome:<11}{via:<9}{tempo_pilgram:>14.0f}{tempo_aplicado:>15.0f}{tempo_pilgram / tempo_aplicado:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,40 @@
+"""
+Prévias dos filtros sobre a versão reduzida comparadas com os filtros na resolução total:
+python -m benchmarks.galeria IMAGEM
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from src.core.edicao import FILTROS, aplicar_filtro
+from src.core.galeria import TAMANHO_PREVIA, carregar_proxy
+from src.core.orientacao import orientacao_exif, orientar
+
+
+def main(arquivo: str) -> None:
+    inicio = time.perf_counter()
+    with Image.open(arquivo) as completa:
+        completa = orientar(completa, orientacao_exif(completa)).convert('RGB')
+    for nome_filtro in FILTROS:
+        aplicar_filtro(completa, nome_filtro)
+    tempo_completo = time.perf_counter() - inicio
+
+    # as tabelas de cor já foram calculadas acima, as duas medições comparam apenas decodificação e aplicação
+    inicio = time.perf_counter()
+    reduzida = carregar_proxy(arquivo, TAMANHO_PREVIA)
+    tempo_proxy = time.perf_counter() - inicio
+
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as executor:
+        list(executor.map(lambda nome_filtro: aplicar_filtro(reduzida, nome_filtro), FILTROS))
+    tempo_previas = time.perf_counter() - inicio
+
+    print(f'{completa.width}x{completa.height}: {len(FILTROS)} filtros na resolução total '
+          f'{tempo_completo * 1000:.0f} ms, prévias {reduzida.width}x{reduzida.height} {tempo_previas * 1000:.0f} ms '
+          f'(decodificação reduzida {tempo_proxy * 1000:.0f} ms)')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1])
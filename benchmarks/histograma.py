@@ -0,0 +1,44 @@
+"""
+Histogramas pelo NumPy e pelo Pillow e a estimativa sobre uma amostra: python -m benchmarks.histograma [IMAGEM]
+"""
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+from benchmarks import foto_sintetica
+from src.core.histograma import Estatisticas, estatisticas_qimage, histogramas, histogramas_pil
+from src.core.imagem import pil_para_qimage
+
+
+def main(arquivo: str = None) -> None:
+    if arquivo:
+        with Image.open(arquivo) as original:
+            imagem = original.convert('RGB')
+    else:
+        imagem = foto_sintetica(6000, 4000)
+
+    inicio = time.perf_counter()
+    histogramas_pil(imagem)
+    tempo_pillow = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    exato = Estatisticas(histogramas(np.asarray(imagem), (0, 1, 2)), True)
+    tempo_numpy = time.perf_counter() - inicio
+
+    qimage = pil_para_qimage(imagem)
+    inicio = time.perf_counter()
+    estimativa = estatisticas_qimage(qimage)
+    tempo_estimativa = time.perf_counter() - inicio
+
+    print(f'{imagem.width}x{imagem.height}: exato NumPy {tempo_numpy * 1000:.0f} ms, '
+          f'Pillow {tempo_pillow * 1000:.0f} ms, '
+          f'estimativa com {estimativa.pixels} pixels {tempo_estimativa * 1000:.1f} ms')
+    for linha_exata, linha_estimada in zip(exato.campos(), estimativa.campos()):
+        valores = zip(linha_exata[1:], linha_estimada[1:])
+        print(f'{linha_exata[0]:<12}', '  '.join(f'{valor:>6} ~{estimado:>6}' for valor, estimado in valores))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,45 @@
+"""
+Leitura dos metadados de um diretório, com e sem o cache: python -m benchmarks.metadados DIRETORIO
+"""
+import os
+import sys
+import time
+from datetime import datetime
+
+from PIL import Image
+
+from src.core.metadados import CacheMetadados
+
+
+def leitura_antiga(caminho: str) -> tuple:
+    # leitura feita antes do cache: cabeçalho e três consultas ao sistema de arquivos
+    largura, altura = Image.open(caminho).size
+    modificado = datetime.fromtimestamp(os.stat(caminho).st_ctime)
+    criado = datetime.fromtimestamp(os.stat(caminho).st_mtime)
+    return largura, altura, os.path.getsize(caminho), min(modificado, criado)
+
+
+def main(pasta: str) -> None:
+    pasta = pasta if pasta.endswith('/') else f'{pasta}/'
+    arquivos = [
+        nome for nome in sorted(os.listdir(pasta))
+        if nome.rsplit('.', 1)[-1].lower() in ('jpg', 'jpeg', 'png', 'bmp', 'tif', 'webp')
+    ]
+
+    cache = CacheMetadados()
+    for descricao, funcao in (
+            ('sem cache', leitura_antiga),
+            ('cache vazio', cache.obter),
+            ('cache preenchido', cache.obter)
+    ):
+        inicio = time.perf_counter()
+        for arquivo in arquivos:
+            funcao(f'{pasta}{arquivo}')
+        decorrido = time.perf_counter() - inicio
+        print(f'{descricao:<18}{len(arquivos):>6} imagens {decorrido * 1e6 / max(len(arquivos), 1):>10.1f} µs/imagem')
+
+    cache.encerrar()
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else '.')
@@ -0,0 +1,77 @@
+"""
+Ordenação da lista de imagens: python -m benchmarks.ordenacao
+As chaves são calculadas antes e apenas o 'sort' é medido. A quantidade de comparações mostra o O(n log n); o tempo
+por comparação só cresce quando as chaves deixam de caber no cache do processador
+"""
+import gc
+import math
+import random
+import time
+from types import SimpleNamespace
+
+from src.core.ordenacao import MODIFICACAO, NATURAL, TAMANHO, funcao_chave
+
+TAMANHOS = (1_000, 4_000, 16_000, 64_000, 256_000)
+
+
+class Comparavel:
+    # conta as comparações feitas pelo 'sort', em uma execução separada da medição do tempo
+    __slots__ = ('valor',)
+    comparacoes = 0
+
+    def __init__(self, valor) -> None:
+        self.valor = valor
+
+    def __lt__(self, outro: 'Comparavel') -> bool:
+        Comparavel.comparacoes += 1
+        return self.valor < outro.valor
+
+
+def gerar(quantidade: int) -> dict:
+    prefixos = ['IMG_', 'DSC', 'scan-', 'Foto ', '']
+    stats = {}
+    for i in range(quantidade):
+        nome = f'{random.choice(prefixos)}{random.randint(0, quantidade * 10)}_{i}.{random.choice(["jpg", "JPEG"])}'
+        stats[nome] = SimpleNamespace(st_size=random.randint(1, 10 ** 8), st_mtime_ns=random.randint(0, 10 ** 18))
+    return stats
+
+
+def medir(pares: list, repeticoes: int = 5) -> float:
+    # menor tempo entre as repetições, sem o coletor de lixo
+    tempos = []
+    gc.disable()
+    try:
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            sorted(pares)
+            tempos.append(time.perf_counter() - inicio)
+    finally:
+        gc.enable()
+
+    return min(tempos)
+
+
+def main() -> None:
+    random.seed(0)
+
+    print(f'{"ordem":<12}{"n":>8}{"tempo (ms)":>12}{"comparações":>13}{"comp. / (n log n)":>19}'
+          f'{"ns / comp.":>12}{"ns / (n log n)":>16}')
+    for total in TAMANHOS:
+        dados = gerar(total)
+        n_log_n = total * math.log2(total)
+
+        for ordem in (NATURAL, MODIFICACAO, TAMANHO):
+            chave = funcao_chave(ordem, '')
+            pares = [(chave(nome, stat), nome) for nome, stat in dados.items()]
+
+            decorrido = medir(pares)
+            Comparavel.comparacoes = 0
+            sorted(Comparavel(par) for par in pares)
+            comparacoes = Comparavel.comparacoes
+
+            print(f'{ordem:<12}{total:>8}{decorrido * 1000:>12.2f}{comparacoes:>13}{comparacoes / n_log_n:>19.3f}'
+                  f'{decorrido * 1e9 / comparacoes:>12.1f}{decorrido * 1e9 / n_log_n:>16.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,26 +1,35 @@
+import math
 import os
-import platform
 import random
 from dataclasses import dataclass
-from datetime import datetime
-from math import floor
 from pathlib import Path
 from subprocess import Popen
-from threading import Timer
-from urllib.error import HTTPError
-from urllib.request import urlretrieve
-
-import pilgram
-from PIL import Image, ImageEnhance
-from PyQt6.QtCore import QDir, Qt, QSize, QEvent, QPoint
-from PyQt6.QtGui import QIcon, QPixmap, QCursor, QAction
+from typing import Callable
+
+from PIL import Image
+from PyQt6.QtCore import QDir, Qt, QSize, QEvent, QPoint, QTimer, pyqtSignal
+from PyQt6.QtGui import QIcon, QPixmap, QCursor, QAction, QImage, QActionGroup
 from PyQt6.QtWidgets import QMainWindow, QMenu, QLabel, QHBoxLayout, QWidget, QFileDialog, QApplication, QToolBar, \
-    QSizePolicy, QMessageBox
+    QSizePolicy, QMessageBox, QDockWidget
 
+from src.core.apresentacao import ApresentacaoSlides
+from src.core.cache import PrefetchImagens, CacheImagens
+from src.core.carregador import CarregadorImagens
 from src.core.config import Config
-from src.core.widgets import ImageViewer, QLabelClick, SobreDialog
-
-from showinfm import show_in_file_manager
+from src.core.diretorio import IndiceDiretorio, ObservadorDiretorio
+from src.core.edicao import FonteEdicao, PilhaEdicao, FILTROS, FILTRO, COR, NITIDEZ, RECORTE, FATOR_MINIMO, \
+    FATOR_MAXIMO
+from src.core.galeria import GeradorPrevias
+from src.core.histograma import CalculadoraEstatisticas, Estatisticas
+from src.core.imagem import carregar_qimage, carregar_qimage_reduzida, tamanho_original, pil_para_qimage
+from src.core.memoria import GerenciadorMemoria, MB
+from src.core.metadados import CacheMetadados
+from src.core.ordenacao import NATURAL, NOMES_ORDENS
+from src.core.orientacao import compor, gravar_orientacao_jpeg, orientacao_exif
+from src.core.rede import CarregadorUrl
+from src.core.renderizacao import RenderizadorEdicao
+from src.core.widgets import ImageViewer, QLabelClick, SobreDialog, GeradorMiniaturas, FaixaMiniaturas, \
+    PainelInformacoes, SobreposicaoMemoria, GaleriaFiltros, PainelAjustes, PainelHistograma
 
 
 @dataclass
@@ -32,10 +41,21 @@ class Theme:
 
 
 class DoImageViewer(QMainWindow):
+    # emitido quando os menus e a barra de ferramentas terminam de ser montados, após a primeira imagem
+    interface_pronta = pyqtSignal()
+
+    # limite para montar a interface quando nenhuma imagem é exibida (ex: inicialização sem arquivo)
+    ATRASO_INTERFACE = 500
+
     __RESOURCES = os.getcwd() + "/src/res/"
     __CAMINHO_HOME = f'{str(Path.home())}/.DoImageViewer/'
     __VERSAO = 'v1.6.0'
     __LISTA_EXTENSOES = ['jpg', 'jpeg', 'png', 'bmp', 'tif', 'webp']
+    __EXTENSOES_JPEG = ('.jpg', '.jpeg', '.jpe', '.jfif')
+    __LADOS_AMOSTRA = (1, 3, 5, 9, 15)
+
+    # janelas abertas no processo, que compartilham os caches de imagens e de miniaturas
+    __janelas = []
 
     # noinspection PyUnresolvedReferences
     def __init__(self, app: QApplication, caminho: str = ""):
@@ -52,8 +72,12 @@ class DoImageViewer(QMainWindow):
 
         antialiasing = config.get_config_boolean('editor', 'antialiasing')
 
-        # widget da aplicação
-        app.aboutToQuit.connect(self.on_exit)
+        # widget da aplicação. A primeira janela registra o encerramento dos recursos compartilhados
+        if not DoImageViewer.__janelas:
+            app.aboutToQuit.connect(DoImageViewer.__encerrar_aplicacao)
+        DoImageViewer.__janelas.append(self)
+        self.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        self.__encerrada = False
         self.__app = app
 
         # configurações da tela
@@ -61,7 +85,7 @@ class DoImageViewer(QMainWindow):
             "QMainWindow {background-color: " + Theme.color_primary +
             ";color: " + Theme.color_text + ";}"
         )
-        self.setWindowIcon(QIcon(QPixmap(self.__RESOURCES + 'image-svgrepo-com.svg')))
+        self.setWindowIcon(QIcon(self.__RESOURCES + 'image-svgrepo-com.svg'))
         self.setWindowTitle(f"Do Image Viewer {self.__VERSAO}")
         self.setAutoFillBackground(True)
 
@@ -78,8 +102,17 @@ class DoImageViewer(QMainWindow):
             self.move(QPoint(int(tela.width() / 2), int(tela.height() / 2)))
 
         # variáveis de controle
+        # limite de memória das imagens decodificadas, compartilhado por todas as janelas. 0 usa o limite automático
+        limite_memoria = int(config.get_config('memoria', 'limite_mb', '0') or 0)
+        if limite_memoria > 0:
+            GerenciadorMemoria.compartilhado().limite = limite_memoria * MB
+
         self.__viewer = ImageViewer(parent=self, antialiasing=antialiasing)
-        # self.__caminho = self.__processar_caminho(caminho)
+        self.__viewer.definir_amostragem(
+            int(config.get_config('editor', 'amostra_cor', '1')), config.get_config_boolean('editor', 'cor_cursor')
+        )
+        self.__viewer.cor_cursor.connect(self.__exibir_cor_cursor)
+        self.__sobreposicao_memoria = SobreposicaoMemoria(self.__viewer)
         self.__diretorio_tool_bar = QToolBar("Diretorio", self)
         self.__diretorio_tool_bar.setVisible(config.get_config_boolean('editor', 'toolbar_diretorio'))
         self.tamanho_icones = QSize(24, 24)
@@ -87,10 +120,125 @@ class DoImageViewer(QMainWindow):
         # Variaveis de edição de imagem
         self.__enhance = 1.0
         self.__nitidez = 1.0
+        self.__fonte_edicao = FonteEdicao()
+        self.__pilha_edicao = PilhaEdicao()
+
+        # a resolução total das edições é calculada em segundo plano, apenas ao gravar ou quando o zoom exige
+        self.__renderizador = RenderizadorEdicao(self.__fonte_edicao, self)
+        self.__renderizador.concluida.connect(self.__renderizacao_concluida)
+        self.__renderizador.falhou.connect(lambda _, mensagem: self.setStatusTip(mensagem))
+        self.__apos_renderizacao = None
+
+        # os valores dos controles de ajuste são agrupados: apenas o último é exibido a cada quadro
+        self.__ajuste_pendente = None
+        self.__timer_ajuste = QTimer(self)
+        self.__timer_ajuste.setSingleShot(True)
+        self.__timer_ajuste.setInterval(0)
+        self.__timer_ajuste.timeout.connect(self.__aplicar_ajuste)
+
+        # pré-carregamento das imagens vizinhas e carregamento assíncrono
+        self.__info_dir = {"path": "", "indice": 0, "lista": []}
+        self.__prefetch = PrefetchImagens(cache=CacheImagens.compartilhado(PrefetchImagens.LIMITE_BYTES))
+        self.__carregador = CarregadorImagens(self.__LISTA_EXTENSOES, self.__prefetch, self)
+        self.__carregador.progresso.connect(self.__exibir_progresso)
+        self.__carregador.previa.connect(self.__exibir_previa)
+        self.__carregador.carregado.connect(self.__imagem_carregada)
+        self.__carregador.falhou.connect(self.__exibir_falha)
+        self.__previa_pedido = 0
+
+        # download das urls em segundo plano, com prévias parciais da imagem enquanto os dados chegam
+        self.__carregador_url = CarregadorUrl(self.__CAMINHO_HOME, self)
+        self.__carregador_url.progresso.connect(self.__exibir_progresso_url)
+        self.__carregador_url.parcial.connect(self.__exibir_parcial_url)
+        self.__carregador_url.concluido.connect(self.__url_concluida)
+        self.__carregador_url.falhou.connect(self.__exibir_falha_url)
+        self.__parcial_pedido = 0
+        self.__observador = ObservadorDiretorio(self)
+        self.__observador.alterado.connect(self.__diretorio_alterado)
+        self.__viewer.resolucao_insuficiente.connect(self.__carregar_resolucao_total)
+        self.__aplicar_resolucao_tela(config.get_config_boolean('editor', 'resolucao_tela'))
+        self.__carregador.ordem = config.get_config('editor', 'ordenacao', NATURAL)
+
+        # miniaturas do diretório, geradas em segundo plano e guardadas em disco
+        self.__gerador_miniaturas = GeradorMiniaturas.compartilhado()
+        self.__faixa_miniaturas = FaixaMiniaturas(self.__gerador_miniaturas, Theme, self)
+        self.__faixa_miniaturas.selecionada.connect(self.__exibir_indice)
+        self.__dock_miniaturas = QDockWidget("Miniaturas", self)
+        self.__dock_miniaturas.setWidget(self.__faixa_miniaturas)
+        self.__dock_miniaturas.setFeatures(
+            QDockWidget.DockWidgetFeature.DockWidgetMovable | QDockWidget.DockWidgetFeature.DockWidgetClosable
+        )
+        self.__dock_miniaturas.dockLocationChanged.connect(self.__posicionar_miniaturas)
+        self.__dock_miniaturas.visibilityChanged.connect(lambda visivel: visivel and self.__atualizar_miniaturas())
+        self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self.__dock_miniaturas)
+        self.__dock_miniaturas.setVisible(config.get_config_boolean('editor', 'miniaturas'))
+
+        # painel com as dimensões e o EXIF da imagem, lidos do cache de metadados
+        self.__painel_informacoes = PainelInformacoes(Theme, self)
+        self.__dock_informacoes = QDockWidget("Informações", self)
+        self.__dock_informacoes.setWidget(self.__painel_informacoes)
+        self.__dock_informacoes.setFeatures(
+            QDockWidget.DockWidgetFeature.DockWidgetMovable | QDockWidget.DockWidgetFeature.DockWidgetClosable
+        )
+        self.__dock_informacoes.visibilityChanged.connect(lambda visivel: visivel and self.__carregar_info())
+        self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, self.__dock_informacoes)
+        self.__dock_informacoes.setVisible(config.get_config_boolean('editor', 'informacoes'))
+
+        # prévias de todos os filtros sobre uma versão reduzida da imagem, geradas em paralelo com o painel visível
+        self.__gerador_previas = GeradorPrevias(parent=self)
+        self.__gerador_previas.pronta.connect(self.__exibir_previa_filtro)
+        self.__galeria_filtros = GaleriaFiltros(Theme, self)
+        self.__galeria_filtros.selecionado.connect(self.__adicionar_filtro)
+        self.__dock_filtros = QDockWidget("Filtros", self)
+        self.__dock_filtros.setWidget(self.__galeria_filtros)
+        self.__dock_filtros.setFeatures(
+            QDockWidget.DockWidgetFeature.DockWidgetMovable | QDockWidget.DockWidgetFeature.DockWidgetClosable
+        )
+        self.__dock_filtros.visibilityChanged.connect(lambda visivel: visivel and self.__atualizar_galeria())
+        self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, self.__dock_filtros)
+        self.__dock_filtros.setVisible(config.get_config_boolean('editor', 'filtros'))
+
+        # controles contínuos de cor e nitidez, exibidos sobre uma versão reduzida do tamanho do zoom
+        self.__painel_ajustes = PainelAjustes(
+            ((COR, "Cor"), (NITIDEZ, "Nitidez")), FATOR_MINIMO, FATOR_MAXIMO, Theme, self
+        )
+        self.__painel_ajustes.alterado.connect(self.__ajuste_alterado)
+        self.__painel_ajustes.confirmado.connect(self.__ajuste_confirmado)
+        self.__dock_ajustes = QDockWidget("Ajustes", self)
+        self.__dock_ajustes.setWidget(self.__painel_ajustes)
+        self.__dock_ajustes.setFeatures(
+            QDockWidget.DockWidgetFeature.DockWidgetMovable | QDockWidget.DockWidgetFeature.DockWidgetClosable
+        )
+        self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, self.__dock_ajustes)
+        self.__dock_ajustes.setVisible(config.get_config_boolean('editor', 'ajustes'))
+
+        # histogramas e estatísticas: estimativa pela imagem exibida e valores exatos calculados em segundo plano
+        self.__calculadora_estatisticas = CalculadoraEstatisticas(self.__fonte_edicao, self)
+        self.__calculadora_estatisticas.calculadas.connect(self.__estatisticas_calculadas)
+        self.__refinar_histograma = True
+        self.__timer_histograma = QTimer(self)
+        self.__timer_histograma.setSingleShot(True)
+        self.__timer_histograma.setInterval(100)
+        self.__timer_histograma.timeout.connect(self.__atualizar_histograma)
+        self.__painel_histograma = PainelHistograma(Theme, self)
+        self.__dock_histograma = QDockWidget("Histograma", self)
+        self.__dock_histograma.setWidget(self.__painel_histograma)
+        self.__dock_histograma.setFeatures(
+            QDockWidget.DockWidgetFeature.DockWidgetMovable | QDockWidget.DockWidgetFeature.DockWidgetClosable
+        )
+        self.__dock_histograma.visibilityChanged.connect(lambda visivel: visivel and self.__agendar_histograma())
+        self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, self.__dock_histograma)
+        self.__dock_histograma.setVisible(config.get_config_boolean('editor', 'histograma'))
 
-        # timer da apresentação de slides
-        self.__timer_interval = 3.5
-        self.__timer = Timer(self.__timer_interval, self.__slide_show)
+        # apresentação de slides, avançando apenas quando o próximo slide já está decodificado
+        self.__apresentacao = ApresentacaoSlides(
+            lambda i: self.__prefetch.pronto(f'{self.__info_dir["path"]}{self.__info_dir["lista"][i]}'), self
+        )
+        self.__apresentacao.avancar.connect(self.__exibir_indice)
+        self.__apresentacao.encerrada.connect(lambda: self.setStatusTip("Apresentação de slides encerrada"))
+        self.__apresentacao.intervalo = int(float(config.get_config('apresentacao', 'intervalo', '3.5')) * 1000)
+        self.__apresentacao.aleatorio = config.get_config_boolean('apresentacao', 'aleatorio')
+        self.__apresentacao.repetir = config.get_config_boolean('apresentacao', 'repetir', True)
 
         # labels
         self.label_tamanho = QLabel("")
@@ -105,6 +253,8 @@ class DoImageViewer(QMainWindow):
         self.label_cor_nome.clicked.connect(lambda: self.__copiar_cor_para_transferencia())
         self.label_cor_nome.setCursor(QCursor(Qt.CursorShape.PointingHandCursor))
 
+        self.label_cor_cursor = QLabel("")
+
         self.__label_diretorio = QLabelClick()
 
         # configuração do layout principal
@@ -116,19 +266,19 @@ class DoImageViewer(QMainWindow):
         self.setCentralWidget(self.__centralWidget)
         self.__centralWidget.setLayout(self.__layout_principal)
 
-        # configuração da interface
+        # configuração da interface. Os menus e a barra de ferramentas são apenas reservados aqui e montados
+        # depois que a primeira imagem é exibida
+        self.__interface_concluida = False
         self.__configurar_gui()
-        self.__configurar_menu()
-        self.__configurar_tool_bar()
+        self.__criar_acoes_edicao()
+        self.__configurar_barra_menu()
         self.__configurar_status_bar()
+        self.addToolBar(Qt.ToolBarArea.BottomToolBarArea, self.__diretorio_tool_bar)
 
-        # Verifica se é url
-        if caminho.find("http") != -1:
-            self.__carregar_imagem(self.__processar_url(caminho))
-        else:
-            self.__carregar_imagem(caminho)
+        self.__carregar_imagem(caminho)
 
         self.setWindowTitle(f"Do Image Viewer {self.__VERSAO}")
+        QTimer.singleShot(0 if not caminho else self.ATRASO_INTERFACE, self.__concluir_interface)
 
     def changeEvent(self, event):
         if event.type() == QEvent.Type.WindowStateChange:
@@ -149,53 +299,79 @@ class DoImageViewer(QMainWindow):
             event.ignore()
 
     def dropEvent(self, event):
-        files = [u.toLocalFile() for u in event.mimeData().urls()]
+        files = [u.toLocalFile() if u.isLocalFile() else u.toString() for u in event.mimeData().urls()]
 
         if files:
             self.__carregar_imagem(files[0])
 
-    def on_exit(self):
-        self.cancelar_timer()
+    def closeEvent(self, event):
+        self.__salvar_janela()
+        self.on_exit()
+        super().closeEvent(event)
+
+    @classmethod
+    def abrir_janela(cls, app: QApplication, caminho: str = "") -> 'DoImageViewer':
+        """
+        Abre uma nova janela no mesmo processo
+        :param app: aplicação
+        :param caminho: imagem, diretório ou url a ser exibido
+        :return: DoImageViewer
+        """
+        janela = cls(app, caminho)
+        janela.show()
+        janela.raise_()
+        janela.activateWindow()
+        return janela
 
-        lista_imagens_raw = [x for x in os.listdir(self.__CAMINHO_HOME) if x.find('.') != -1]
-        lista_imagens_remover = [x for x in lista_imagens_raw if x.split('.')[1] in self.__LISTA_EXTENSOES]
+    def on_exit(self):
+        # encerra apenas os recursos da janela, os compartilhados são encerrados com a aplicação
+        if self.__encerrada:
+            return
 
-        for item in lista_imagens_remover:
-            os.remove(f'{self.__CAMINHO_HOME}/{item}')
+        self.__encerrada = True
+        self.cancelar_timer()
+        self.__carregador.encerrar()
+        self.__carregador_url.encerrar()
+        self.__gerador_previas.encerrar()
+        self.__renderizador.encerrar()
+        self.__calculadora_estatisticas.encerrar()
+        self.__prefetch.encerrar()
+        self.__observador.encerrar()
+        self.__viewer.encerrar()
+
+        if self in DoImageViewer.__janelas:
+            DoImageViewer.__janelas.remove(self)
 
-        try:
-            screen = QApplication.screenAt(QApplication.activeWindow().pos())
+    @staticmethod
+    def __encerrar_aplicacao():
+        ativa = QApplication.activeWindow()
+        for janela in list(DoImageViewer.__janelas):
+            if janela is ativa:
+                janela.__salvar_janela()
+            janela.on_exit()
 
-            Config().set_config('window', 'nome', screen.name())
+        GeradorMiniaturas.compartilhado().encerrar()
+        CacheMetadados.compartilhado().encerrar()
 
-            Config().set_config(
-                'window', 'tamanho',
-                f'{QApplication.activeWindow().size().width()},{QApplication.activeWindow().size().height()}'
-            )
+        caminho_home = DoImageViewer.__CAMINHO_HOME
+        lista_imagens_raw = [x for x in os.listdir(caminho_home) if x.find('.') != -1]
+        lista_imagens_remover = [x for x in lista_imagens_raw if x.split('.')[1] in DoImageViewer.__LISTA_EXTENSOES]
 
-            Config().set_config(
-                'window', 'posicao',
-                f'{QApplication.activeWindow().pos().x()},{QApplication.activeWindow().pos().y()}'
-            )
-        except AttributeError:
-            pass
+        for item in lista_imagens_remover:
+            os.remove(f'{caminho_home}/{item}')
 
-    def __processar_url(self, url: str) -> str:
-        formato = None
-        caminho = Path.home()
+        # grava as alterações pendentes das configurações
+        Config.salvar()
 
-        for item in self.__LISTA_EXTENSOES:
-            if url.find(item) != -1:
-                formato = item
+    def __salvar_janela(self):
+        screen = QApplication.screenAt(self.pos())
+        config = Config()
 
-        if formato is not None:
-            caminho = f'{self.__CAMINHO_HOME}/tmp.{formato}'
-            try:
-                urlretrieve(url, caminho)
-            except HTTPError:
-                pass
+        if screen is not None:
+            config.set_config('window', 'nome', screen.name())
 
-        return caminho
+        config.set_config('window', 'tamanho', f'{self.size().width()},{self.size().height()}')
+        config.set_config('window', 'posicao', f'{self.pos().x()},{self.pos().y()}')
 
     def __configurar_gui(self):
 
@@ -217,13 +393,82 @@ class DoImageViewer(QMainWindow):
         self.__layout_principal.addWidget(self.__viewer, 1)
         self.__layout_principal.addWidget(self.label_right)
 
+    def __concluir_interface(self):
+        if self.__interface_concluida:
+            return
+
+        self.__interface_concluida = True
+        self.__configurar_menu()
+        self.__configurar_tool_bar()
+
+        # noinspection PyUnresolvedReferences
+        self.interface_pronta.emit()
+
+    def __agendar_interface(self):
+        # a interface é concluída na próxima volta do loop de eventos, depois que a imagem for desenhada
+        if not self.__interface_concluida:
+            QTimer.singleShot(0, self.__concluir_interface)
+
+    @staticmethod
+    def __estilo_menu() -> str:
+        return "QMenu {background-color:" + Theme.color_secondary + \
+            ";}QMenu::item{color:" + Theme.color_text + \
+            ";}QMenu::item:selected {background-color: " + Theme.color_accent + \
+            ";color:" + Theme.color_text + ";}"
+
+    @staticmethod
+    def __preencher_ao_exibir(menu: QMenu, preencher) -> None:
+        # o conteúdo do submenu só é criado na primeira vez que ele é aberto
+        def exibir():
+            menu.aboutToShow.disconnect(exibir)
+            preencher(menu)
+
+        # noinspection PyUnresolvedReferences
+        menu.aboutToShow.connect(exibir)
+
+    def __configurar_barra_menu(self):
+        # apenas os menus principais, vazios, para que a janela não mude de tamanho ao montar os menus
+        self.menuBar().setStyleSheet(
+            f"background-color: {Theme.color_secondary}; color: {Theme.color_text}; padding: 2px;"
+        )
+        self.menuBar().setAutoFillBackground(True)
+
+        self.__menus = {}
+        for nome in ("&Arquivo", "&Editar", "&Visualizar", "&Imagem", "&Ajuda"):
+            menu = QMenu(nome, self)
+            menu.setStyleSheet(self.__estilo_menu())
+            self.menuBar().addMenu(menu)
+            self.__menus[nome] = menu
+
+    # noinspection PyUnresolvedReferences
+    def __criar_acoes_edicao(self):
+        # ações com estado alterado durante a exibição das imagens, criadas antes dos menus
+        self.__corrigir_iluminacao_add = QAction("Aumentar iluminação", self)
+        self.__corrigir_iluminacao_add.triggered.connect(lambda: self.__corrigir_iluminacao(1))
+
+        self.__corrigir_iluminacao_rmv = QAction("Diminuir iluminação", self)
+        self.__corrigir_iluminacao_rmv.triggered.connect(lambda: self.__corrigir_iluminacao(2))
+
+        self.__corrigir_nitidez_add = QAction("Aumentar nitidez")
+        self.__corrigir_nitidez_add.triggered.connect(lambda: self.__corrigir_nitidez(1))
+
+        self.__corrigir_nitidez_rmv = QAction("Diminuir nitidez")
+        self.__corrigir_nitidez_rmv.triggered.connect(lambda: self.__corrigir_nitidez(2))
+
+        self.__usar_antialiasing = QAction("Suavizar imagem", self)
+        self.__usar_antialiasing.setCheckable(True)
+        self.__usar_antialiasing.setChecked(Config().get_config_boolean('editor', 'antialiasing'))
+        self.__usar_antialiasing.triggered.connect(lambda: self.__mudar_antialiasing())
+
+        self.__usar_resolucao_tela = QAction("Decodificar na resolução da tela", self)
+        self.__usar_resolucao_tela.setCheckable(True)
+        self.__usar_resolucao_tela.setChecked(Config().get_config_boolean('editor', 'resolucao_tela'))
+        self.__usar_resolucao_tela.triggered.connect(lambda: self.__mudar_resolucao_tela())
+
     # noinspection PyUnresolvedReferences
     def __configurar_menu(self):
         # Style
-        stylesheet = "QMenu {background-color:" + Theme.color_secondary + \
-                     ";}QMenu::item{color:" + Theme.color_text + \
-                     ";}QMenu::item:selected {background-color: " + Theme.color_accent + \
-                     ";color:" + Theme.color_text + ";}"
+        stylesheet = self.__estilo_menu()
 
         # MENU ARQUIVO
         abrir_foto = QAction("&Abrir", self)
@@ -251,7 +496,7 @@ class DoImageViewer(QMainWindow):
 
         menu_abrir_janela = QAction("Nova janela", self)
         menu_abrir_janela.setShortcut("Ctrl+N")
-        menu_abrir_janela.triggered.connect(self.__abrir_nova_janela)
+        menu_abrir_janela.triggered.connect(lambda: self.__abrir_nova_janela())
 
         menu_abrir_em_janela = QAction("&Abrir em nova janela", self)
         menu_abrir_em_janela.setShortcut("Ctrl+Shift+O")
@@ -271,10 +516,10 @@ class DoImageViewer(QMainWindow):
 
         sair = QAction("Sair", self)
         sair.setShortcut("Esc")
-        sair.triggered.connect(lambda: self.__app.exit(0))
+        # fecha apenas esta janela, a aplicação termina quando a última é fechada
+        sair.triggered.connect(self.close)
 
-        menu_arquivo = QMenu("&Arquivo", self)
-        menu_arquivo.setStyleSheet(stylesheet)
+        menu_arquivo = self.__menus["&Arquivo"]
         menu_arquivo.addAction(abrir_foto)
         menu_arquivo.addAction(menu_abrir_em_janela)
         menu_arquivo.addSeparator()
@@ -292,36 +537,6 @@ class DoImageViewer(QMainWindow):
         filtro_original.setShortcut("Ctrl+G")
         filtro_original.triggered.connect(lambda: self.__adicionar_filtro(0))
 
-        filtro_aden = QAction("Aden", self)
-        filtro_aden.triggered.connect(lambda: self.__adicionar_filtro(1))
-
-        filtro_clarendon = QAction("Clarendon", self)
-        filtro_clarendon.triggered.connect(lambda: self.__adicionar_filtro(2))
-
-        filtro_earlybird = QAction("Earlybird ", self)
-        filtro_earlybird.triggered.connect(lambda: self.__adicionar_filtro(3))
-
-        filtro_hudson = QAction("Hudson", self)
-        filtro_hudson.triggered.connect(lambda: self.__adicionar_filtro(4))
-
-        filtro_lark = QAction("Lark", self)
-        filtro_lark.triggered.connect(lambda: self.__adicionar_filtro(5))
-
-        filtro_lofi = QAction("Lofi", self)
-        filtro_lofi.triggered.connect(lambda: self.__adicionar_filtro(6))
-
-        filtro_maven = QAction("Maven", self)
-        filtro_maven.triggered.connect(lambda: self.__adicionar_filtro(7))
-
-        filtro_reyes = QAction("Reyes", self)
-        filtro_reyes.triggered.connect(lambda: self.__adicionar_filtro(8))
-
-        filtro_valencia = QAction("Valencia", self)
-        filtro_valencia.triggered.connect(lambda: self.__adicionar_filtro(9))
-
-        filtro_walden = QAction("Walden", self)
-        filtro_walden.triggered.connect(lambda: self.__adicionar_filtro(10))
-
         filtro_aleatorio = QAction("Filtro aleatório", self)
         filtro_aleatorio.setShortcut("Ctrl+F")
         filtro_aleatorio.setIcon(QIcon(self.__RESOURCES + 'flip-svgrepo-com'))
@@ -329,35 +544,27 @@ class DoImageViewer(QMainWindow):
 
         menu_filtros = QMenu("&Filtros", self)
         menu_filtros.setStyleSheet(stylesheet)
+        self.__preencher_ao_exibir(menu_filtros, self.__preencher_filtros)
+
+        exibir_ajustes = self.__dock_ajustes.toggleViewAction()
+        exibir_ajustes.setText("Ajustes de cor e nitidez")
+        exibir_ajustes.setShortcut("Ctrl+Shift+A")
+        exibir_ajustes.triggered.connect(
+            lambda ativo: Config().set_config('editor', 'ajustes', str(ativo))
+        )
 
-        menu_filtros.addAction(filtro_aden)
-        menu_filtros.addAction(filtro_clarendon)
-        menu_filtros.addAction(filtro_earlybird)
-        menu_filtros.addAction(filtro_hudson)
-        menu_filtros.addAction(filtro_lark)
-        menu_filtros.addAction(filtro_lofi)
-        menu_filtros.addAction(filtro_maven)
-        menu_filtros.addAction(filtro_reyes)
-        menu_filtros.addAction(filtro_valencia)
-        menu_filtros.addAction(filtro_walden)
+        exibir_filtros = self.__dock_filtros.toggleViewAction()
+        exibir_filtros.setText("Comparar filtros")
+        exibir_filtros.setShortcut("Ctrl+Shift+G")
+        exibir_filtros.triggered.connect(
+            lambda ativo: Config().set_config('editor', 'filtros', str(ativo))
+        )
 
         # MENU EDITAR
         corrigir_iluminacao = QAction("Corrigir iluminação", self)
         corrigir_iluminacao.setIcon(QIcon(self.__RESOURCES + 'brightness-half-svgrepo-com'))
         corrigir_iluminacao.triggered.connect(lambda: self.__corrigir_iluminacao(0))
 
-        self.__corrigir_iluminacao_add = QAction("Aumentar iluminação", self)
-        self.__corrigir_iluminacao_add.triggered.connect(lambda: self.__corrigir_iluminacao(1))
-
-        self.__corrigir_iluminacao_rmv = QAction("Diminuir iluminação", self)
-        self.__corrigir_iluminacao_rmv.triggered.connect(lambda: self.__corrigir_iluminacao(2))
-
-        self.__corrigir_nitidez_add = QAction("Aumentar nitidez")
-        self.__corrigir_nitidez_add.triggered.connect(lambda: self.__corrigir_nitidez(1))
-
-        self.__corrigir_nitidez_rmv = QAction("Diminuir nitidez")
-        self.__corrigir_nitidez_rmv.triggered.connect(lambda: self.__corrigir_nitidez(2))
-
         crop_imagem = QAction("Recortar margens", self)
         crop_imagem.setShortcut("Ctrl+x")
         crop_imagem.setIcon(QIcon(self.__RESOURCES + 'crop-svgrepo-com.svg'))
@@ -368,8 +575,16 @@ class DoImageViewer(QMainWindow):
         color_picker.setIcon(QIcon(self.__RESOURCES + 'color-picker-svgrepo-com.svg'))
         color_picker.triggered.connect(lambda: self.exibir_cor_selecionada(self.__viewer.get_posicao_mouse()))
 
-        menu_editar = QMenu("&Editar", self)
-        menu_editar.setStyleSheet(stylesheet)
+        menu_amostra = QMenu("Área da seleção de cores", self)
+        menu_amostra.setStyleSheet(stylesheet)
+        self.__preencher_ao_exibir(menu_amostra, self.__preencher_amostra)
+
+        cor_cursor = QAction("Exibir cor sob o cursor", self)
+        cor_cursor.setCheckable(True)
+        cor_cursor.setChecked(Config().get_config_boolean('editor', 'cor_cursor'))
+        cor_cursor.triggered.connect(self.__mudar_cor_cursor)
+
+        menu_editar = self.__menus["&Editar"]
         menu_editar.addAction(corrigir_iluminacao)
         menu_editar.addSeparator()
         menu_editar.addAction(self.__corrigir_iluminacao_add)
@@ -377,13 +592,17 @@ class DoImageViewer(QMainWindow):
         menu_editar.addSeparator()
         menu_editar.addAction(self.__corrigir_nitidez_add)
         menu_editar.addAction(self.__corrigir_nitidez_rmv)
+        menu_editar.addAction(exibir_ajustes)
         menu_editar.addSeparator()
         menu_editar.addMenu(menu_filtros)
         menu_editar.addAction(filtro_aleatorio)
+        menu_editar.addAction(exibir_filtros)
         menu_editar.addSeparator()
         menu_editar.addAction(crop_imagem)
         menu_editar.addSeparator()
         menu_editar.addAction(color_picker)
+        menu_editar.addMenu(menu_amostra)
+        menu_editar.addAction(cor_cursor)
         menu_editar.addSeparator()
         menu_editar.addAction(filtro_original)
 
@@ -406,6 +625,33 @@ class DoImageViewer(QMainWindow):
         exibir_diretorio.setChecked(Config().get_config_boolean('editor', 'toolbar_diretorio'))
         exibir_diretorio.triggered.connect(self.__exibir_diretorio)
 
+        exibir_miniaturas = self.__dock_miniaturas.toggleViewAction()
+        exibir_miniaturas.setText("Exibir miniaturas")
+        exibir_miniaturas.setShortcut("t")
+        exibir_miniaturas.triggered.connect(
+            lambda ativo: Config().set_config('editor', 'miniaturas', str(ativo))
+        )
+
+        exibir_informacoes = self.__dock_informacoes.toggleViewAction()
+        exibir_informacoes.setText("Exibir informações")
+        exibir_informacoes.setShortcut("i")
+        exibir_informacoes.setIcon(QIcon(self.__RESOURCES + 'info-svgrepo-com.svg'))
+        exibir_informacoes.triggered.connect(
+            lambda ativo: Config().set_config('editor', 'informacoes', str(ativo))
+        )
+
+        exibir_histograma = self.__dock_histograma.toggleViewAction()
+        exibir_histograma.setText("Exibir histograma")
+        exibir_histograma.setShortcut("h")
+        exibir_histograma.triggered.connect(
+            lambda ativo: Config().set_config('editor', 'histograma', str(ativo))
+        )
+
+        exibir_memoria = QAction("Exibir uso de memória", self)
+        exibir_memoria.setShortcut("f12")
+        exibir_memoria.setCheckable(True)
+        exibir_memoria.triggered.connect(self.__sobreposicao_memoria.exibir)
+
         fullscreen = QAction("Fullscreen", self)
         fullscreen.setShortcut("f")
         fullscreen.triggered.connect(lambda: self.__full_screen())
@@ -414,16 +660,29 @@ class DoImageViewer(QMainWindow):
         apresentacao_slide.setShortcut("f3")
         apresentacao_slide.triggered.connect(lambda: self.__set_slide())
 
-        menu_visualizar = QMenu("&Visualizar", self)
-        menu_visualizar.setStyleSheet(stylesheet)
+        menu_apresentacao = QMenu("Opções da apresentação", self)
+        menu_apresentacao.setStyleSheet(stylesheet)
+        self.__preencher_ao_exibir(menu_apresentacao, self.__preencher_apresentacao)
+
+        menu_ordenar = QMenu("&Ordenar por", self)
+        menu_ordenar.setStyleSheet(stylesheet)
+        self.__preencher_ao_exibir(menu_ordenar, self.__preencher_ordenacao)
+
+        menu_visualizar = self.__menus["&Visualizar"]
         menu_visualizar.addAction(centralizar)
         menu_visualizar.addSeparator()
         menu_visualizar.addAction(ampliar)
         menu_visualizar.addAction(reduzir)
         menu_visualizar.addSeparator()
         menu_visualizar.addAction(exibir_diretorio)
+        menu_visualizar.addAction(exibir_miniaturas)
+        menu_visualizar.addAction(exibir_informacoes)
+        menu_visualizar.addAction(exibir_histograma)
+        menu_visualizar.addAction(exibir_memoria)
+        menu_visualizar.addMenu(menu_ordenar)
         menu_visualizar.addSeparator()
         menu_visualizar.addAction(apresentacao_slide)
+        menu_visualizar.addMenu(menu_apresentacao)
         menu_visualizar.addAction(fullscreen)
 
         # MENU IMAGEM
@@ -462,13 +721,7 @@ class DoImageViewer(QMainWindow):
         inverter_h.setIcon(QIcon(self.__RESOURCES + 'horizontal-flip-svgrepo-com.svg'))
         inverter_h.triggered.connect(lambda: self.__viewer.inverter_horizontal())
 
-        self.__usar_antialiasing = QAction("Suavizar imagem", self)
-        self.__usar_antialiasing.setCheckable(True)
-        self.__usar_antialiasing.setChecked(Config().get_config_boolean('editor', 'antialiasing'))
-        self.__usar_antialiasing.triggered.connect(lambda: self.__mudar_antialiasing())
-
-        menu_imagem = QMenu("&Imagem", self)
-        menu_imagem.setStyleSheet(stylesheet)
+        menu_imagem = self.__menus["&Imagem"]
         menu_imagem.addAction(proxima_imagem)
         menu_imagem.addAction(imagem_anterior)
         menu_imagem.addSeparator()
@@ -481,6 +734,7 @@ class DoImageViewer(QMainWindow):
         menu_imagem.addAction(inverter_h)
         menu_imagem.addSeparator()
         menu_imagem.addAction(self.__usar_antialiasing)
+        menu_imagem.addAction(self.__usar_resolucao_tela)
 
         # MENU AJUDA
         sobre = QAction("&Sobre", self)
@@ -489,23 +743,69 @@ class DoImageViewer(QMainWindow):
         editar_gimp = QAction("&Abrir com Gimp", self)
         editar_gimp.triggered.connect(self.__editar_gimp)
 
-        menu_ajuda = QMenu("&Ajuda", self)
-        menu_ajuda.setStyleSheet(stylesheet)
-
+        menu_ajuda = self.__menus["&Ajuda"]
         menu_ajuda.addAction(sobre)
         menu_ajuda.addSeparator()
         menu_ajuda.addAction(editar_gimp)
 
-        # BARRA DE MENU
-        self.menuBar().setStyleSheet(
-            f"background-color: {Theme.color_secondary}; color: {Theme.color_text}; padding: 2px;"
-        )
-        self.menuBar().setAutoFillBackground(True)
-        self.menuBar().addMenu(menu_arquivo)
-        self.menuBar().addMenu(menu_editar)
-        self.menuBar().addMenu(menu_visualizar)
-        self.menuBar().addMenu(menu_imagem)
-        self.menuBar().addMenu(menu_ajuda)
+    # noinspection PyUnresolvedReferences
+    def __preencher_filtros(self, menu: QMenu):
+        for fid, nome in enumerate(FILTROS, 1):
+            filtro = QAction(nome.capitalize(), self)
+            filtro.triggered.connect(lambda _, i=fid: self.__adicionar_filtro(i))
+            menu.addAction(filtro)
+
+    # noinspection PyUnresolvedReferences
+    def __preencher_apresentacao(self, menu: QMenu):
+        grupo_intervalo = QActionGroup(self)
+        intervalo_atual = float(Config().get_config('apresentacao', 'intervalo', '3.5'))
+
+        for intervalo in (2, 3.5, 5, 10):
+            acao_intervalo = QAction(f"{intervalo} segundos", self)
+            acao_intervalo.setCheckable(True)
+            acao_intervalo.setChecked(intervalo == intervalo_atual)
+            acao_intervalo.triggered.connect(lambda _, i=intervalo: self.__configurar_apresentacao('intervalo', i))
+            grupo_intervalo.addAction(acao_intervalo)
+            menu.addAction(acao_intervalo)
+
+        apresentacao_aleatoria = QAction("Ordem aleatória", self)
+        apresentacao_aleatoria.setCheckable(True)
+        apresentacao_aleatoria.setChecked(Config().get_config_boolean('apresentacao', 'aleatorio'))
+        apresentacao_aleatoria.triggered.connect(lambda ativo: self.__configurar_apresentacao('aleatorio', ativo))
+
+        apresentacao_repetir = QAction("Repetir", self)
+        apresentacao_repetir.setCheckable(True)
+        apresentacao_repetir.setChecked(Config().get_config_boolean('apresentacao', 'repetir', True))
+        apresentacao_repetir.triggered.connect(lambda ativo: self.__configurar_apresentacao('repetir', ativo))
+
+        menu.addSeparator()
+        menu.addAction(apresentacao_aleatoria)
+        menu.addAction(apresentacao_repetir)
+
+    # noinspection PyUnresolvedReferences
+    def __preencher_ordenacao(self, menu: QMenu):
+        grupo_ordenar = QActionGroup(self)
+        ordem_atual = Config().get_config('editor', 'ordenacao', NATURAL)
+
+        for ordem, nome in NOMES_ORDENS.items():
+            acao_ordem = QAction(nome, self)
+            acao_ordem.setCheckable(True)
+            acao_ordem.setChecked(ordem == ordem_atual)
+            acao_ordem.triggered.connect(lambda _, o=ordem: self.__mudar_ordenacao(o))
+            grupo_ordenar.addAction(acao_ordem)
+            menu.addAction(acao_ordem)
+
+    def __preencher_amostra(self, menu: QMenu):
+        grupo_amostra = QActionGroup(self)
+        lado_atual = int(Config().get_config('editor', 'amostra_cor', '1'))
+
+        for lado in self.__LADOS_AMOSTRA:
+            acao_amostra = QAction("1 pixel" if lado == 1 else f"Média {lado} x {lado}", self)
+            acao_amostra.setCheckable(True)
+            acao_amostra.setChecked(lado == lado_atual)
+            acao_amostra.triggered.connect(lambda _, n=lado: self.__mudar_amostragem(lado=n))
+            grupo_amostra.addAction(acao_amostra)
+            menu.addAction(acao_amostra)
 
     def __configurar_tool_bar(self):
         """Configurações das barras de ferramentas"""
@@ -536,8 +836,6 @@ class DoImageViewer(QMainWindow):
         self.__diretorio_tool_bar.addAction(acao_diretorio)
         self.__diretorio_tool_bar.addWidget(self.__label_diretorio)
 
-        self.addToolBar(Qt.ToolBarArea.BottomToolBarArea, self.__diretorio_tool_bar)
-
     def __configurar_status_bar(self):
         self.statusBar().setStyleSheet(
             "background-color: " + Theme.color_secondary +
@@ -548,104 +846,216 @@ class DoImageViewer(QMainWindow):
         self.statusBar().addWidget(self.label_tamanho, 1)
         self.statusBar().addWidget(self.label_cor, 0)
         self.statusBar().addWidget(self.label_cor_nome, 0)
+        self.statusBar().addWidget(self.label_cor_cursor, 0)
         self.statusBar().addWidget(self.label_zoom, 0)
         self.statusBar().addWidget(self.label_lista, 0)
 
-    def __processar_caminho(self, path) -> str:
-        if path == "":
-            return QDir.homePath()
+    def __carregar_imagem(self, caminho: str):
+        if caminho.startswith(('http://', 'https://')):
+            self.__carregador.cancelar()
+            self.__carregador_url.carregar(caminho, self.size())
+            return
 
-        arquivo = ""
-        if os.path.isdir(path):
-            # lista_dir = sorted([x for x in os.listdir(path) if not x.startswith('.') and x.find('.') == -1])
-            lista_files = sorted(
-                [x for x in os.listdir(path) if not x.startswith('.') and x.find('.') != -1])
+        self.__carregador_url.cancelar()
+        self.__carregador.carregar(caminho, self.size())
 
-            for item in lista_files:
-                if item.split('.')[1] in self.__LISTA_EXTENSOES:
-                    arquivo = item
-                    break
+    def __exibir_progresso_url(self, pedido: int, recebidos: int, total: int):
+        if pedido != self.__carregador_url.pedido_atual:
+            return
 
-        return f'{path}{arquivo}'
+        self.__viewer.setCursor(QCursor(Qt.CursorShape.BusyCursor))
+        if total:
+            self.label_tamanho.setText(
+                f"Baixando {recebidos / 1024 / 1024:.1f} de {total / 1024 / 1024:.1f} MB "
+                f"({recebidos * 100 // total}%)"
+            )
+        else:
+            self.label_tamanho.setText(f"Baixando {recebidos / 1024 / 1024:.1f} MB")
 
-    def __carregar_imagem(self, caminho: str):
-        try:
-            path = Path(self.__processar_caminho(caminho))
-            dir_path = f"/{'/'.join(path.parts[1:-1])}/"
+    def __exibir_parcial_url(self, pedido: int, imagem: QImage):
+        if pedido != self.__carregador_url.pedido_atual:
+            return
 
-            if path.exists():
-                lista_imagens_raw = [x for x in os.listdir(dir_path) if x.find('.') != -1]
-                lista_imagens_processadas = ['.'.join([x.split('.')[0], x.split('.')[1].lower()]) for x in
-                                             lista_imagens_raw]
-                lista_imagens = []
+        # a primeira prévia é exibida como uma nova imagem, as seguintes mantêm o zoom e a posição
+        if self.__parcial_pedido == pedido:
+            self.__viewer.substituir_imagem(QPixmap.fromImage(imagem))
+        else:
+            self.__parcial_pedido = pedido
+            self.__descartar_edicao()
+            self.__viewer.adicionar_imagem(QPixmap.fromImage(imagem), tamanho_original(imagem))
+
+    def __url_concluida(self, pedido: int, arquivo: str):
+        if pedido != self.__carregador_url.pedido_atual:
+            return
+
+        # o arquivo baixado segue o mesmo caminho dos arquivos locais (edição, gravação, informações)
+        self.__carregador.carregar(arquivo, self.size())
+
+    def __exibir_falha_url(self, pedido: int, mensagem: str):
+        if pedido != self.__carregador_url.pedido_atual:
+            return
+
+        self.__viewer.setCursor(QCursor(Qt.CursorShape.PointingHandCursor))
+        self.setStatusTip(mensagem)
+        self.label_tamanho.setText("")
+        self.__agendar_interface()
+
+    def __exibir_progresso(self, pedido: int, mensagem: str):
+        if pedido != self.__carregador.pedido_atual:
+            return
+
+        self.__viewer.setCursor(QCursor(Qt.CursorShape.BusyCursor))
+        self.label_tamanho.setText(mensagem)
+
+    def __exibir_falha(self, pedido: int, mensagem: str):
+        if pedido != self.__carregador.pedido_atual:
+            return
+
+        self.__viewer.setCursor(QCursor(Qt.CursorShape.PointingHandCursor))
+        self.setStatusTip(mensagem)
+        self.label_tamanho.setText("")
+        self.__carregar_info()
+        self.__agendar_interface()
+
+    def __exibir_previa(self, pedido: int, info: dict, imagem: QImage):
+        if pedido != self.__carregador.pedido_atual:
+            return
+
+        self.__previa_pedido = pedido
+        self.__exibir_imagem(info, imagem)
+
+    def __imagem_carregada(self, pedido: int, info: dict, imagem: QImage):
+        # descarta resultados de pedidos que já foram substituídos
+        if pedido != self.__carregador.pedido_atual:
+            return
+
+        self.__viewer.setCursor(QCursor(Qt.CursorShape.PointingHandCursor))
+
+        # troca a prévia pela imagem completa, mantendo zoom e posição
+        if not self.__pilha_edicao.vazia():
+            return
+        elif self.__previa_pedido == pedido or info.get('completa'):
+            self.__viewer.substituir_imagem(QPixmap.fromImage(imagem))
+            self.__carregar_info(imagem)
+            self.__agendar_histograma()
+        else:
+            self.__exibir_imagem(info, imagem)
 
-                for item in lista_imagens_processadas:
-                    if item.split('.')[1] in self.__LISTA_EXTENSOES:
-                        lista_imagens.append(item)
+    def __exibir_imagem(self, info: dict, imagem: QImage):
+        dir_path = info['path']
+        indice = info['indice']
+        lista_final = info['lista']
 
-                # lista_imagens = [x for x in os.listdir(dir_path) if (x.find(".jpg") != -1) or (x.find(".png") != -1)]
+        # Exibindo a barra de menu inferior
+        if len(lista_final) <= 1:
+            self.label_left.setHidden(True)
+            self.label_right.setHidden(True)
+        else:
+            self.label_left.setHidden(False)
+            self.label_right.setHidden(False)
+
+        # atualizando variaveis
+        self.__info_dir = {
+            "path": dir_path,
+            "indice": indice,
+            "lista": lista_final
+        }
+        self.setWindowTitle(lista_final[indice])
+        self.__carregar_info(imagem)
+        self.__descartar_edicao()
+        self.__rotacao = 0
+        self.__viewer.adicionar_imagem(QPixmap.fromImage(imagem), tamanho_original(imagem))
+        self.__agendar_interface()
+        self.__agendar_prefetch()
+        self.__observador.observar(dir_path)
+        self.__atualizar_miniaturas()
+        self.__atualizar_galeria()
+        # sobre a prévia do carregador apenas a estimativa, a imagem completa já está a caminho
+        self.__agendar_histograma(self.__previa_pedido != self.__carregador.pedido_atual)
+
+        # a navegação entre imagens do mesmo diretório não altera as recentes
+        if info.get('navegacao'):
+            return
 
-                imagem = None
-                if path.is_file():
-                    imagem = '.'.join([path.parts[-1].split('.')[0], path.parts[-1].split('.')[1].lower()])
+        config = Config()
+        config.set_config('editor', 'caminho', dir_path)
+
+        lista_recentes = config.get_config('editor', 'recentes').split(',')
+        if lista_recentes[0] != "None":
+            lista_recentes.append(f'{dir_path}{lista_final[indice]}')
 
-                try:
-                    lista_numeros = sorted([x for x in lista_imagens if x[0].isdigit()],
-                                           key=lambda x: float(x[:-4]))
-                except ValueError:
-                    lista_numeros = lista_imagens
+            if len(lista_recentes) > 3:
+                config.set_config('editor', 'recentes', ','.join(lista_recentes[1:]))
+            else:
+                config.set_config('editor', 'recentes', ','.join(lista_recentes))
+        else:
+            config.set_config('editor', 'recentes', f'{dir_path}{lista_final[indice]}')
 
-                lista_letras = sorted([x for x in lista_imagens if x[0].isalpha() or x[0].isascii()], key=str.lower)
-                lista_final = []
-                lista_final.extend(lista_numeros)
+    def __diretorio_alterado(self, caminho: str):
+        if caminho != self.__info_dir['path'] or not self.__info_dir['lista']:
+            return
 
-                for elemento in lista_letras:
-                    if elemento not in lista_final:
-                        lista_final.append(elemento)
+        indice_diretorio = IndiceDiretorio.em_cache(caminho)
+        atual = self.__info_dir['lista'][self.__info_dir['indice']]
+        lista = indice_diretorio.lista()
+        indice = indice_diretorio.indice(atual)
 
-                indice = 0
-                if imagem is not None:
-                    for item in lista_final:
-                        if item == imagem:
-                            break
-                        indice += 1
-
-                # Exibindo a barra de menu inferior
-                if len(lista_final) <= 1:
-                    self.label_left.setHidden(True)
-                    self.label_right.setHidden(True)
-                else:
-                    self.label_left.setHidden(False)
-                    self.label_right.setHidden(False)
-
-                # atualizando variaveis
-                self.__info_dir = {
-                    "path": dir_path,
-                    "indice": indice,
-                    "lista": lista_final
-                }
-                self.setWindowTitle(imagem)
-                self.__carregar_info()
-                self.__rotacao = 0
-                self.__viewer.adicionar_imagem(QPixmap(f'{dir_path}{lista_final[indice]}'))
-
-                Config().set_config('editor', 'caminho', dir_path)
-
-                lista_recentes = Config().get_config('editor', 'recentes').split(',')
-                if lista_recentes[0] != "None":
-                    lista_recentes.append(f'{dir_path}{lista_final[indice]}')
-
-                    if len(lista_recentes) > 3:
-                        Config().set_config('editor', 'recentes', ','.join(lista_recentes[1:]))
-                    else:
-                        Config().set_config('editor', 'recentes', ','.join(lista_recentes))
-                else:
-                    Config().set_config('editor', 'recentes', f'{dir_path}{lista_final[indice]}')
+        self.__info_dir['lista'] = lista
+        self.label_left.setHidden(len(lista) <= 1)
+        self.label_right.setHidden(len(lista) <= 1)
 
-        except IndexError:
-            pass
+        if indice is not None:
+            self.__info_dir['indice'] = indice
+            self.label_lista.setText(f"{indice + 1} / {len(lista)}")
+            self.__agendar_prefetch()
+            self.__atualizar_miniaturas()
+            self.__faixa_miniaturas.recarregar()
+        elif lista:
+            # a imagem exibida foi removida, exibe a que ocupou o seu lugar
+            self.__info_dir['indice'] = min(self.__info_dir['indice'], len(lista) - 1)
+            self.__carregador.decodificar(dict(self.__info_dir, navegacao=True), self.size())
+
+    def __carregar_resolucao_total(self):
+        if not self.__pilha_edicao.vazia():
+            self.__renderizar_completa()
+
+        # fora do modo de resolução da tela a imagem completa já está a caminho após a prévia
+        elif self.__resolucao_tela and self.__info_dir['lista']:
+            self.__carregador.decodificar_completa(self.__info_dir)
+
+    def __aplicar_resolucao_tela(self, ativo: bool):
+        self.__resolucao_tela = ativo
+
+        if ativo:
+            tela = self.__app.primaryScreen().size()
+            largura, altura = tela.width(), tela.height()
+            self.__prefetch.definir_decodificador(
+                lambda c: carregar_qimage_reduzida(c, largura, altura), f'tela:{largura}x{altura}'
+            )
+        else:
+            self.__prefetch.definir_decodificador(carregar_qimage)
 
-    def __carregar_info(self):
+        # a decodificação na resolução da tela já é rápida, dispensando a prévia
+        self.__carregador.usar_previa = not ativo
+
+    def __mudar_ordenacao(self, ordem: str):
+        Config().set_config('editor', 'ordenacao', ordem)
+        self.__carregador.ordem = ordem
+
+        # recarrega apenas a lista, a imagem exibida continua no cache
+        if self.__info_dir['lista']:
+            self.__carregar_imagem(f'{self.__info_dir["path"]}{self.__info_dir["lista"][self.__info_dir["indice"]]}')
+
+    def __mudar_resolucao_tela(self):
+        config = Config()
+        ativo = not config.get_config_boolean('editor', 'resolucao_tela')
+
+        config.set_config('editor', 'resolucao_tela', ativo)
+        self.__usar_resolucao_tela.setChecked(ativo)
+        self.__aplicar_resolucao_tela(ativo)
+        self.__recarregar_imagem()
+
+    def __carregar_info(self, pixmap: QImage | None = None):
         try:
             lista = self.__info_dir['lista']
             imagem = lista[self.__info_dir['indice']]
@@ -656,7 +1066,15 @@ class DoImageViewer(QMainWindow):
             else:
                 indice_calculado = self.__info_dir['indice'] + 1
 
-            largura, altura = Image.open(f"{caminho}{imagem}").size
+            # um único 'stat' por exibição, o cabeçalho só é lido na primeira vez (ou já foi lido em segundo plano)
+            metadados = CacheMetadados.compartilhado().obter(f"{caminho}{imagem}")
+            if metadados is None:
+                return
+
+            if pixmap is not None:
+                largura, altura = tamanho_original(pixmap).width(), tamanho_original(pixmap).height()
+            else:
+                largura, altura = metadados.largura, metadados.altura
 
             caminho_processado = caminho
             caminho_split = caminho.split('/')[:-1]
@@ -665,31 +1083,97 @@ class DoImageViewer(QMainWindow):
                 caminho_processado = "..." + "/".join(caminho_split[len(caminho_split) - tamanho_caminho:])
             self.__label_diretorio.setText(caminho_processado)
 
-            modificado = datetime.fromtimestamp(os.stat(f"{caminho}{imagem}").st_ctime)
-            criado = datetime.fromtimestamp(os.stat(f"{caminho}{imagem}").st_mtime)
-
             self.label_tamanho.setText(
                 str(largura) + "  x " + str(altura) + " pixels  " +
-                str(int(os.path.getsize(f"{caminho}{imagem}") / 1024)) + "kB  " +
-                f'em {min(modificado, criado).strftime("%d/%m/%Y")}'
+                str(int(metadados.tamanho / 1024)) + "kB  " +
+                f'em {metadados.data.strftime("%d/%m/%Y")}'
             )
 
             self.label_lista.setText(str(indice_calculado) + " / " + str(len(lista)))
+
+            if self.__dock_informacoes.isVisible():
+                self.__painel_informacoes.definir([("Arquivo", imagem)] + metadados.campos())
         except IndexError:
             pass
 
+    def __atualizar_miniaturas(self):
+        # as miniaturas só são geradas com a faixa visível
+        if not self.__dock_miniaturas.isVisible() or not self.__info_dir['lista']:
+            return
+
+        caminho = self.__info_dir['path']
+        indice_diretorio = IndiceDiretorio.em_cache(caminho)
+        if indice_diretorio is None:
+            return
+
+        self.__faixa_miniaturas.definir(
+            caminho, self.__info_dir['lista'], indice_diretorio.stat, self.__info_dir['indice']
+        )
+
+    def __atualizar_galeria(self):
+        # as prévias só são geradas com o painel visível, as já prontas vêm do cache
+        if not self.__dock_filtros.isVisible() or not self.__info_dir['lista']:
+            return
+
+        self.__galeria_filtros.limpar()
+        for indice, previa in self.__gerador_previas.gerar(self.__arquivo_atual()).items():
+            self.__galeria_filtros.definir_previa(indice, previa)
+
+        filtro = next((parametro for tipo, parametro in self.__pilha_edicao.operacoes if tipo == FILTRO), None)
+        self.__galeria_filtros.marcar(FILTROS.index(filtro) + 1 if filtro in FILTROS else 0)
+
+    def __exibir_previa_filtro(self, caminho: str, indice: int, previa: QImage):
+        if self.__info_dir['lista'] and caminho == self.__arquivo_atual():
+            self.__galeria_filtros.definir_previa(indice, previa)
+
+    def __agendar_histograma(self, refinar: bool = True):
+        # as atualizações são agrupadas: durante o arraste dos ajustes o histograma acompanha a cada intervalo
+        self.__refinar_histograma = refinar
+        if not self.__timer_histograma.isActive():
+            self.__timer_histograma.start()
+
+    def __atualizar_histograma(self):
+        # calculado apenas com o painel visível, os valores exatos já calculados vêm do cache
+        if not self.__dock_histograma.isVisible() or not self.__info_dir['lista'] or self.__viewer.m_pixmap.isNull():
+            return
+
+        self.__painel_histograma.definir(self.__calculadora_estatisticas.calcular(
+            self.__arquivo_atual(), self.__pilha_edicao.operacoes, self.__viewer.imagem_exibida(),
+            not self.__viewer.reduzida(), self.__refinar_histograma and not self.__painel_ajustes.arrastando()
+        ))
+
+    def __estatisticas_calculadas(self, pedido: int, estatisticas: Estatisticas):
+        if pedido == self.__calculadora_estatisticas.pedido_atual:
+            self.__painel_histograma.definir(estatisticas)
+
+    def __posicionar_miniaturas(self, area: Qt.DockWidgetArea):
+        # nas laterais as miniaturas são exibidas em grade
+        self.__faixa_miniaturas.definir_grade(
+            area in (Qt.DockWidgetArea.LeftDockWidgetArea, Qt.DockWidgetArea.RightDockWidgetArea)
+        )
+
+    def __agendar_prefetch(self):
+        # durante a apresentação as imagens são pré-carregadas na ordem dos slides
+        seguintes = self.__apresentacao.seguintes() if self.__apresentacao.ativa() else None
+        self.__prefetch.agendar(self.__info_dir['path'], self.__info_dir['lista'], self.__info_dir['indice'], seguintes)
+
     def __mudar_imagem(self, direcao: str):
-        try:
-            if direcao == 'dir':
-                self.__info_dir['indice'] += 1
-            else:
-                self.__info_dir['indice'] -= 1
+        if direcao == 'dir':
+            self.__exibir_indice(self.__info_dir['indice'] + 1)
+        else:
+            self.__exibir_indice(self.__info_dir['indice'] - 1)
+
+        # a apresentação continua a partir da imagem escolhida
+        if self.__apresentacao.ativa():
+            self.__apresentacao.iniciar(len(self.__info_dir['lista']), self.__info_dir['indice'])
+            self.__agendar_prefetch()
 
-            indice = self.__info_dir['indice']
+    def __exibir_indice(self, indice: int):
+        try:
             lista = self.__info_dir['lista']
             caminho = f"{self.__info_dir['path']}"
 
-            if indice >= len(self.__info_dir['lista']):
+            if indice >= len(lista):
                 proxima = lista[0]
                 indice = 0
             elif indice < 0:
@@ -698,10 +1182,22 @@ class DoImageViewer(QMainWindow):
             else:
                 proxima = lista[indice]
 
-            self.__viewer.adicionar_imagem(QPixmap(f'{caminho}{proxima}'))
             self.__info_dir['indice'] = indice
-            self.setWindowTitle(proxima)
-            self.__carregar_info()
+            self.__faixa_miniaturas.selecionar(indice)
+
+            # imagens já decodificadas são exibidas na hora, as demais passam pela prévia em segundo plano
+            if self.__prefetch.pronto(f'{caminho}{proxima}'):
+                self.__descartar_edicao()
+                self.__carregador.cancelar()
+                imagem = self.__prefetch.obter(f'{caminho}{proxima}')
+                self.__viewer.adicionar_imagem(QPixmap.fromImage(imagem), tamanho_original(imagem))
+                self.__agendar_prefetch()
+                self.setWindowTitle(proxima)
+                self.__carregar_info(imagem)
+                self.__atualizar_galeria()
+                self.__agendar_histograma()
+            else:
+                self.__carregador.decodificar(dict(self.__info_dir, navegacao=True), self.size())
         except IndexError:
             pass
 
@@ -736,8 +1232,76 @@ class DoImageViewer(QMainWindow):
         filename = f'{self.__info_dir["path"]}{self.__info_dir["lista"][self.__info_dir["indice"]]}'
 
         if filename != "":
-            self.__viewer.m_pixmap.save(filename, quality=100)
-            self.__carregar_imagem(filename)
+            self.__gravar_imagem(filename)
+
+    def __gravar_imagem(self, filename: str):
+        arquivo = self.__arquivo_atual()
+
+        if self.__pilha_edicao.vazia() and self.__jpeg(arquivo) and \
+                os.path.splitext(filename)[1].lower() in self.__EXTENSOES_JPEG:
+            # apenas rotações e inversões: a orientação EXIF é regravada sem recomprimir a imagem
+            with Image.open(arquivo) as im:
+                orientacao = compor(orientacao_exif(im), self.__viewer.orientacao())
+            gravar_orientacao_jpeg(arquivo, filename, orientacao)
+            self.__revalidar_arquivo(filename)
+        elif not self.__pilha_edicao.vazia() and self.__viewer.reduzida():
+            # a gravação continua quando as edições estiverem aplicadas na resolução total
+            self.__renderizar_completa(lambda: self.__gravar_exibida(filename))
+            return
+        else:
+            # a imagem exibida pode ser uma versão reduzida, que não deve ser gravada no arquivo
+            if self.__viewer.reduzida():
+                self.__viewer.substituir_imagem(QPixmap.fromImage(carregar_qimage(arquivo)))
+            self.__gravar_exibida(filename)
+            return
+
+        self.__prefetch.invalidar(filename)
+        self.__carregar_imagem(filename)
+
+    def __gravar_exibida(self, filename: str):
+        self.__viewer.imagem_orientada().save(filename, quality=100)
+        self.__revalidar_arquivo(filename)
+        self.__prefetch.invalidar(filename)
+        self.__carregar_imagem(filename)
+
+    def __revalidar_arquivo(self, filename: str):
+        # o índice do diretório guarda o stat de cada arquivo, usado nas chaves das miniaturas e dos metadados
+        indice_diretorio = IndiceDiretorio.em_cache(f'{os.path.dirname(filename)}/')
+        if indice_diretorio is not None and indice_diretorio.revalidar(os.path.basename(filename)):
+            self.__faixa_miniaturas.recarregar()
+
+    @staticmethod
+    def __jpeg(arquivo: str) -> bool:
+        try:
+            with Image.open(arquivo) as im:
+                return im.format == 'JPEG'
+        except OSError:
+            return False
+
+    def __renderizar_completa(self, depois: Callable[[], None] = None):
+        # as edições são aplicadas na resolução total apenas aqui, em segundo plano
+        self.__apos_renderizacao = depois
+        self.__renderizador.renderizar(self.__arquivo_atual(), self.__pilha_edicao.operacoes)
+        self.setStatusTip("Aplicando as edições na resolução total...")
+
+    def __renderizacao_concluida(self, pedido: int, imagem: QImage):
+        if pedido != self.__renderizador.pedido_atual:
+            return
+
+        self.__viewer.substituir_imagem(QPixmap.fromImage(imagem))
+        self.setStatusTip("Edições aplicadas na resolução total")
+        self.__agendar_histograma()
+
+        depois, self.__apos_renderizacao = self.__apos_renderizacao, None
+        if depois is not None:
+            depois()
+
+    def __cancelar_renderizacao(self):
+        self.__renderizador.cancelar()
+
+        if self.__apos_renderizacao is not None:
+            self.__apos_renderizacao = None
+            self.setStatusTip("Gravação cancelada: a imagem foi alterada")
 
     def __salvar_imagem_como(self):
         filename, _ = QFileDialog.getSaveFileName(
@@ -747,11 +1311,11 @@ class DoImageViewer(QMainWindow):
             f'Imagens ({"*."+", *.".join(self.__LISTA_EXTENSOES)})'
         )
         if filename != "":
-            self.__viewer.m_pixmap.save(filename, quality=100)
-            self.__carregar_imagem(filename)
+            self.__gravar_imagem(filename)
 
     def __recarregar_imagem(self):
         filename = f'{self.__info_dir["path"]}{self.__info_dir["lista"][self.__info_dir["indice"]]}'
+        self.__prefetch.invalidar(filename)
         self.__carregar_imagem(filename)
 
     def __abrir_info_dialog(self):
@@ -766,50 +1330,68 @@ class DoImageViewer(QMainWindow):
 
         Config().set_config('editor', 'toolbar_diretorio', str(self.__diretorio_tool_bar.isVisible()))
 
-    def __adicionar_filtro(self, fid: int):
-        ext = self.__info_dir["lista"][self.__info_dir["indice"]].split('.')[1]
-        im = Image.open(f'{self.__info_dir["path"]}{self.__info_dir["lista"][self.__info_dir["indice"]]}')
-        filtro = None
+    def __arquivo_atual(self) -> str:
+        return f'{self.__info_dir["path"]}{self.__info_dir["lista"][self.__info_dir["indice"]]}'
+
+    def __exibir_edicao(self, manter_zoom: bool = False):
+        # as edições são exibidas sobre uma versão do tamanho da tela, a resolução total só é processada ao salvar
+        arquivo = self.__arquivo_atual()
+        tela = self.__app.primaryScreen().size().expandedTo(self.size())
+        self.__cancelar_renderizacao()
+
+        if manter_zoom:
+            # ajustes que não alteram a geometria: a versão reduzida tem o tamanho exibido com o zoom atual,
+            # limitado à tela. Acima disso a resolução total é calculada ao confirmar o ajuste
+            exibido = self.__viewer.tamanho_exibido()
+            escala = self.__viewer.m_scale * min(
+                1.0, max(tela.width(), tela.height()) / max(exibido.width(), exibido.height(), 1)
+            )
+            original = self.__fonte_edicao.obter(arquivo)
+            proxy = self.__fonte_edicao.proxy(
+                arquivo, max(1, math.ceil(original.width * escala)), max(1, math.ceil(original.height * escala))
+            )
+            self.__viewer.substituir_imagem(QPixmap.fromImage(pil_para_qimage(self.__pilha_edicao.renderizar(proxy))))
+            self.__agendar_histograma()
+            return
+
+        original = self.__fonte_edicao.obter(arquivo)
+        proxy = self.__fonte_edicao.proxy(arquivo, tela.width(), tela.height())
+        im = self.__pilha_edicao.renderizar(proxy)
+
+        escala = original.width / proxy.width
+        self.__viewer.adicionar_imagem(
+            QPixmap.fromImage(pil_para_qimage(im)), QSize(round(im.width * escala), round(im.height * escala))
+        )
+        self.__agendar_histograma()
+
+    def __descartar_edicao(self):
+        self.__cancelar_renderizacao()
+        self.__timer_ajuste.stop()
+        self.__ajuste_pendente = None
+        self.__pilha_edicao.limpar()
+        self.__enhance = 1.0
+        self.__nitidez = 1.0
+        self.__painel_ajustes.definir(COR, 1.0)
+        self.__painel_ajustes.definir(NITIDEZ, 1.0)
 
+        self.__corrigir_iluminacao_add.setEnabled(True)
+        self.__corrigir_iluminacao_rmv.setEnabled(True)
+        self.__corrigir_nitidez_add.setEnabled(True)
+        self.__corrigir_nitidez_rmv.setEnabled(True)
+
+    def __adicionar_filtro(self, fid: int):
         if fid == 0:
-            self.__recarregar_imagem()
+            self.__descartar_edicao()
+            self.__exibir_edicao()
             self.setStatusTip("Filtro original")
-        if fid == 1:
-            filtro = pilgram.aden(im)
-            self.setStatusTip("Filtro aden")
-        elif fid == 2:
-            filtro = pilgram.clarendon(im)
-            self.setStatusTip("Filtro clarendon")
-        elif fid == 3:
-            filtro = pilgram.earlybird(im)
-            self.setStatusTip("Filtro earlybird")
-        elif fid == 4:
-            filtro = pilgram.hudson(im)
-            self.setStatusTip("Filtro hudson")
-        elif fid == 5:
-            filtro = pilgram.lark(im)
-            self.setStatusTip("Filtro lark")
-        elif fid == 6:
-            filtro = pilgram.lofi(im)
-            self.setStatusTip("Filtro lofi")
-        elif fid == 7:
-            filtro = pilgram.maven(im)
-            self.setStatusTip("Filtro maven")
-        elif fid == 8:
-            filtro = pilgram.reyes(im)
-            self.setStatusTip("Filtro reyes")
-        elif fid == 9:
-            filtro = pilgram.valencia(im)
-            self.setStatusTip("Filtro valencia")
-        elif fid == 10:
-            filtro = pilgram.walden(im)
-            self.setStatusTip("Filtro walden")
-
-        if filtro is not None:
-            filename = f'{self.__CAMINHO_HOME}/cropped.{ext}'
-            filtro.save(filename, quality=100)
-
-            self.__viewer.adicionar_imagem(QPixmap(filename))
+            self.__galeria_filtros.marcar(0)
+            return
+
+        nome = list(FILTROS)[fid - 1]
+        self.__pilha_edicao.definir(FILTRO, nome)
+        self.__exibir_edicao()
+        self.setStatusTip(f"Filtro {nome}")
+        self.__galeria_filtros.marcar(fid)
 
     def __mudar_antialiasing(self):
         config = Config()
@@ -833,152 +1415,132 @@ class DoImageViewer(QMainWindow):
 
         self.__viewer.centralizar()
 
-    def __slide_show(self):
-        self.__mudar_imagem('dir')
-        self.__timer.run()
-
     def __set_slide(self):
-        if self.__timer.is_alive():
-            self.__timer.cancel()
+        if self.__apresentacao.ativa():
+            self.__apresentacao.parar()
+            self.__agendar_prefetch()
+            self.setStatusTip("Apresentação de slides encerrada")
+        elif self.__info_dir['lista']:
+            self.__apresentacao.iniciar(len(self.__info_dir['lista']), self.__info_dir['indice'])
+            self.__agendar_prefetch()
+            self.setStatusTip("Apresentação de slides")
+
+    def __configurar_apresentacao(self, opcao: str, valor):
+        Config().set_config('apresentacao', opcao, valor)
+
+        if opcao == 'intervalo':
+            self.__apresentacao.intervalo = int(valor * 1000)
+        elif opcao == 'aleatorio':
+            self.__apresentacao.aleatorio = valor
         else:
-            try:
-                self.__timer.start()
-            except RuntimeError:
-                self.__timer = Timer(self.__timer_interval, self.__slide_show)
-                self.__timer.start()
-
-    def cancelar_timer(self):
-        self.__timer.cancel()
+            self.__apresentacao.repetir = valor
 
-    @staticmethod
-    def __verifica_igualdade_pixels(ant, atual, fator):
-        return ((ant[0] == atual[0]) and (ant[1] == atual[1]) and (ant[2] == atual[2])) or \
-            ((abs(ant[0] - atual[0]) <= fator) and (abs(ant[1] - atual[1]) <= fator) and (
-                abs(ant[2] - atual[2])) <= fator)
-
-    def __cut_image(self, im: Image, fator=3) -> (int, int, int, int):
-        width, height = im.size
-
-        metade_vertical = floor(height / 2)
-        metade_horizontal = floor(width / 2)
-
-        x1 = 0
-        x2 = 0
-        x3 = 0
-        x4 = 0
-
-        # START
-        col = 1
-        while col < floor(width / 2):
-            pixel_anterior = im.getpixel((col - 1, metade_vertical))
-            pixel_atual = im.getpixel((col, metade_vertical))
-
-            if self.__verifica_igualdade_pixels(pixel_anterior, pixel_atual, fator):
-                x1 += 1
-            else:
-                x1 += 1
-                break
-
-            col += 1
-
-        # END
-        col = width - 2
-        while col > floor(width / 2):
-            pixel_anterior = im.getpixel((col + 1, metade_vertical))
-            pixel_atual = im.getpixel((col, metade_vertical))
-
-            if self.__verifica_igualdade_pixels(pixel_anterior, pixel_atual, fator):
-                x2 += 1
-            else:
-                x2 += 1
-                break
-
-            col -= 1
+        # aplica a nova ordem a partir da imagem exibida
+        if self.__apresentacao.ativa():
+            self.__apresentacao.iniciar(len(self.__info_dir['lista']), self.__info_dir['indice'])
+            self.__agendar_prefetch()
 
-        # TOP
-        lin = 1
-        while lin < floor(height / 2):
-            pixel_anterior = im.getpixel((metade_horizontal, lin - 1))
-            pixel_atual = im.getpixel((metade_horizontal, lin))
-
-            if self.__verifica_igualdade_pixels(pixel_anterior, pixel_atual, fator):
-                x3 += 1
-            else:
-                x3 += 1
-                break
-
-            lin += 1
-
-        # BOT
-        lin = height - 2
-        while lin > floor(height / 2):
-            pixel_anterior = im.getpixel((metade_horizontal, lin + 1))
-            pixel_atual = im.getpixel((metade_horizontal, lin))
+    def cancelar_timer(self):
+        self.__apresentacao.parar()
 
-            if self.__verifica_igualdade_pixels(pixel_anterior, pixel_atual, fator):
-                x4 += 1
-            else:
-                x4 += 1
-                break
+    def __crop_margem(self):
+        from src.core.bordas import detectar_bordas
 
-            lin -= 1
+        im = self.__fonte_edicao.obter(self.__arquivo_atual())
 
-        return x1, width - x2, x3, height - x4
+        esquerda, topo, direita, base = detectar_bordas(im)
 
-    def __crop_margem(self):
-        ext = self.__info_dir["lista"][self.__info_dir["indice"]].split('.')[1]
-        im = Image.open(f'{self.__info_dir["path"]}{self.__info_dir["lista"][self.__info_dir["indice"]]}')
+        # o recorte é guardado em frações, valendo tanto para a versão reduzida quanto para a original
+        self.__pilha_edicao.definir(
+            RECORTE, (esquerda / im.width, topo / im.height, direita / im.width, base / im.height)
+        )
+        self.__exibir_edicao()
 
-        x, w, y, h = self.__cut_image(im)
+    def __corrigir_iluminacao(self, valor: int):
+        enhance = self.__enhance
+        if valor == 0:
+            enhance += .4
+        elif valor == 1 and enhance < FATOR_MAXIMO:
+            enhance += .4
+        elif valor == 2 and enhance > FATOR_MINIMO:
+            enhance -= .4
 
-        im1 = im.crop((x, y, w, h))
-        filename = f'{self.__CAMINHO_HOME}/cropped.{ext}'
-        im1.save(filename, quality=100)
+        self.__definir_ajuste(COR, round(enhance, 2))
+        self.__exibir_edicao(True)
 
-        self.__viewer.adicionar_imagem(QPixmap(filename))
+    def __corrigir_nitidez(self, valor: int):
+        nitidez = self.__nitidez
+        if valor == 1 and nitidez < FATOR_MAXIMO:
+            nitidez += .4
+        elif valor == 2 and nitidez > FATOR_MINIMO:
+            nitidez -= .4
+
+        self.__definir_ajuste(NITIDEZ, round(nitidez, 2))
+        self.__exibir_edicao(True)
+
+    def __definir_ajuste(self, tipo: str, fator: float):
+        if tipo == COR:
+            self.__enhance = fator
+            self.__corrigir_iluminacao_add.setEnabled(fator < FATOR_MAXIMO)
+            self.__corrigir_iluminacao_rmv.setEnabled(fator > FATOR_MINIMO)
+        else:
+            self.__nitidez = fator
+            self.__corrigir_nitidez_add.setEnabled(fator < FATOR_MAXIMO)
+            self.__corrigir_nitidez_rmv.setEnabled(fator > FATOR_MINIMO)
 
-    def __corrigir_iluminacao(self, valor: int):
-        ext = self.__info_dir["lista"][self.__info_dir["indice"]].split('.')[1]
+        self.__painel_ajustes.definir(tipo, fator)
+        self.__pilha_edicao.definir(tipo, None if fator == 1 else fator)
 
-        im = Image.open(f'{self.__info_dir["path"]}{self.__info_dir["lista"][self.__info_dir["indice"]]}')
+    def __ajuste_alterado(self, tipo: str, fator: float):
+        if not self.__info_dir['lista']:
+            return
 
-        if valor == 0:
-            self.__enhance += .4
-        elif valor == 1 and self.__enhance < 2:
-            self.__enhance += .4
-        elif valor == 2 and self.__enhance > 0:
-            self.__enhance -= .4
+        # os valores que chegam enquanto um quadro é calculado são descartados, exceto o último
+        self.__ajuste_pendente = (tipo, fator)
+        self.__timer_ajuste.start()
 
-        self.__corrigir_iluminacao_add.setEnabled(False if self.__enhance >= 2 else True)
-        self.__corrigir_iluminacao_rmv.setEnabled(False if self.__enhance <= 0 else True)
+    def __aplicar_ajuste(self):
+        if self.__ajuste_pendente is None:
+            return
 
-        im1 = ImageEnhance.Color(im).enhance(self.__enhance)
+        tipo, fator = self.__ajuste_pendente
+        self.__ajuste_pendente = None
+        self.__definir_ajuste(tipo, fator)
+        self.__exibir_edicao(True)
 
-        filename = f'{self.__CAMINHO_HOME}/corrigida.{ext}'
+    def __ajuste_confirmado(self, _tipo: str, _fator: float):
+        if self.__timer_ajuste.isActive():
+            self.__timer_ajuste.stop()
+            self.__aplicar_ajuste()
 
-        im1.save(filename, quality=100)
-        self.__viewer.adicionar_imagem(QPixmap(filename))
+        # com zoom acima da versão reduzida, a resolução total é calculada em segundo plano
+        if self.__info_dir['lista'] and not self.__pilha_edicao.vazia():
+            self.__viewer.verificar_resolucao()
 
-    def __corrigir_nitidez(self, valor: int):
-        ext = self.__info_dir["lista"][self.__info_dir["indice"]].split('.')[1]
-        im = Image.open(f'{self.__info_dir["path"]}{self.__info_dir["lista"][self.__info_dir["indice"]]}')
+        # os valores exatos ficam para o fim do arraste
+        self.__agendar_histograma()
 
-        if valor == 1 and self.__nitidez < 2:
-            self.__nitidez += .4
-        elif valor == 2 and self.__nitidez > 0:
-            self.__nitidez -= .4
+    def __mudar_amostragem(self, lado: int = None, cursor: bool = None):
+        config = Config()
+        if lado is not None:
+            config.set_config('editor', 'amostra_cor', str(lado))
+        if cursor is not None:
+            config.set_config('editor', 'cor_cursor', str(cursor))
 
-        self.__corrigir_nitidez_add.setEnabled(False if self.__nitidez >= 2 else True)
-        self.__corrigir_nitidez_rmv.setEnabled(False if self.__nitidez <= 0 else True)
+        self.__viewer.definir_amostragem(
+            int(config.get_config('editor', 'amostra_cor', '1')), config.get_config_boolean('editor', 'cor_cursor')
+        )
 
-        im1 = ImageEnhance.Sharpness(im).enhance(self.__nitidez)
+    def __mudar_cor_cursor(self, ativo: bool):
+        self.__mudar_amostragem(cursor=ativo)
+        if not ativo:
+            self.label_cor_cursor.setText("")
 
-        filename = f'{self.__CAMINHO_HOME}/corrigida.{ext}'
-        im1.save(filename, quality=100)
-        self.__viewer.adicionar_imagem(QPixmap(filename))
+    def __exibir_cor_cursor(self, x: int, y: int, cor: tuple):
+        self.label_cor_cursor.setText('{}, {}  #{:02X}{:02X}{:02X}'.format(x, y, *cor) if cor else "")
 
     def exibir_cor_selecionada(self, pos: ()):
-        if self.__viewer.m_pixmap:
+        if self.__viewer.m_pixmap and pos is not None:
             r, g, b, _ = pos  # self.__viewer.get_posicao_mouse()
             cor = '#{:02X}{:02X}{:02X}'.format(r, g, b)
 
@@ -995,15 +1557,9 @@ class DoImageViewer(QMainWindow):
     def __copiar_cor_para_transferencia(self):
         self.__app.clipboard().setText(self.label_cor_nome.text())
 
-    @staticmethod
-    def __abrir_nova_janela(caminho: str = ""):
-        if "__main__.py" in os.listdir(os.getcwd()):
-            os.system(f'cd {os.getcwd()}; python __main__.py "{caminho}";cd;')
-        else:
-            if platform.system() == "Windows":
-                os.system(f'{os.getcwd()}/Do Image Viewer.exe "{caminho}"')
-            else:
-                os.system(f'cd {os.getcwd()}; ./Do\\ Image\\ Viewer "{caminho}";cd;')
+    def __abrir_nova_janela(self, caminho: str = ""):
+        # a nova janela é aberta no mesmo processo, sem uma nova inicialização do Python e do Qt
+        self.abrir_janela(self.__app, caminho)
 
     def __abrir_foto_nova_janela(self):
         filename, _ = QFileDialog.getOpenFileName(
@@ -1017,6 +1573,7 @@ class DoImageViewer(QMainWindow):
             self.__abrir_nova_janela(filename)
 
     def __abrir_file_manager(self):
+        from showinfm import show_in_file_manager
         show_in_file_manager(f'{self.__info_dir["path"]}{self.__info_dir["lista"][self.__info_dir["indice"]]}')
 
     def __editar_gimp(self):
@@ -0,0 +1,79 @@
+"""
+Leitura das cores da imagem exibida direto dos seus pixels, sem desenhar o widget. Os pixels do QImage são lidos
+por uma visão do NumPy, sem cópia, e a média de uma área N x N custa apenas a leitura desses N² pixels.
+O NumPy só é importado quando a primeira visão é criada (ex: no primeiro uso da seleção de cores)
+"""
+import sys
+
+from PyQt6.QtGui import QImage
+
+# nos formatos de 32 bits o pixel é um inteiro 0xAARRGGBB, a ordem dos bytes na memória depende da arquitetura
+__ORDEM_32 = (2, 1, 0) if sys.byteorder == 'little' else (1, 2, 3)
+
+# formato -> (bytes por pixel, posição dos bytes R, G e B)
+FORMATOS = {
+    QImage.Format.Format_RGB32: (4, __ORDEM_32),
+    QImage.Format.Format_ARGB32: (4, __ORDEM_32),
+    QImage.Format.Format_RGB888: (3, (0, 1, 2)),
+    QImage.Format.Format_RGBA8888: (4, (0, 1, 2)),
+    QImage.Format.Format_RGBX8888: (4, (0, 1, 2))
+}
+
+
+def visao_pixels(imagem: QImage) -> tuple:
+    """
+    Visão do NumPy sobre os pixels do QImage, sem cópia. Os formatos não suportados (paleta, tons de cinza,
+    pré-multiplicado) são convertidos antes. O QImage retornado deve ser mantido enquanto a visão for usada
+    :param imagem: QImage
+    :return: (QImage, array (altura, largura, bytes por pixel), posição dos bytes R, G e B)
+    """
+    import numpy as np
+
+    if imagem.format() not in FORMATOS:
+        imagem = imagem.convertToFormat(
+            QImage.Format.Format_ARGB32 if imagem.hasAlphaChannel() else QImage.Format.Format_RGB32
+        )
+
+    bytes_pixel, ordem = FORMATOS[imagem.format()]
+    if imagem.isNull():
+        return imagem, np.zeros((0, 0, bytes_pixel), np.uint8), ordem
+
+    ponteiro = imagem.constBits()
+    ponteiro.setsize(imagem.sizeInBytes())
+    linhas = np.frombuffer(ponteiro, np.uint8).reshape(imagem.height(), imagem.bytesPerLine())
+    pixels = linhas[:, :imagem.width() * bytes_pixel].reshape(imagem.height(), imagem.width(), bytes_pixel)
+
+    return imagem, pixels, ordem
+
+
+class AmostradorCor:
+    """
+    Visão dos pixels de um QImage. A imagem é mantida pelo amostrador enquanto a visão existir
+    """
+
+    def __init__(self, imagem: QImage) -> None:
+        # os demais formatos são convertidos uma única vez, na criação
+        self.__imagem, self.__pixels, self.__ordem = visao_pixels(imagem)
+        self.__bytes_pixel = self.__pixels.shape[2]
+
+    def cor(self, x: int, y: int, lado: int = 1) -> tuple | None:
+        """
+        Média da área lado x lado centralizada no pixel, limitada às bordas da imagem
+        :param x: coluna do pixel
+        :param y: linha do pixel
+        :param lado: lado da área, em pixels
+        :return: (r, g, b) ou None fora da imagem
+        """
+        altura, largura = self.__pixels.shape[:2]
+        if not (0 <= x < largura and 0 <= y < altura):
+            return None
+
+        if lado <= 1:
+            pixel = self.__pixels[y, x]
+            return tuple(int(pixel[canal]) for canal in self.__ordem)
+
+        metade = lado // 2
+        area = self.__pixels[max(0, y - metade):y + metade + 1, max(0, x - metade):x + metade + 1]
+        media = area.reshape(-1, self.__bytes_pixel)[:, self.__ordem].mean(axis=0)
+
+        return tuple(int(round(canal)) for canal in media)
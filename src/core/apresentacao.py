@@ -0,0 +1,117 @@
+"""
+Apresentação de slides controlada pelo loop de eventos do Qt
+"""
+import random
+from typing import Callable
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+
+class ApresentacaoSlides(QObject):
+    """
+    Define a ordem dos slides (sequencial ou aleatória, com ou sem repetição) e avança no intervalo configurado.
+    Quando o próximo slide ainda não foi decodificado, o avanço espera por ele em pequenos passos, até um limite
+    """
+    avancar = pyqtSignal(int)
+    encerrada = pyqtSignal()
+
+    INTERVALO = 3500
+    ESPERA_MAXIMA = 5000
+    PASSO_ESPERA = 50
+
+    def __init__(self, pronto: Callable[[int], bool], parent=None) -> None:
+        """
+        :param pronto: função que informa se a imagem do índice já está decodificada
+        :param parent: QObject pai
+        """
+        super().__init__(parent)
+
+        self.intervalo = self.INTERVALO
+        self.aleatorio = False
+        self.repetir = True
+
+        self.__pronto = pronto
+        self.__total = 0
+        self.__ordem = []
+        self.__posicao = 0
+        self.__esperado = 0
+
+        self.__timer = QTimer(self)
+        self.__timer.setSingleShot(True)
+        self.__timer.timeout.connect(self.__tempo_esgotado)
+
+    def ativa(self) -> bool:
+        return self.__timer.isActive()
+
+    def iniciar(self, total: int, indice: int) -> None:
+        """
+        Inicia (ou reinicia) a apresentação a partir da imagem exibida
+        :param total: quantidade de imagens
+        :param indice: índice da imagem exibida
+        :return: None
+        """
+        self.__total = total
+        self.__ordem = self.__gerar_ordem(indice)
+        self.__posicao = 0
+        self.__esperado = 0
+
+        if self.__ordem:
+            self.__timer.start(self.intervalo)
+
+    def parar(self) -> None:
+        self.__timer.stop()
+        self.__ordem = []
+
+    def seguintes(self, quantidade: int = 3) -> list:
+        """
+        Próximos índices da apresentação, usados para pré-carregar as imagens na ordem em que serão exibidas
+        :param quantidade: quantidade de índices
+        :return: lista de índices
+        """
+        return self.__ordem[self.__posicao:self.__posicao + quantidade]
+
+    def __gerar_ordem(self, indice: int) -> list:
+        if self.__total <= 1:
+            return []
+
+        if self.aleatorio:
+            ordem = [x for x in range(self.__total) if x != indice]
+            random.shuffle(ordem)
+            return ordem
+
+        if self.repetir:
+            return [(indice + x) % self.__total for x in range(1, self.__total + 1)]
+
+        return list(range(indice + 1, self.__total))
+
+    def __proximo(self) -> int | None:
+        if self.__posicao >= len(self.__ordem):
+            if not self.repetir or not self.__ordem:
+                return None
+
+            # um novo ciclo começa a partir do último slide exibido
+            self.__ordem = self.__gerar_ordem(self.__ordem[-1])
+            self.__posicao = 0
+
+        return self.__ordem[self.__posicao]
+
+    def __tempo_esgotado(self) -> None:
+        proximo = self.__proximo()
+        if proximo is None:
+            self.parar()
+            # noinspection PyUnresolvedReferences
+            self.encerrada.emit()
+            return
+
+        # segura o avanço até o slide estar decodificado, evitando a troca por uma prévia
+        if not self.__pronto(proximo) and self.__esperado < self.ESPERA_MAXIMA:
+            self.__esperado += self.PASSO_ESPERA
+            self.__timer.start(self.PASSO_ESPERA)
+            return
+
+        self.__esperado = 0
+        self.__posicao += 1
+        self.__timer.start(self.intervalo)
+
+        # noinspection PyUnresolvedReferences
+        self.avancar.emit(proximo)
@@ -0,0 +1,139 @@
+"""
+Detecção das margens (bordas de cor uniforme) de uma imagem com NumPy.
+As linhas e colunas são lidas em faixas a partir de cada lado, parando na primeira faixa com conteúdo. Todos os pixels
+das margens são lidos, então conteúdo fino (um fio, uma linha de legenda) não é recortado. Nas imagens do PIL a
+comparação com a cor da borda é feita pelo próprio Pillow, por uma tabela por canal
+"""
+import numpy as np
+from PIL import Image, ImageChops
+
+TAMANHO_FAIXA = 64
+
+# modos em que a comparação com a cor da borda é feita pelo Pillow, os demais são comparados pelo NumPy
+MODOS_TABELA = ('L', 'RGB', 'RGBA')
+
+
+def __faixa(imagem: Image.Image | np.ndarray, caixa: tuple) -> np.ndarray:
+    # (esquerda, topo, direita, base) -> array (linhas, colunas, canais)
+    esquerda, topo, direita, base = caixa
+
+    if isinstance(imagem, np.ndarray):
+        pixels = imagem[topo:base, esquerda:direita]
+    else:
+        pixels = np.asarray(imagem.crop(caixa))
+
+    return pixels[:, :, np.newaxis] if pixels.ndim == 2 else pixels
+
+
+def __tamanho(imagem: Image.Image | np.ndarray) -> tuple:
+    if isinstance(imagem, np.ndarray):
+        return imagem.shape[1], imagem.shape[0]
+
+    return imagem.size
+
+
+def __fora(pixels: np.ndarray, limites: tuple) -> np.ndarray:
+    # pixels com algum canal fora dos limites da cor da borda -> array (linhas, colunas) de booleanos
+    linhas, colunas, canais = pixels.shape
+    inferior, superior = limites
+
+    # comparar as linhas achatadas com os limites repetidos é bem mais rápido que o broadcast sobre os canais
+    planos = pixels.reshape(linhas, colunas * canais)
+    fora = ((planos < np.tile(inferior, colunas)) | (planos > np.tile(superior, colunas))).reshape(pixels.shape)
+
+    diferentes = fora[:, :, 0]
+    for canal in range(1, canais):
+        diferentes = diferentes | fora[:, :, canal]
+
+    return diferentes
+
+
+def __mascara_tabela(imagem: Image.Image, caixa: tuple, tabela: list) -> np.ndarray:
+    # o mesmo que __fora, calculado pelo Pillow: a tabela leva cada canal a 0 (borda) ou 255 (conteúdo) e a conversão
+    # para tons de cinza junta os canais de cor (qualquer canal em 255 resulta em um valor diferente de 0)
+    faixa = imagem.crop(caixa).point(tabela)
+
+    if faixa.mode == 'RGB':
+        return np.asarray(faixa.convert('L'))
+    if faixa.mode == 'RGBA':
+        return np.asarray(ImageChops.lighter(faixa.convert('L'), faixa.getchannel('A')))
+
+    return np.asarray(faixa)
+
+
+def __margem(tamanho: int, mascara, minimo: float, eixo: int, reverso: bool) -> int:
+    # percorre o lado em faixas até encontrar a primeira linha (ou coluna) com conteúdo. Uma linha (eixo 1) ou coluna
+    # (eixo 0) tem conteúdo quando a fração de pixels fora da borda passa do mínimo
+    for posicao in range(0, tamanho, TAMANHO_FAIXA):
+        fim = min(posicao + TAMANHO_FAIXA, tamanho)
+        diferentes = mascara(posicao, fim)
+        linhas = np.count_nonzero(diferentes, axis=eixo) >= max(1, int(diferentes.shape[eixo] * minimo))
+
+        encontradas = np.flatnonzero(linhas[::-1] if reverso else linhas)
+        if encontradas.size:
+            return posicao + int(encontradas[0])
+
+    return tamanho
+
+
+def __detectar(mascara, largura: int, altura: int, minimo: float) -> tuple | None:
+    # mascara: (esquerda, topo, direita, base) -> array (linhas, colunas), diferente de 0 nos pixels fora da borda
+    def margem(tamanho: int, caixa, eixo: int, reverso: bool) -> int:
+        return __margem(tamanho, lambda i, f: mascara(caixa(i, f)), minimo, eixo, reverso)
+
+    topo = margem(altura, lambda i, f: (0, i, largura, f), 1, False)
+    if topo >= altura:
+        return None
+
+    base = altura - margem(altura, lambda i, f: (0, altura - f, largura, altura - i), 1, True)
+
+    # as colunas são lidas apenas entre o topo e a base já encontrados
+    esquerda = margem(largura, lambda i, f: (i, topo, f, base), 0, False)
+    direita = largura - margem(largura, lambda i, f: (largura - f, topo, largura - i, base), 0, True)
+
+    return esquerda, topo, max(direita, esquerda + 1), max(base, topo + 1)
+
+
+def cor_borda(imagem: Image.Image | np.ndarray) -> np.ndarray:
+    """
+    Cor da borda, a mediana dos quatro cantos da imagem
+    :param imagem: imagem do PIL ou array (altura, largura[, canais])
+    :return: array com um valor por canal
+    """
+    largura, altura = __tamanho(imagem)
+    cantos = [
+        __faixa(imagem, (x, y, x + 1, y + 1))[0, 0]
+        for x, y in ((0, 0), (largura - 1, 0), (0, altura - 1), (largura - 1, altura - 1))
+    ]
+
+    return np.median(np.array(cantos, dtype=np.int16), axis=0).astype(np.int16)
+
+
+def detectar_bordas(imagem: Image.Image | np.ndarray, tolerancia: int = 16, minimo: float = .005) -> tuple:
+    """
+    Detecta as margens da imagem, comparando cada linha e coluna inteira com a cor da borda.
+    Bordas irregulares (ex: scans tortos) são tratadas, pois o recorte é o menor retângulo que contém todo o conteúdo
+    :param imagem: imagem do PIL ou array (altura, largura[, canais])
+    :param tolerancia: diferença máxima, por canal, para um pixel ser considerado da borda
+    :param minimo: fração mínima de pixels diferentes para uma linha ser considerada conteúdo (ignora ruído)
+    :return: (esquerda, topo, direita, base). A imagem inteira quando não há conteúdo
+    """
+    largura, altura = __tamanho(imagem)
+    if largura < 2 or altura < 2:
+        return 0, 0, largura, altura
+
+    cor = cor_borda(imagem)
+    limites = (
+        np.clip(cor - tolerancia, 0, 255).astype(np.uint8), np.clip(cor + tolerancia, 0, 255).astype(np.uint8)
+    )
+
+    if not isinstance(imagem, np.ndarray) and imagem.mode in MODOS_TABELA:
+        tabela = [
+            0 if inferior <= valor <= superior else 255 for inferior, superior in zip(*limites) for valor in range(256)
+        ]
+        mascara = lambda caixa: __mascara_tabela(imagem, caixa, tabela)
+    else:
+        mascara = lambda caixa: __fora(__faixa(imagem, caixa), limites)
+
+    caixa = __detectar(mascara, largura, altura, minimo)
+    return caixa if caixa is not None else (0, 0, largura, altura)
@@ -0,0 +1,310 @@
+"""
+Cache LRU de imagens decodificadas e pré-carregamento das imagens vizinhas em threads de trabalho
+"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future, CancelledError
+from typing import Callable
+
+from PyQt6.QtGui import QImage
+
+from src.core.imagem import carregar_qimage, tamanho_bytes
+from src.core.memoria import GerenciadorMemoria, PRIORIDADE_PREFETCH
+
+
+class CacheImagens:
+    """
+    Cache LRU de QImages limitado pela memória ocupada e pelo limite global do GerenciadorMemoria.
+    As chaves são (modo de decodificação, caminho), permitindo que janelas em modos diferentes dividam o cache
+    """
+    __compartilhado = None
+    __lock_compartilhado = threading.Lock()
+
+    def __init__(self, limite_bytes: int) -> None:
+        self.__limite = limite_bytes
+        self.__itens = OrderedDict()
+        self.__ocupado = 0
+        self.__lock = threading.Lock()
+
+        self.acertos = 0
+        self.falhas = 0
+
+        GerenciadorMemoria.compartilhado().registrar(self, 'pré-carregamento', PRIORIDADE_PREFETCH)
+
+    @classmethod
+    def compartilhado(cls, limite_bytes: int) -> 'CacheImagens':
+        """
+        Cache único do processo, usado por todas as janelas abertas
+        :param limite_bytes: limite de memória, usado apenas na criação
+        :return: CacheImagens
+        """
+        with cls.__lock_compartilhado:
+            if cls.__compartilhado is None:
+                cls.__compartilhado = CacheImagens(limite_bytes)
+
+            return cls.__compartilhado
+
+    def obter(self, chave: tuple[str, str]) -> QImage | None:
+        """
+        Retorna a imagem da chave, marcando-a como a mais recente
+        :param chave: modo de decodificação e caminho da imagem
+        :return: QImage ou None caso não esteja no cache
+        """
+        with self.__lock:
+            imagem = self.__itens.get(chave)
+            if imagem is None:
+                self.falhas += 1
+                return None
+
+            self.__itens.move_to_end(chave)
+            self.acertos += 1
+            return imagem
+
+    def contem(self, chave: tuple[str, str]) -> bool:
+        with self.__lock:
+            return chave in self.__itens
+
+    def adicionar(self, chave: tuple[str, str], imagem: QImage) -> None:
+        """
+        Adiciona a imagem, descartando as menos recentes até caber no limite de memória
+        :param chave: modo de decodificação e caminho da imagem
+        :param imagem: QImage decodificado
+        :return: None
+        """
+        tamanho = tamanho_bytes(imagem)
+        if tamanho == 0 or tamanho > self.__limite:
+            return
+
+        # a reserva é feita sem o lock, pois o gerenciador pode pedir a este próprio cache para liberar memória
+        if not GerenciadorMemoria.compartilhado().reservar(self, tamanho):
+            return
+
+        with self.__lock:
+            if chave in self.__itens:
+                self.__ocupado -= tamanho_bytes(self.__itens.pop(chave))
+
+            while self.__itens and self.__ocupado + tamanho > self.__limite:
+                _, antiga = self.__itens.popitem(last=False)
+                self.__ocupado -= tamanho_bytes(antiga)
+
+            self.__itens[chave] = imagem
+            self.__ocupado += tamanho
+
+    def remover(self, caminho: str) -> None:
+        """
+        Descarta a imagem em todos os modos de decodificação
+        :param caminho: caminho da imagem
+        :return: None
+        """
+        with self.__lock:
+            for chave in [x for x in self.__itens if x[1] == caminho]:
+                self.__ocupado -= tamanho_bytes(self.__itens.pop(chave))
+
+    def limpar(self) -> None:
+        with self.__lock:
+            self.__itens.clear()
+            self.__ocupado = 0
+
+    @property
+    def ocupado(self) -> int:
+        return self.__ocupado
+
+    def memoria_ocupada(self) -> int:
+        return self.__ocupado
+
+    def liberar_memoria(self, necessario: int) -> int:
+        """
+        Descarta as imagens menos recentes
+        :param necessario: bytes a serem liberados
+        :return: bytes liberados
+        """
+        liberado = 0
+        with self.__lock:
+            while self.__itens and liberado < necessario:
+                _, antiga = self.__itens.popitem(last=False)
+                liberado += tamanho_bytes(antiga)
+
+            self.__ocupado -= liberado
+
+        return liberado
+
+    def __len__(self) -> int:
+        return len(self.__itens)
+
+
+class PrefetchImagens:
+    """
+    Decodifica as próximas e anteriores imagens do diretório em threads de trabalho, para que a navegação exiba
+    imagens já decodificadas
+    """
+    PROXIMAS = 3
+    ANTERIORES = 1
+    LIMITE_BYTES = 512 * 1024 * 1024
+
+    def __init__(self, proximas: int = PROXIMAS, anteriores: int = ANTERIORES, limite_bytes: int = LIMITE_BYTES,
+                 trabalhadores: int = 2, cache: CacheImagens = None) -> None:
+        """
+        :param cache: cache de imagens compartilhado com outras janelas. Sem ele é criado um cache próprio
+        """
+        self.__proximas = proximas
+        self.__anteriores = anteriores
+        self.__decodificador: Callable[[str], QImage] = carregar_qimage
+        self.__modo = ''
+
+        self.__cache = cache if cache is not None else CacheImagens(limite_bytes)
+        self.__cache_proprio = cache is None
+        self.__executor = ThreadPoolExecutor(max_workers=trabalhadores, thread_name_prefix='prefetch')
+        self.__pendentes: dict[str, Future] = {}
+        self.__desejados = set()
+        self.__lock = threading.Lock()
+
+        self.aguardados = 0
+        self.cancelados = 0
+
+    def obter(self, caminho: str) -> QImage:
+        """
+        Retorna a imagem decodificada, aproveitando o cache ou uma decodificação já em andamento
+        :param caminho: caminho completo da imagem
+        :return: QImage
+        """
+        imagem = self.__cache.obter((self.__modo, caminho))
+        if imagem is not None:
+            return imagem
+
+        with self.__lock:
+            futuro = self.__pendentes.get(caminho)
+
+        if futuro is not None and not futuro.cancel():
+            try:
+                imagem = futuro.result()
+                self.aguardados += 1
+            except CancelledError:
+                imagem = None
+
+        if imagem is None or imagem.isNull():
+            imagem = self.__decodificador(caminho)
+            self.__cache.adicionar((self.__modo, caminho), imagem)
+
+        return imagem
+
+    def agendar(self, caminho: str, lista: list, indice: int, seguintes: list = None) -> None:
+        """
+        Agenda a decodificação das imagens vizinhas ao índice atual, cancelando as que não são mais necessárias
+        :param caminho: diretório das imagens
+        :param lista: lista de arquivos do diretório
+        :param indice: índice da imagem exibida
+        :param seguintes: índices que serão exibidos a seguir (ex: apresentação aleatória), no lugar dos vizinhos
+        :return: None
+        """
+        if not lista:
+            return
+
+        if seguintes is None:
+            deslocamentos = list(range(1, self.__proximas + 1)) + [-x for x in range(1, self.__anteriores + 1)]
+            seguintes = [indice + deslocamento for deslocamento in deslocamentos]
+
+        vizinhos = []
+        for seguinte in seguintes:
+            vizinho = f'{caminho}{lista[seguinte % len(lista)]}'
+            if vizinho not in vizinhos:
+                vizinhos.append(vizinho)
+
+        with self.__lock:
+            self.__desejados = set(vizinhos) | {f'{caminho}{lista[indice % len(lista)]}'}
+
+            for item in [x for x in self.__pendentes if x not in self.__desejados]:
+                if self.__pendentes.pop(item).cancel():
+                    self.cancelados += 1
+
+            for vizinho in vizinhos:
+                if vizinho not in self.__pendentes and not self.__cache.contem((self.__modo, vizinho)):
+                    self.__pendentes[vizinho] = self.__executor.submit(
+                        self.__decodificar, vizinho, self.__modo, self.__decodificador
+                    )
+
+    def definir_decodificador(self, decodificador: Callable[[str], QImage], modo: str = '') -> None:
+        """
+        Troca a função de decodificação (ex: resolução total ou da tela). As imagens ficam no cache sob o modo em que
+        foram decodificadas, então as de outros modos não são exibidas nem descartadas, pois o cache compartilhado
+        continua sendo usado pelas outras janelas
+        :param decodificador: função que recebe o caminho e retorna o QImage
+        :param modo: identifica o decodificador, ex: '' para resolução total ou 'tela:1920x1080'
+        :return: None
+        """
+        if modo == self.__modo:
+            self.__decodificador = decodificador
+            return
+
+        self.cancelar()
+        self.__decodificador = decodificador
+        self.__modo = modo
+
+        if self.__cache_proprio:
+            self.__cache.limpar()
+
+    def pronto(self, caminho: str) -> bool:
+        """
+        Verifica se a imagem já está decodificada no cache
+        :param caminho: caminho completo da imagem
+        :return: bool
+        """
+        return self.__cache.contem((self.__modo, caminho))
+
+    def invalidar(self, caminho: str) -> None:
+        """
+        Descarta a imagem do cache em todos os modos, ex: após ser sobrescrita no disco
+        :param caminho: caminho completo da imagem
+        :return: None
+        """
+        with self.__lock:
+            futuro = self.__pendentes.pop(caminho, None)
+            if futuro is not None:
+                futuro.cancel()
+
+        self.__cache.remover(caminho)
+
+    def cancelar(self) -> None:
+        with self.__lock:
+            self.__desejados = set()
+            for futuro in self.__pendentes.values():
+                if futuro.cancel():
+                    self.cancelados += 1
+            self.__pendentes.clear()
+
+    def encerrar(self) -> None:
+        self.cancelar()
+        self.__executor.shutdown(wait=False, cancel_futures=True)
+
+        # o cache compartilhado continua sendo usado pelas outras janelas
+        if self.__cache_proprio:
+            self.__cache.limpar()
+
+    def estatisticas(self) -> dict:
+        """
+        Contadores de acertos e falhas do cache
+        :return: dict
+        """
+        return {
+            'acertos': self.__cache.acertos,
+            'falhas': self.__cache.falhas,
+            'aguardados': self.aguardados,
+            'cancelados': self.cancelados,
+            'imagens': len(self.__cache),
+            'bytes': self.__cache.ocupado
+        }
+
+    def __decodificar(self, caminho: str, modo: str, decodificador: Callable[[str], QImage]) -> QImage | None:
+        with self.__lock:
+            if caminho not in self.__desejados:
+                self.__pendentes.pop(caminho, None)
+                return None
+
+        imagem = decodificador(caminho)
+
+        # o modo é o do agendamento, caso o decodificador tenha sido trocado durante a decodificação
+        with self.__lock:
+            self.__pendentes.pop(caminho, None)
+            if caminho in self.__desejados and modo == self.__modo:
+                self.__cache.adicionar((modo, caminho), imagem)
+
+        return imagem
@@ -0,0 +1,187 @@
+"""
+Carregamento assíncrono de imagens: listagem do diretório, ordenação e decodificação fora da thread da GUI
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from PIL import Image
+from PyQt6.QtCore import QObject, pyqtSignal, QDir, QSize
+from PyQt6.QtGui import QImage
+
+from src.core.cache import PrefetchImagens
+from src.core.diretorio import IndiceDiretorio
+from src.core.imagem import carregar_previa, carregar_qimage
+from src.core.metadados import CacheMetadados
+from src.core.ordenacao import NATURAL
+
+
+def processar_caminho(path: str, extensoes: list, ordem: str = None) -> str:
+    """
+    Resolve o caminho recebido, escolhendo a primeira imagem caso seja um diretório
+    :param path: caminho de arquivo ou diretório
+    :param extensoes: extensões aceitas
+    :param ordem: ordenação da lista
+    :return: caminho do arquivo
+    """
+    if path == "":
+        return QDir.homePath()
+
+    arquivo = ""
+    if os.path.isdir(path):
+        path = path if path.endswith('/') else f'{path}/'
+        lista = IndiceDiretorio.obter(path, extensoes, ordem).lista()
+
+        if lista:
+            arquivo = lista[0]
+
+    return f'{path}{arquivo}'
+
+
+class CarregadorImagens(QObject):
+    """
+    Executa o carregamento em uma thread de trabalho e devolve o resultado por sinais. Cada pedido recebe um número
+    e apenas o resultado do pedido mais recente é entregue, os anteriores são descartados.
+    Quando a imagem ainda não está decodificada, uma prévia em baixa resolução é entregue antes da imagem completa
+    """
+    progresso = pyqtSignal(int, str)
+    previa = pyqtSignal(int, dict, QImage)
+    carregado = pyqtSignal(int, dict, QImage)
+    falhou = pyqtSignal(int, str)
+
+    def __init__(self, extensoes: list, prefetch: PrefetchImagens, parent=None) -> None:
+        super().__init__(parent)
+
+        self.__extensoes = extensoes
+        self.__prefetch = prefetch
+        self.usar_previa = True
+        self.ordem = NATURAL
+        self.__executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='carregador')
+        self.__lock = threading.Lock()
+        self.__pedido = 0
+
+    @property
+    def pedido_atual(self) -> int:
+        return self.__pedido
+
+    def carregar(self, caminho: str, alvo: QSize) -> int:
+        """
+        Inicia o carregamento da imagem, invalidando qualquer pedido anterior
+        :param caminho: caminho do arquivo ou diretório
+        :param alvo: tamanho da área de exibição, usado pela prévia
+        :return: número do pedido
+        """
+        pedido = self.__novo_pedido()
+        self.__executor.submit(self.__executar, pedido, caminho, alvo)
+        return pedido
+
+    def decodificar(self, info: dict, alvo: QSize) -> int:
+        """
+        Decodifica outra imagem de um diretório já listado, sem listar o diretório novamente
+        :param info: dicionário com path, indice e lista
+        :param alvo: tamanho da área de exibição, usado pela prévia
+        :return: número do pedido
+        """
+        pedido = self.__novo_pedido()
+        self.__executor.submit(self.__executar_decodificacao, pedido, dict(info), alvo)
+        return pedido
+
+    def decodificar_completa(self, info: dict) -> int:
+        """
+        Decodifica a imagem atual em resolução total, para substituir uma versão reduzida já exibida
+        :param info: dicionário com path, indice e lista
+        :return: número do pedido
+        """
+        pedido = self.__novo_pedido()
+        self.__executor.submit(self.__executar_completa, pedido, dict(info, completa=True))
+        return pedido
+
+    def __novo_pedido(self) -> int:
+        with self.__lock:
+            self.__pedido += 1
+            return self.__pedido
+
+    def cancelar(self) -> None:
+        with self.__lock:
+            self.__pedido += 1
+
+    def encerrar(self) -> None:
+        self.cancelar()
+        self.__executor.shutdown(wait=False, cancel_futures=True)
+
+    def __obsoleto(self, pedido: int) -> bool:
+        with self.__lock:
+            return pedido != self.__pedido
+
+    def __executar(self, pedido: int, caminho: str, alvo: QSize) -> None:
+        try:
+            if self.__obsoleto(pedido):
+                return
+
+            self.progresso.emit(pedido, "Listando diretório...")
+            path = Path(processar_caminho(caminho, self.__extensoes, self.ordem))
+            dir_path = f"/{'/'.join(path.parts[1:-1])}/"
+
+            if not path.exists():
+                self.falhou.emit(pedido, f"{caminho} não encontrado")
+                return
+
+            indice_diretorio = IndiceDiretorio.obter(dir_path, self.__extensoes, self.ordem)
+            lista_final = indice_diretorio.lista()
+
+            indice = None
+            if path.is_file():
+                indice = indice_diretorio.indice(path.name)
+
+            # os metadados das imagens do diretório são lidos em segundo plano, aproveitando o 'stat' do índice
+            CacheMetadados.compartilhado().preencher(dir_path, lista_final, indice_diretorio.stats(), indice or 0)
+
+            self.__executar_decodificacao(pedido, {
+                "path": dir_path,
+                "indice": indice or 0,
+                "lista": lista_final
+            }, alvo)
+
+        except (IndexError, OSError, ValueError, SyntaxError, Image.DecompressionBombError) as erro:
+            self.falhou.emit(pedido, str(erro))
+
+    def __executar_decodificacao(self, pedido: int, info: dict, alvo: QSize) -> None:
+        try:
+            if self.__obsoleto(pedido):
+                return
+
+            arquivo = info['lista'][info['indice']]
+            caminho = f"{info['path']}{arquivo}"
+
+            if self.usar_previa and not self.__prefetch.pronto(caminho):
+                previa = carregar_previa(caminho, alvo.width(), alvo.height())
+
+                if previa is not None and not self.__obsoleto(pedido):
+                    self.previa.emit(pedido, info, previa)
+
+            if self.__obsoleto(pedido):
+                return
+
+            self.progresso.emit(pedido, f"Decodificando {arquivo}...")
+            decodificada = self.__prefetch.obter(caminho)
+
+            if self.__obsoleto(pedido):
+                return
+
+            self.carregado.emit(pedido, info, decodificada)
+
+        except (IndexError, OSError, ValueError, SyntaxError, Image.DecompressionBombError) as erro:
+            self.falhou.emit(pedido, str(erro))
+
+    def __executar_completa(self, pedido: int, info: dict) -> None:
+        try:
+            arquivo = info['lista'][info['indice']]
+            self.progresso.emit(pedido, f"Decodificando {arquivo} em resolução total...")
+            decodificada = carregar_qimage(f"{info['path']}{arquivo}")
+
+            if not self.__obsoleto(pedido):
+                self.carregado.emit(pedido, info, decodificada)
+
+        except (IndexError, OSError, ValueError, SyntaxError, Image.DecompressionBombError) as erro:
+            self.falhou.emit(pedido, str(erro))
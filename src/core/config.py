@@ -1,72 +1,184 @@
 """
-Classe responsável pelo gerenciamento de configurações '.ini' do programa
+Classe responsável pelo gerenciamento de configurações '.ini' do programa.
+O arquivo é lido uma única vez por processo e as alterações são gravadas em segundo plano, agrupadas
 """
+import atexit
+import os
+import tempfile
+import threading
 from configparser import ConfigParser
 from pathlib import Path
 
 
 class Config:
     """
-    Classe de configurações
+    Classe de configurações. Todas as instâncias compartilham o mesmo estado em memória
     """
     __CAMINHO = f'{str(Path.home())}/.DoImageViewer/config.ini'
+    __PADRAO = '\n'.join([
+        '[editor]',
+        f'caminho = {Path.home()}',
+        'toolbar_diretorio = True',
+        'antialiasing = True',
+        'resolucao_tela = False',
+        'ordenacao = natural',
+        'miniaturas = False',
+        'informacoes = False',
+        'filtros = False',
+        'ajustes = False',
+        'histograma = False',
+        'amostra_cor = 1',
+        'cor_cursor = False',
+        'recentes = ,,',
+        '[apresentacao]',
+        'intervalo = 3.5',
+        'aleatorio = False',
+        'repetir = True',
+        '[memoria]',
+        'limite_mb = 0',
+        '[window]',
+        'numero = 1',
+        'nome = None',
+        'tamanho = 958, 1008',
+        'posicao = 0, 0'
+    ])
+
+    # intervalo para agrupar várias alterações em uma única gravação
+    ATRASO_GRAVACAO = 1.0
+
+    __config = None
+    __lock = threading.RLock()
+    __timer = None
+    __alterado = False
+    __em_memoria = False
 
     def __init__(self) -> None:
         super().__init__()
 
-        if not Path(self.__CAMINHO).is_file():
-            with open(self.__CAMINHO, 'a') as file:
-                file.writelines([
-                    '[editor]\n',
-                    f'caminho = {Path.home()}\n',
-                    'toolbar_diretorio = True\n',
-                    'antialiasing = True\n',
-                    'recentes = ,,\n',
-                    '[window]\n',
-                    'numero = 1\n',
-                    'nome = None\n',
-                    'tamanho = 958, 1008\n',
-                    'posicao = 0, 0\n'
-                ])
-
-        self.__config = ConfigParser()
-        self.__config.read(self.__CAMINHO)
-
-    def get_config(self, secao: str = None, opcao: str = None) -> str:
+        with Config.__lock:
+            if Config.__config is None:
+                Config.__carregar()
+
+    @classmethod
+    def __carregar(cls) -> None:
+        cls.__config = ConfigParser()
+        cls.__config.read_string(cls.__PADRAO)
+
+        if Path(cls.__CAMINHO).is_file():
+            cls.__config.read(cls.__CAMINHO)
+        else:
+            # cria o arquivo com os valores padrão
+            cls.__agendar_gravacao()
+
+        atexit.register(cls.salvar)
+
+    @classmethod
+    def em_memoria(cls, valores: dict = None) -> None:
+        """
+        Usa apenas configurações em memória, sem ler ou gravar o arquivo (ex: testes)
+        :param valores: dicionário {secao: {opcao: valor}} aplicado sobre os valores padrão
+        :return: None
+        """
+        with cls.__lock:
+            cls.__cancelar_timer()
+            cls.__em_memoria = True
+            cls.__alterado = False
+
+            cls.__config = ConfigParser()
+            cls.__config.read_string(cls.__PADRAO)
+            cls.__config.read_dict(valores or {})
+
+    def get_config(self, secao: str = None, opcao: str = None, padrao: str = None) -> str:
         """
         Método de leitura das configurações
         :param secao: .ini section
         :param opcao: .ini option
+        :param padrao: valor usado quando a opção não existe no arquivo
         :return: .ini value
         """
         if secao is not None:
-            return self.__config.get(secao, opcao)
+            with Config.__lock:
+                if padrao is not None:
+                    return Config.__config.get(secao, opcao, fallback=padrao)
+                return Config.__config.get(secao, opcao)
         return ''
 
-    def get_config_boolean(self, secao: str = None, opcao: str = None) -> bool:
+    def get_config_boolean(self, secao: str = None, opcao: str = None, padrao: bool = False) -> bool:
         """
         Método de leitura das configurações booleanas
         :param secao: .ini section
         :param opcao: .ini option
+        :param padrao: valor usado quando a opção não existe no arquivo
         :return: '.ini' bool value
         """
         if secao is not None:
-            return self.__config.getboolean(secao, opcao)
+            with Config.__lock:
+                return Config.__config.getboolean(secao, opcao, fallback=padrao)
         return False
 
     def get_window_info(self, opcao: str = None) -> (int, int):
-        config = self.__config.get('window', opcao).split(',')
+        with Config.__lock:
+            config = Config.__config.get('window', opcao).split(',')
 
         return int(config[0]), int(config[1])
 
     def set_config(self, secao: str = None, opcao: str = None, valor: any = None) -> None:
         """
-        Salvar as configurações no arquivo .ini
+        Altera a configuração em memória e agenda a gravação do arquivo .ini
         :param secao: .ini section
         :param opcao: .ini option
         :param valor: .ini value
         :return: None
         """
-        self.__config.set(secao, opcao, str(valor))
-        with open(self.__CAMINHO, 'w') as configfile:
-            self.__config.write(configfile, True)
+        with Config.__lock:
+            if Config.__config.get(secao, opcao, fallback=None) == str(valor):
+                return
+
+            Config.__config.set(secao, opcao, str(valor))
+            Config.__agendar_gravacao()
+
+    @classmethod
+    def __agendar_gravacao(cls) -> None:
+        cls.__alterado = True
+        if cls.__em_memoria:
+            return
+
+        cls.__cancelar_timer()
+        cls.__timer = threading.Timer(cls.ATRASO_GRAVACAO, cls.salvar)
+        cls.__timer.daemon = True
+        cls.__timer.start()
+
+    @classmethod
+    def __cancelar_timer(cls) -> None:
+        if cls.__timer is not None:
+            cls.__timer.cancel()
+            cls.__timer = None
+
+    @classmethod
+    def salvar(cls) -> None:
+        """
+        Grava as alterações pendentes imediatamente. O arquivo é escrito em um temporário e renomeado,
+        para nunca ficar pela metade
+        :return: None
+        """
+        with cls.__lock:
+            cls.__cancelar_timer()
+            if not cls.__alterado or cls.__em_memoria or cls.__config is None:
+                return
+
+            diretorio = os.path.dirname(cls.__CAMINHO)
+            os.makedirs(diretorio, exist_ok=True)
+
+            descritor, temporario = tempfile.mkstemp(prefix='.config-', suffix='.ini', dir=diretorio)
+            try:
+                with os.fdopen(descritor, 'w') as configfile:
+                    cls.__config.write(configfile, True)
+                    configfile.flush()
+                    os.fsync(configfile.fileno())
+                os.replace(temporario, cls.__CAMINHO)
+            except OSError:
+                if os.path.exists(temporario):
+                    os.remove(temporario)
+                return
+
+            cls.__alterado = False
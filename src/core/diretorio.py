@@ -0,0 +1,331 @@
+"""
+Índice das imagens de um diretório, criado uma única vez e atualizado de forma incremental
+"""
+import bisect
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt6.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+
+from src.core.ordenacao import NATURAL, funcao_chave, ordenar
+
+
+class IndiceDiretorio:
+    """
+    Lista ordenada das imagens de um diretório, com o resultado do 'stat' de cada arquivo.
+    Os índices ficam em cache por diretório e são revalidados pelo 'mtime' do próprio diretório
+    """
+    __indices = {}
+    __lock_indices = threading.Lock()
+
+    def __init__(self, caminho: str, extensoes: list, ordem: str = NATURAL) -> None:
+        self.caminho = caminho
+        self.__extensoes = tuple(extensoes)
+        self.__lock = threading.RLock()
+        self.__ordem = ordem
+        self.__chave = funcao_chave(ordem, caminho)
+
+        self.__stats = {}
+        self.__nomes = []
+        self.__chaves = []
+        self.__mtime_diretorio = 0
+
+        self.__varrer_completo()
+
+    @classmethod
+    def obter(cls, caminho: str, extensoes: list, ordem: str = None) -> 'IndiceDiretorio':
+        """
+        Retorna o índice do diretório, criando-o na primeira vez e atualizando-o caso o diretório tenha mudado
+        :param caminho: diretório
+        :param extensoes: extensões aceitas
+        :param ordem: ordenação da lista, None mantém a atual
+        :return: IndiceDiretorio
+        """
+        with cls.__lock_indices:
+            indice = cls.__indices.get(caminho)
+
+            if indice is None:
+                indice = IndiceDiretorio(caminho, extensoes, ordem or NATURAL)
+                cls.__indices[caminho] = indice
+                return indice
+
+        if indice.desatualizado():
+            indice.atualizar()
+
+        if ordem is not None:
+            indice.definir_ordem(ordem)
+
+        return indice
+
+    @classmethod
+    def em_cache(cls, caminho: str) -> 'IndiceDiretorio | None':
+        with cls.__lock_indices:
+            return cls.__indices.get(caminho)
+
+    def __aceito(self, nome: str) -> bool:
+        return '.' in nome and not nome.startswith('.') and nome.rsplit('.', 1)[-1].lower() in self.__extensoes
+
+    def __escanear(self, inodes: dict) -> dict:
+        # o inode vem do próprio scandir, sem stat: um arquivo conhecido com outro inode foi substituído (ex: por
+        # os.replace) e recebe um novo stat, os regravados no lugar não alteram o diretório e passam por 'revalidar'
+        encontrados = {}
+        with os.scandir(self.caminho) as entradas:
+            for entrada in entradas:
+                if not self.__aceito(entrada.name):
+                    continue
+
+                try:
+                    if not entrada.is_file():
+                        continue
+                    conhecido = inodes.get(entrada.name) == entrada.inode()
+                    encontrados[entrada.name] = None if conhecido else entrada.stat()
+                except OSError:
+                    continue
+
+        return encontrados
+
+    @staticmethod
+    def __alterado(anterior: os.stat_result, atual: os.stat_result) -> bool:
+        versao = lambda stat: (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        return versao(anterior) != versao(atual)
+
+    def __varrer_completo(self) -> None:
+        with self.__lock:
+            self.__mtime_diretorio = os.stat(self.caminho).st_mtime_ns
+            self.__stats = self.__escanear({})
+            self.__chaves, self.__nomes = ordenar(self.__stats, self.__ordem, self.caminho)
+
+    def definir_ordem(self, ordem: str) -> None:
+        """
+        Reordena a lista caso a ordem seja diferente da atual
+        :param ordem: natural, modificacao, tamanho ou data_exif
+        :return: None
+        """
+        with self.__lock:
+            if ordem == self.__ordem:
+                return
+
+            self.__ordem = ordem
+            self.__chave = funcao_chave(ordem, self.caminho)
+            self.__chaves, self.__nomes = ordenar(self.__stats, self.__ordem, self.caminho)
+
+    def desatualizado(self) -> bool:
+        try:
+            return os.stat(self.caminho).st_mtime_ns != self.__mtime_diretorio
+        except OSError:
+            return True
+
+    def atualizar(self) -> tuple:
+        """
+        Atualiza o índice com os arquivos adicionados, removidos e alterados, sem reordenar a lista inteira
+        :return: (adicionados, removidos, alterados)
+        """
+        return self.aplicar(*self.escanear_alteracoes())
+
+    def escanear_alteracoes(self) -> tuple:
+        """
+        Lista o diretório sem bloquear o índice, podendo ser executado em uma thread de trabalho. Apenas os arquivos
+        novos ou substituídos recebem um stat
+        :return: (mtime do diretório ou None caso não possa ser lido, nome -> os.stat_result ou None quando o arquivo
+        já conhecido não mudou)
+        """
+        with self.__lock:
+            inodes = {nome: stat.st_ino for nome, stat in self.__stats.items()}
+
+        try:
+            return os.stat(self.caminho).st_mtime_ns, self.__escanear(inodes)
+        except OSError:
+            return None, {}
+
+    def aplicar(self, mtime: int | None, encontrados: dict) -> tuple:
+        """
+        Aplica ao índice o resultado de 'escanear_alteracoes'
+        :param mtime: mtime do diretório na varredura
+        :param encontrados: arquivos encontrados na varredura
+        :return: (adicionados, removidos, alterados)
+        """
+        with self.__lock:
+            if mtime is not None:
+                self.__mtime_diretorio = mtime
+
+            # apenas os arquivos com stat são comparados, os demais não mudaram desde a última varredura
+            novos = {nome: stat for nome, stat in encontrados.items() if stat is not None}
+            removidos = [nome for nome in self.__stats if nome not in encontrados]
+            adicionados = [nome for nome in novos if nome not in self.__stats]
+            alterados = [
+                nome for nome, stat in novos.items()
+                if nome in self.__stats and self.__alterado(self.__stats[nome], stat)
+            ]
+
+            # os alterados são reposicionados, a chave de ordenação pode depender da data ou do tamanho
+            for nome in removidos + alterados:
+                posicao = self.__posicao(nome)
+                if posicao is not None:
+                    del self.__chaves[posicao]
+                    del self.__nomes[posicao]
+
+            for nome in removidos:
+                del self.__stats[nome]
+
+            for nome in adicionados + alterados:
+                self.__stats[nome] = novos[nome]
+                chave = self.__chave(nome, novos[nome])
+                posicao = bisect.bisect_left(self.__chaves, chave)
+                self.__chaves.insert(posicao, chave)
+                self.__nomes.insert(posicao, nome)
+
+            return adicionados, removidos, alterados
+
+    def revalidar(self, nome: str) -> bool:
+        """
+        Refaz o stat de um arquivo gravado pelo programa. Regravar um arquivo no lugar não altera a data do diretório,
+        então não é percebido por 'desatualizado'
+        :param nome: nome do arquivo
+        :return: True quando o arquivo mudou
+        """
+        try:
+            atual = os.stat(os.path.join(self.caminho, nome))
+        except OSError:
+            return False
+
+        with self.__lock:
+            anterior = self.__stats.get(nome)
+            if anterior is None or not self.__alterado(anterior, atual):
+                return False
+
+            posicao = self.__posicao(nome)
+            if posicao is not None:
+                del self.__chaves[posicao]
+                del self.__nomes[posicao]
+
+            self.__stats[nome] = atual
+            chave = self.__chave(nome, atual)
+            posicao = bisect.bisect_left(self.__chaves, chave)
+            self.__chaves.insert(posicao, chave)
+            self.__nomes.insert(posicao, nome)
+
+            return True
+
+    def __posicao(self, nome: str) -> int | None:
+        stat = self.__stats.get(nome)
+        if stat is None:
+            return None
+
+        chave = self.__chave(nome, stat)
+        posicao = bisect.bisect_left(self.__chaves, chave)
+
+        # nomes que diferem só em maiúsculas têm a mesma chave
+        while posicao < len(self.__nomes) and self.__chaves[posicao] == chave:
+            if self.__nomes[posicao] == nome:
+                return posicao
+            posicao += 1
+
+        return None
+
+    def indice(self, nome: str) -> int | None:
+        """
+        Posição do arquivo na lista ordenada, por busca binária
+        :param nome: nome do arquivo
+        :return: índice ou None caso não exista
+        """
+        with self.__lock:
+            return self.__posicao(nome)
+
+    def lista(self) -> list:
+        """
+        Cópia da lista ordenada de arquivos
+        :return: list
+        """
+        with self.__lock:
+            return list(self.__nomes)
+
+    def stat(self, nome: str) -> os.stat_result | None:
+        with self.__lock:
+            return self.__stats.get(nome)
+
+    def stats(self) -> dict:
+        """
+        Cópia dos resultados do 'stat' de todos os arquivos
+        :return: nome -> os.stat_result
+        """
+        with self.__lock:
+            return dict(self.__stats)
+
+
+class ObservadorDiretorio(QObject):
+    """
+    Observa o diretório exibido e atualiza o seu índice quando arquivos são adicionados ou removidos. O diretório é
+    listado em uma thread de trabalho e apenas a diferença é aplicada na thread da GUI
+    """
+    alterado = pyqtSignal(str)
+    varrido = pyqtSignal(object)
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+
+        self.__observador = QFileSystemWatcher(self)
+        self.__observador.directoryChanged.connect(self.__agendar)
+
+        # agrupa as várias notificações geradas ao copiar muitos arquivos de uma vez
+        self.__timer = QTimer(self)
+        self.__timer.setSingleShot(True)
+        self.__timer.setInterval(250)
+        self.__timer.timeout.connect(self.__atualizar)
+        self.__pendentes = set()
+
+        # uma varredura por vez, as notificações recebidas durante ela são atendidas ao final
+        self.__executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='observador')
+        self.__varrendo = False
+        # noinspection PyUnresolvedReferences
+        self.varrido.connect(self.__aplicar)
+
+    def observar(self, caminho: str) -> None:
+        diretorios = self.__observador.directories()
+        if diretorios == [caminho] or diretorios == [caminho.rstrip('/')]:
+            return
+
+        if diretorios:
+            self.__observador.removePaths(diretorios)
+        if caminho and os.path.isdir(caminho):
+            self.__observador.addPath(caminho)
+
+    def __agendar(self, caminho: str) -> None:
+        self.__pendentes.add(caminho)
+        self.__timer.start()
+
+    def encerrar(self) -> None:
+        self.__timer.stop()
+        self.__pendentes.clear()
+        self.__executor.shutdown(wait=False, cancel_futures=True)
+
+    def __atualizar(self) -> None:
+        if self.__varrendo or not self.__pendentes:
+            return
+
+        caminhos = [x if x.endswith('/') else f'{x}/' for x in self.__pendentes]
+        self.__pendentes.clear()
+        self.__varrendo = True
+        self.__executor.submit(self.__varrer, caminhos)
+
+    def __varrer(self, caminhos: list) -> None:
+        varreduras = {}
+        try:
+            for caminho in caminhos:
+                indice = IndiceDiretorio.em_cache(caminho)
+                if indice is not None:
+                    varreduras[caminho] = indice.escanear_alteracoes()
+        finally:
+            # noinspection PyUnresolvedReferences
+            self.varrido.emit(varreduras)
+
+    def __aplicar(self, varreduras: dict) -> None:
+        self.__varrendo = False
+
+        for caminho, varredura in varreduras.items():
+            indice = IndiceDiretorio.em_cache(caminho)
+            if indice is not None and any(indice.aplicar(*varredura)):
+                # noinspection PyUnresolvedReferences
+                self.alterado.emit(caminho)
+
+        self.__atualizar()
@@ -0,0 +1,380 @@
+"""
+Edição das imagens em memória: a imagem original é decodificada uma única vez e os filtros, correções e recortes
+são aplicados sobre ela, sem gravar arquivos temporários.
+As edições formam uma pilha não destrutiva, em que o resultado de cada etapa fica guardado
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable
+
+from PIL import Image
+
+from src.core.filtros import FILTROS_LUT, aplicar_lut
+from src.core.memoria import GerenciadorMemoria, PRIORIDADE_EDICAO, bytes_pil
+from src.core.orientacao import orientacao_exif, orientar
+
+# nomes das funções do pilgram. O pilgram (e o NumPy) só é importado quando o primeiro filtro é aplicado,
+# o que mantém a inicialização do programa rápida
+FILTROS = ('aden', 'clarendon', 'earlybird', 'hudson', 'lark', 'lofi', 'maven', 'reyes', 'valencia', 'walden')
+
+# fatores aceitos pelas correções de cor e nitidez (1 mantém a imagem)
+FATOR_MINIMO = 0.0
+FATOR_MAXIMO = 2.0
+
+# os realces só são reaproveitados nas versões reduzidas, a resolução total é processada uma única vez
+LIMITE_REALCES = 4
+PIXELS_REALCE = 4_000_000
+
+
+class FonteEdicao:
+    """
+    Mantém decodificada a imagem original que está sendo editada, revalidada pela data de modificação do arquivo
+    """
+
+    def __init__(self) -> None:
+        self.__lock = threading.Lock()
+        self.__chave = None
+        self.__imagem = None
+        self.__proxy = None
+        self.__ocupado = 0
+
+        GerenciadorMemoria.compartilhado().registrar(self, 'edição (original)', PRIORIDADE_EDICAO)
+
+    def __recontar(self) -> None:
+        proxy = self.__proxy[1] if self.__proxy is not None else None
+        self.__ocupado = bytes_pil(self.__imagem) + (bytes_pil(proxy) if proxy is not self.__imagem else 0)
+
+    def obter(self, caminho: str) -> Image.Image:
+        """
+        Retorna a imagem original, decodificando o arquivo apenas quando ele muda
+        :param caminho: caminho completo do arquivo
+        :return: imagem do PIL em RGB ou RGBA
+        """
+        stat = os.stat(caminho)
+        chave = (caminho, stat.st_mtime_ns, stat.st_size)
+
+        with self.__lock:
+            if chave != self.__chave:
+                with Image.open(caminho) as im:
+                    im.load()
+                    im = orientar(im, orientacao_exif(im))
+                    if im.mode not in ('RGB', 'RGBA'):
+                        im = im.convert('RGBA' if 'A' in im.getbands() or 'transparency' in im.info else 'RGB')
+
+                self.__chave = chave
+                self.__imagem = im
+                self.__proxy = None
+                self.__recontar()
+                decodificada = True
+            else:
+                decodificada = False
+
+            imagem = self.__imagem
+
+        # fora do lock, pois o gerenciador pode pedir a esta própria fonte para liberar memória
+        if decodificada:
+            GerenciadorMemoria.compartilhado().reservar(self)
+
+        return imagem
+
+    def proxy(self, caminho: str, largura: int, altura: int) -> Image.Image:
+        """
+        Versão reduzida da imagem original, usada para exibir as edições sem processar todos os pixels
+        :param caminho: caminho completo do arquivo
+        :param largura: largura máxima
+        :param altura: altura máxima
+        :return: imagem do PIL, a própria original quando ela já cabe no tamanho pedido
+        """
+        original = self.obter(caminho)
+
+        with self.__lock:
+            if self.__proxy is None or self.__proxy[0] != (largura, altura):
+                im = original
+                if original.width > largura or original.height > altura:
+                    im = original.copy()
+                    im.thumbnail((largura, altura), Image.Resampling.LANCZOS, reducing_gap=2.0)
+                self.__proxy = ((largura, altura), im)
+                self.__recontar()
+
+            return self.__proxy[1]
+
+    def limpar(self) -> None:
+        with self.__lock:
+            self.__chave = None
+            self.__imagem = None
+            self.__proxy = None
+            self.__ocupado = 0
+
+    def memoria_ocupada(self) -> int:
+        return self.__ocupado
+
+    def liberar_memoria(self, necessario: int) -> int:
+        """
+        Descarta a versão reduzida e, se ainda for necessário, a original, que é decodificada novamente no próximo uso
+        :param necessario: bytes a serem liberados
+        :return: bytes liberados
+        """
+        with self.__lock:
+            anterior = self.__ocupado
+            self.__proxy = None
+            self.__recontar()
+
+            if anterior - self.__ocupado < necessario:
+                self.__chave = None
+                self.__imagem = None
+                self.__ocupado = 0
+
+            return anterior - self.__ocupado
+
+
+def aplicar_filtro(im: Image.Image, nome: str) -> Image.Image:
+    """
+    Aplica um dos filtros do pilgram, pela tabela de cor 3D calculada na primeira vez que o filtro é usado
+    (apenas nos filtros em que ela é mais rápida, os demais são aplicados pelo próprio pilgram)
+    :param im: imagem do PIL
+    :param nome: nome do filtro
+    :return: nova imagem
+    """
+    if nome not in FILTROS:
+        raise KeyError(nome)
+
+    if nome in FILTROS_LUT:
+        return aplicar_lut(im, nome)
+
+    import pilgram
+    return getattr(pilgram, nome)(im)
+
+
+class CacheRealces:
+    """
+    O ImageEnhance calcula a imagem de referência (tons de cinza ou suavizada) ao ser criado. Com a mesma entrada,
+    como no arraste dos controles de ajuste, ela é reaproveitada e cada novo fator custa apenas uma mistura
+    """
+    __compartilhado = None
+    __lock_compartilhado = threading.Lock()
+
+    def __init__(self) -> None:
+        self.__itens = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__ocupado = 0
+
+        GerenciadorMemoria.compartilhado().registrar(self, 'edição (realces)', PRIORIDADE_EDICAO)
+
+    @classmethod
+    def compartilhado(cls) -> 'CacheRealces':
+        """
+        Cache único do processo
+        :return: CacheRealces
+        """
+        with cls.__lock_compartilhado:
+            if cls.__compartilhado is None:
+                cls.__compartilhado = CacheRealces()
+
+            return cls.__compartilhado
+
+    @staticmethod
+    def __tamanho(item: tuple) -> int:
+        # a imagem de entrada é mantida junto, para que o seu id não seja reaproveitado por outra
+        return bytes_pil(item[0]) + bytes_pil(item[1].degenerate)
+
+    def obter(self, im: Image.Image, classe: type) -> 'ImageEnhance._Enhance':
+        """
+        Realce da imagem, criado apenas na primeira vez
+        :param im: imagem do PIL
+        :param classe: classe do ImageEnhance
+        :return: instância de classe sobre a imagem
+        """
+        if im.width * im.height > PIXELS_REALCE:
+            return classe(im)
+
+        chave = (id(im), classe)
+        with self.__lock:
+            item = self.__itens.get(chave)
+            if item is not None and item[0] is im:
+                self.__itens.move_to_end(chave)
+                return item[1]
+
+        realce = classe(im)
+        with self.__lock:
+            anterior = self.__itens.pop(chave, None)
+            if anterior is not None:
+                self.__ocupado -= self.__tamanho(anterior)
+
+            self.__itens[chave] = (im, realce)
+            self.__ocupado += self.__tamanho(self.__itens[chave])
+            while len(self.__itens) > LIMITE_REALCES:
+                self.__ocupado -= self.__tamanho(self.__itens.popitem(last=False)[1])
+
+        GerenciadorMemoria.compartilhado().reservar(self)
+        return realce
+
+    def memoria_ocupada(self) -> int:
+        return self.__ocupado
+
+    def liberar_memoria(self, necessario: int) -> int:
+        liberado = 0
+        with self.__lock:
+            while self.__itens and liberado < necessario:
+                tamanho = self.__tamanho(self.__itens.popitem(last=False)[1])
+                self.__ocupado -= tamanho
+                liberado += tamanho
+
+        return liberado
+
+
+def corrigir_cor(im: Image.Image, fator: float) -> Image.Image:
+    from PIL import ImageEnhance
+
+    return CacheRealces.compartilhado().obter(im, ImageEnhance.Color).enhance(fator)
+
+
+def corrigir_nitidez(im: Image.Image, fator: float) -> Image.Image:
+    from PIL import ImageEnhance
+
+    return CacheRealces.compartilhado().obter(im, ImageEnhance.Sharpness).enhance(fator)
+
+
+def recortar(im: Image.Image, caixa: tuple) -> Image.Image:
+    """
+    Recorta a imagem
+    :param im: imagem do PIL
+    :param caixa: (esquerda, topo, direita, base), em frações do tamanho da imagem
+    :return: nova imagem
+    """
+    esquerda, topo = round(caixa[0] * im.width), round(caixa[1] * im.height)
+    direita, base = round(caixa[2] * im.width), round(caixa[3] * im.height)
+
+    # nas versões reduzidas um recorte muito pequeno pode arredondar para zero pixels
+    return im.crop((esquerda, topo, max(direita, esquerda + 1), max(base, topo + 1)))
+
+
+FILTRO = 'filtro'
+COR = 'cor'
+NITIDEZ = 'nitidez'
+RECORTE = 'recorte'
+
+OPERACOES = {
+    FILTRO: aplicar_filtro,
+    COR: corrigir_cor,
+    NITIDEZ: corrigir_nitidez,
+    RECORTE: recortar
+}
+
+
+def aplicar_operacoes(origem: Image.Image, operacoes: list,
+                      cancelado: Callable[[], bool] = lambda: False) -> Image.Image | None:
+    """
+    Aplica as operações em sequência, sem guardar as etapas (usado na resolução total)
+    :param origem: imagem original
+    :param operacoes: [(tipo, parâmetro), ...]
+    :param cancelado: consultado entre as operações
+    :return: imagem editada ou None quando cancelado
+    """
+    im = origem
+    for tipo, parametro in operacoes:
+        if cancelado():
+            return None
+        im = OPERACOES[tipo](im, parametro)
+
+    return im
+
+
+class PilhaEdicao:
+    """
+    Lista ordenada de operações (tipo, parâmetro) aplicadas sobre a imagem original.
+    O resultado de cada etapa é guardado, então alterar uma operação recalcula apenas a partir dela.
+    Os resultados são mantidos por imagem de origem, permitindo exibir as edições em uma versão reduzida
+    e aplicá-las na resolução total apenas ao salvar
+    """
+    LIMITE_ORIGENS = 2
+
+    def __init__(self) -> None:
+        self.__operacoes = []
+        self.__etapas = {}
+        self.__ocupado = 0
+
+        GerenciadorMemoria.compartilhado().registrar(self, 'edição (etapas)', PRIORIDADE_EDICAO, gui=True)
+
+    def __recontar(self) -> None:
+        self.__ocupado = sum(bytes_pil(resultado) for _, resultados in self.__etapas.values() for resultado in resultados)
+
+    @property
+    def operacoes(self) -> list:
+        return list(self.__operacoes)
+
+    def vazia(self) -> bool:
+        return not self.__operacoes
+
+    def definir(self, tipo: str, parametro=None) -> None:
+        """
+        Adiciona a operação ao final da pilha ou altera o parâmetro da operação do mesmo tipo, mantendo a sua posição.
+        Um parâmetro None remove a operação
+        :param tipo: filtro, cor, nitidez ou recorte
+        :param parametro: parâmetro da operação
+        :return: None
+        """
+        posicao = next((i for i, (atual, _) in enumerate(self.__operacoes) if atual == tipo), None)
+
+        if posicao is None:
+            if parametro is None:
+                return
+            posicao = len(self.__operacoes)
+            self.__operacoes.append((tipo, parametro))
+        elif self.__operacoes[posicao][1] == parametro:
+            return
+        elif parametro is None:
+            del self.__operacoes[posicao]
+        else:
+            self.__operacoes[posicao] = (tipo, parametro)
+
+        # descarta apenas os resultados a partir da etapa alterada
+        for _, resultados in self.__etapas.values():
+            del resultados[posicao:]
+        self.__recontar()
+
+    def limpar(self) -> None:
+        self.__operacoes.clear()
+        self.__etapas.clear()
+        self.__ocupado = 0
+
+    def memoria_ocupada(self) -> int:
+        return self.__ocupado
+
+    def liberar_memoria(self, necessario: int) -> int:
+        """
+        Descarta as etapas guardadas, começando pela origem usada há mais tempo. As operações são mantidas e as
+        etapas são recalculadas no próximo uso
+        :param necessario: bytes a serem liberados
+        :return: bytes liberados
+        """
+        anterior = self.__ocupado
+        while self.__etapas and anterior - self.__ocupado < necessario:
+            del self.__etapas[next(iter(self.__etapas))]
+            self.__recontar()
+
+        return anterior - self.__ocupado
+
+    def renderizar(self, origem: Image.Image) -> Image.Image:
+        """
+        Aplica as operações sobre a imagem, reaproveitando as etapas já calculadas
+        :param origem: imagem original ou a sua versão reduzida
+        :return: imagem editada
+        """
+        if id(origem) not in self.__etapas:
+            while len(self.__etapas) >= self.LIMITE_ORIGENS:
+                del self.__etapas[next(iter(self.__etapas))]
+            # a referência à origem evita que o id seja reaproveitado por outra imagem
+            self.__etapas[id(origem)] = (origem, [])
+
+        _, resultados = self.__etapas[id(origem)]
+        calculadas = len(resultados)
+        for tipo, parametro in self.__operacoes[len(resultados):]:
+            resultados.append(OPERACOES[tipo](resultados[-1] if resultados else origem, parametro))
+
+        resultado = resultados[-1] if resultados else origem
+        self.__recontar()
+        if len(resultados) != calculadas:
+            GerenciadorMemoria.compartilhado().reservar(self)
+
+        return resultado
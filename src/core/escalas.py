@@ -0,0 +1,127 @@
+"""
+Cache de versões reduzidas do pixmap exibido, uma por nível de zoom em uso
+"""
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt6.QtCore import QObject, pyqtSignal, Qt
+from PyQt6.QtGui import QImage, QPixmap
+
+from src.core.imagem import tamanho_bytes, tamanho_bytes_pixmap
+from src.core.memoria import GerenciadorMemoria, PRIORIDADE_ESCALAS
+
+
+class EscalasPixmap(QObject):
+    """
+    As versões são calculadas com filtragem de qualidade em uma thread de trabalho e desenhadas sem nenhuma escala,
+    o que mantém o arraste rápido mesmo em imagens grandes. Apenas as escalas usadas mais recentemente são mantidas
+    """
+    atualizada = pyqtSignal()
+    escalada = pyqtSignal(int, float, QImage)
+
+    LIMITE_ESCALAS = 4
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+
+        self.__executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='escalas')
+        self.__pixmaps = OrderedDict()
+        self.__pendentes = set()
+        self.__origem = None
+        self.__geracao = 0
+        self.__ocupado = 0
+
+        self.escalada.connect(self.__armazenar)
+        GerenciadorMemoria.compartilhado().registrar(self, 'escalas', PRIORIDADE_ESCALAS, gui=True)
+
+    @staticmethod
+    def __chave(escala: float) -> float:
+        return round(escala, 4)
+
+    def limpar(self) -> None:
+        """
+        Descarta as versões calculadas, usado sempre que o pixmap exibido muda
+        :return: None
+        """
+        self.__geracao += 1
+        self.__pixmaps.clear()
+        self.__pendentes.clear()
+        self.__origem = None
+        self.__ocupado = 0
+
+    def obter(self, escala: float) -> QPixmap | None:
+        chave = self.__chave(escala)
+        pixmap = self.__pixmaps.get(chave)
+
+        if pixmap is not None:
+            self.__pixmaps.move_to_end(chave)
+
+        return pixmap
+
+    def pedir(self, pixmap: QPixmap, escala: float) -> None:
+        """
+        Agenda o cálculo da versão na escala indicada, caso ainda não exista
+        :param pixmap: pixmap exibido
+        :param escala: escala em relação ao pixmap, menor que 1
+        :return: None
+        """
+        chave = self.__chave(escala)
+        if pixmap.isNull() or chave in self.__pixmaps or chave in self.__pendentes:
+            return
+
+        if self.__origem is None:
+            # a conversão é feita uma única vez por imagem, o QImage pode ser usado fora da thread da GUI.
+            # No backend raster ele compartilha os pixels do pixmap, então não é contado no uso de memória
+            self.__origem = pixmap.toImage()
+
+        self.__pendentes.add(chave)
+        self.__executor.submit(self.__escalar, self.__geracao, chave, self.__origem)
+
+    def __escalar(self, geracao: int, escala: float, origem: QImage) -> None:
+        if geracao != self.__geracao:
+            return
+
+        imagem = origem.scaled(
+            max(1, round(origem.width() * escala)), max(1, round(origem.height() * escala)),
+            Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.SmoothTransformation
+        )
+
+        # noinspection PyUnresolvedReferences
+        self.escalada.emit(geracao, escala, imagem)
+
+    def __armazenar(self, geracao: int, escala: float, imagem: QImage) -> None:
+        if geracao != self.__geracao:
+            return
+
+        self.__pendentes.discard(escala)
+        if not GerenciadorMemoria.compartilhado().reservar(self, tamanho_bytes(imagem)):
+            return
+
+        self.__pixmaps[escala] = QPixmap.fromImage(imagem)
+        self.__ocupado += tamanho_bytes_pixmap(self.__pixmaps[escala])
+
+        while len(self.__pixmaps) > self.LIMITE_ESCALAS:
+            self.__ocupado -= tamanho_bytes_pixmap(self.__pixmaps.popitem(last=False)[1])
+
+        # noinspection PyUnresolvedReferences
+        self.atualizada.emit()
+
+    def memoria_ocupada(self) -> int:
+        return self.__ocupado
+
+    def liberar_memoria(self, necessario: int) -> int:
+        """
+        Descarta as escalas menos recentes
+        :param necessario: bytes a serem liberados
+        :return: bytes liberados
+        """
+        liberado = 0
+        while self.__pixmaps and liberado < necessario:
+            liberado += tamanho_bytes_pixmap(self.__pixmaps.popitem(last=False)[1])
+
+        self.__ocupado -= liberado
+        return liberado
+
+    def encerrar(self) -> None:
+        self.limpar()
+        self.__executor.shutdown(wait=False, cancel_futures=True)
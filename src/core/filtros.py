@@ -0,0 +1,159 @@
+"""
+Filtros do pilgram aplicados por tabelas de cor 3D (Color3DLUT do Pillow). A parte de cada filtro que depende
+apenas da cor do pixel é calculada uma única vez, executando o próprio pilgram sobre uma grade de cores, e aplicada
+em uma única passada. Os filtros com gradiente fazem antes uma etapa espacial, com o gradiente em cache.
+Apenas os filtros de FILTROS_LUT usam a tabela
+"""
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from PIL import Image, ImageChops, ImageFilter
+
+TAMANHO_LUT = 33
+
+LIMITE_CAMADAS = 4
+
+# filtros em que a tabela é mais rápida que o pilgram (python -m benchmarks.filtros). Nos demais (aden, hudson, lofi,
+# valencia e walden) a cadeia do pilgram tem poucas etapas e custa tanto quanto a passada da tabela
+FILTROS_LUT = ('clarendon', 'earlybird', 'lark', 'maven', 'reyes')
+
+# acima deste tamanho a tabela é aplicada em faixas, em paralelo (o Pillow libera o GIL durante a aplicação)
+PIXELS_PARALELO = 4_000_000
+
+__luts = {}
+__camadas = OrderedDict()
+__lock = threading.Lock()
+__executor = None
+
+
+def grade_cores(tamanho: int = TAMANHO_LUT) -> Image.Image:
+    """
+    Imagem com todas as cores da grade da tabela 3D, na ordem do Color3DLUT (vermelho varia mais rápido)
+    :param tamanho: pontos por canal
+    :return: imagem RGB de tamanho x tamanho²
+    """
+    valores = [round(i * 255 / (tamanho - 1)) for i in range(tamanho)]
+    dados = bytes(canal for b in valores for g in valores for r in valores for canal in (r, g, b))
+
+    return Image.frombytes('RGB', (tamanho, tamanho * tamanho), dados)
+
+
+def criar_lut(funcao: Callable[[Image.Image], Image.Image], tamanho: int = TAMANHO_LUT) -> ImageFilter.Color3DLUT:
+    """
+    Converte uma função que altera cada pixel apenas pela sua cor em uma tabela 3D
+    :param funcao: função imagem RGB -> imagem RGB, sem efeitos espaciais
+    :param tamanho: pontos por canal
+    :return: Color3DLUT
+    """
+    saida = funcao(grade_cores(tamanho)).convert('RGB').tobytes()
+    return ImageFilter.Color3DLUT(tamanho, [valor / 255 for valor in saida])
+
+
+def __camada(chave: tuple, criar: Callable[[], Image.Image]) -> Image.Image:
+    # máscaras e gradientes dependem apenas do tamanho da imagem, são reaproveitados entre a prévia e o original
+    with __lock:
+        camada = __camadas.get(chave)
+        if camada is not None:
+            __camadas.move_to_end(chave)
+            return camada
+
+    camada = criar()
+    with __lock:
+        __camadas[chave] = camada
+        while len(__camadas) > LIMITE_CAMADAS:
+            __camadas.popitem(last=False)
+
+    return camada
+
+
+def __earlybird(cb: Image.Image) -> Image.Image:
+    from pilgram import util
+
+    gradiente = __camada(('earlybird', cb.size), lambda: util.radial_gradient(
+        cb.size, [(208, 186, 142), (54, 3, 9), (29, 2, 16)], [0.2, 0.85, 1]
+    ))
+    # mesma fórmula do overlay do pilgram (W3C), em uma única passada em C
+    return ImageChops.overlay(cb, gradiente)
+
+
+def __cor(nome: str) -> Callable[[Image.Image], Image.Image]:
+    # etapa de cor de cada filtro, igual à sequência do pilgram após a etapa espacial
+    import pilgram
+    from pilgram import css
+
+    etapas = {
+        'earlybird': lambda im: css.sepia(css.contrast(im, 0.9), 0.2)
+    }
+
+    return etapas.get(nome) or getattr(pilgram, nome)
+
+
+# etapas que dependem da posição do pixel, executadas antes da tabela de cor
+ESPACIAIS = {
+    'earlybird': __earlybird
+}
+
+
+def __lut(chave: str, criar: Callable):
+    with __lock:
+        lut = __luts.get(chave)
+
+    if lut is None:
+        # calculada fora do lock, duas threads podem calcular a mesma tabela ao mesmo tempo sem prejuízo
+        lut = criar()
+        with __lock:
+            __luts[chave] = lut
+
+    return lut
+
+
+def lut_filtro(nome: str) -> ImageFilter.Color3DLUT:
+    """
+    Tabela de cor do filtro, calculada na primeira vez
+    :param nome: nome do filtro do pilgram
+    :return: Color3DLUT
+    """
+    return __lut(nome, lambda: criar_lut(__cor(nome)))
+
+
+def __filtrar(im: Image.Image, lut: ImageFilter.Color3DLUT) -> Image.Image:
+    global __executor
+
+    # nos processos de trabalho do lote cada processo já ocupa um núcleo
+    trabalhadores = os.cpu_count() or 1
+    if trabalhadores == 1 or im.width * im.height < PIXELS_PARALELO or multiprocessing.parent_process() is not None:
+        return im.filter(lut)
+
+    with __lock:
+        if __executor is None:
+            __executor = ThreadPoolExecutor(max_workers=trabalhadores, thread_name_prefix='filtros')
+
+    altura = -(-im.height // trabalhadores)
+    caixas = [(0, topo, im.width, min(im.height, topo + altura)) for topo in range(0, im.height, altura)]
+    faixas = __executor.map(lambda caixa: im.crop(caixa).filter(lut), caixas)
+
+    resultado = Image.new(im.mode, im.size)
+    for caixa, faixa in zip(caixas, faixas):
+        resultado.paste(faixa, caixa[:2])
+
+    return resultado
+
+
+def aplicar_lut(im: Image.Image, nome: str) -> Image.Image:
+    """
+    Aplica o filtro do pilgram pela etapa espacial (quando existe) e pela tabela de cor
+    :param im: imagem do PIL
+    :param nome: um dos filtros de FILTROS_LUT
+    :return: nova imagem RGB
+    """
+    cb = im if im.mode == 'RGB' else im.convert('RGB')
+
+    espacial = ESPACIAIS.get(nome)
+    if espacial is not None:
+        cb = espacial(cb)
+
+    return __filtrar(cb, lut_filtro(nome))
@@ -0,0 +1,174 @@
+"""
+Prévias de todos os filtros sobre uma versão reduzida da imagem. A imagem é decodificada uma única vez, já reduzida,
+e os filtros são aplicados em paralelo. As prévias ficam em cache por imagem
+"""
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtGui import QImage
+
+from src.core.edicao import FILTROS, aplicar_filtro
+from src.core.imagem import pil_para_qimage, tamanho_bytes
+from src.core.memoria import GerenciadorMemoria, PRIORIDADE_ESCALAS
+from src.core.orientacao import orientacao_exif, orientar
+
+TAMANHO_PREVIA = 160
+
+# a prévia 0 é a imagem original, as seguintes seguem a ordem de FILTROS
+NOMES_PREVIAS = ('Original',) + tuple(nome.capitalize() for nome in FILTROS)
+
+
+def carregar_proxy(caminho: str, lado: int) -> Image.Image:
+    """
+    Decodifica a imagem já reduzida (draft do JPEG), na orientação de exibição
+    :param caminho: caminho completo do arquivo
+    :param lado: lado maior da versão reduzida
+    :return: imagem do PIL em RGB
+    """
+    with Image.open(caminho) as im:
+        orientacao = orientacao_exif(im)
+        im.thumbnail((lado, lado), Image.Resampling.LANCZOS, reducing_gap=2.0)
+        im = orientar(im, orientacao)
+
+        return im if im.mode == 'RGB' else im.convert('RGB')
+
+
+class GeradorPrevias(QObject):
+    """
+    Gera as prévias dos filtros em um pool de threads (o Pillow libera o GIL ao aplicar as tabelas de cor).
+    Apenas a imagem pedida por último continua sendo processada, as anteriores são descartadas
+    """
+    pronta = pyqtSignal(str, int, QImage)
+    gerada = pyqtSignal(int, str, int, QImage)
+
+    LIMITE_IMAGENS = 8
+
+    def __init__(self, lado: int = TAMANHO_PREVIA, parent=None) -> None:
+        super().__init__(parent)
+
+        self.__lado = lado
+        self.__executor = ThreadPoolExecutor(
+            max_workers=min(len(NOMES_PREVIAS), os.cpu_count() or 1), thread_name_prefix='previas'
+        )
+        self.__cache = OrderedDict()
+        self.__pendentes = set()
+        self.__geracao = 0
+        self.__ocupado = 0
+        self.__lock = threading.Lock()
+
+        # noinspection PyUnresolvedReferences
+        self.gerada.connect(self.__armazenar)
+        GerenciadorMemoria.compartilhado().registrar(self, 'prévias de filtros', PRIORIDADE_ESCALAS, gui=True)
+
+    @staticmethod
+    def __chave(caminho: str) -> tuple | None:
+        try:
+            stat = os.stat(caminho)
+        except OSError:
+            return None
+
+        return caminho, stat.st_mtime_ns, stat.st_size
+
+    def gerar(self, caminho: str) -> dict:
+        """
+        Agenda as prévias que ainda não estão no cache, interrompendo as da imagem anterior
+        :param caminho: caminho completo do arquivo
+        :return: prévias já prontas, {índice: QImage}
+        """
+        chave = self.__chave(caminho)
+        if chave is None:
+            return {}
+
+        previas = self.__cache.get(chave, {})
+        if chave in self.__cache:
+            self.__cache.move_to_end(chave)
+
+        if len(previas) < len(NOMES_PREVIAS) and chave not in self.__pendentes:
+            with self.__lock:
+                self.__geracao += 1
+                geracao = self.__geracao
+
+            self.__pendentes = {chave}
+            self.__executor.submit(self.__decodificar, geracao, chave, set(previas))
+
+        return dict(previas)
+
+    def __obsoleto(self, geracao: int) -> bool:
+        with self.__lock:
+            return geracao != self.__geracao
+
+    def __decodificar(self, geracao: int, chave: tuple, prontas: set) -> None:
+        if self.__obsoleto(geracao):
+            return
+
+        try:
+            proxy = carregar_proxy(chave[0], self.__lado)
+        except (OSError, ValueError, SyntaxError, Image.DecompressionBombError):
+            return
+
+        # uma única decodificação, os filtros são aplicados em paralelo sobre a mesma versão reduzida
+        for indice in range(len(NOMES_PREVIAS)):
+            if indice not in prontas:
+                self.__executor.submit(self.__filtrar, geracao, chave, indice, proxy)
+
+    def __filtrar(self, geracao: int, chave: tuple, indice: int, proxy: Image.Image) -> None:
+        if self.__obsoleto(geracao):
+            return
+
+        im = proxy if indice == 0 else aplicar_filtro(proxy, FILTROS[indice - 1])
+
+        # o QImage é dono dos pixels: a cópia enfileirada pelo sinal continua válida após o fim desta thread
+        # noinspection PyUnresolvedReferences
+        self.gerada.emit(geracao, chave[0], indice, pil_para_qimage(im))
+
+    def __armazenar(self, geracao: int, caminho: str, indice: int, imagem: QImage) -> None:
+        chave = self.__chave(caminho)
+        if chave is None:
+            return
+
+        previas = self.__cache.setdefault(chave, {})
+        self.__cache.move_to_end(chave)
+        if indice not in previas:
+            previas[indice] = imagem
+            self.__ocupado += tamanho_bytes(imagem)
+
+        if len(previas) == len(NOMES_PREVIAS):
+            self.__pendentes.discard(chave)
+
+        while len(self.__cache) > self.LIMITE_IMAGENS:
+            self.__descartar_antiga()
+
+        # noinspection PyUnresolvedReferences
+        self.pronta.emit(caminho, indice, imagem)
+
+    def __descartar_antiga(self) -> int:
+        chave, previas = self.__cache.popitem(last=False)
+        self.__pendentes.discard(chave)
+
+        liberado = sum(tamanho_bytes(imagem) for imagem in previas.values())
+        self.__ocupado -= liberado
+        return liberado
+
+    def memoria_ocupada(self) -> int:
+        return self.__ocupado
+
+    def liberar_memoria(self, necessario: int) -> int:
+        liberado = 0
+        # as prévias da imagem exibida (a mais recente) são mantidas
+        while len(self.__cache) > 1 and liberado < necessario:
+            liberado += self.__descartar_antiga()
+
+        return liberado
+
+    def cancelar(self) -> None:
+        with self.__lock:
+            self.__geracao += 1
+        self.__pendentes.clear()
+
+    def encerrar(self) -> None:
+        self.cancelar()
+        self.__executor.shutdown(wait=False, cancel_futures=True)
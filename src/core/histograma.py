@@ -0,0 +1,228 @@
+"""
+Histogramas (vermelho, verde, azul e luminância) e estatísticas da imagem exibida, calculados com NumPy.
+Uma estimativa sobre uma amostra da imagem exibida é calculada na hora e os valores exatos, na resolução total,
+em segundo plano. Os valores exatos ficam em cache por arquivo e edições aplicadas.
+O NumPy só é importado no primeiro cálculo, com o painel visível
+"""
+import math
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from PIL import Image
+from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtGui import QImage
+
+from src.core.amostragem import visao_pixels
+from src.core.edicao import FonteEdicao, aplicar_operacoes
+
+# pixels usados na estimativa, a imagem exibida é lida em intervalos regulares
+PIXELS_ESTIMATIVA = 262_144
+
+# as linhas são processadas em faixas, permitindo interromper o cálculo entre uma faixa e outra
+LINHAS_FAIXA = 256
+
+CANAIS = ('Vermelho', 'Verde', 'Azul', 'Luminância')
+
+
+def histogramas(pixels: 'np.ndarray', ordem: tuple, passo: int = 1,
+                cancelado: Callable[[], bool] = lambda: False) -> 'np.ndarray | None':
+    """
+    Histogramas dos canais e da luminância (mesma fórmula da conversão para 'L' do Pillow)
+    :param pixels: array (altura, largura, bytes por pixel)
+    :param ordem: posição dos bytes R, G e B
+    :param passo: intervalo entre as linhas e colunas lidas
+    :param cancelado: consultado entre as faixas
+    :return: array (4, 256) com as contagens ou None quando cancelado
+    """
+    import numpy as np
+
+    total = np.zeros((len(CANAIS), 256), np.int64)
+    amostra = pixels[::passo, ::passo]
+
+    for inicio in range(0, amostra.shape[0], LINHAS_FAIXA):
+        if cancelado():
+            return None
+
+        faixa = amostra[inicio:inicio + LINHAS_FAIXA]
+        r, g, b = (faixa[:, :, canal].ravel() for canal in ordem)
+        luminancia = (r * np.uint32(19595) + g * np.uint32(38470) + b * np.uint32(7471) + 0x8000) >> 16
+
+        for i, valores in enumerate((r, g, b, luminancia)):
+            total[i] += np.bincount(valores, minlength=256)
+
+    return total
+
+
+def histogramas_pil(im: Image.Image) -> 'np.ndarray':
+    """
+    Mesmos histogramas de uma imagem do PIL já decodificada, calculados pelo próprio Pillow em uma passada em C
+    (evita a cópia para inteiros de 64 bits que o np.bincount faz)
+    :param im: imagem do PIL
+    :return: array (4, 256) com as contagens
+    """
+    import numpy as np
+
+    rgb = im if im.mode == 'RGB' else im.convert('RGB')
+    return np.array(rgb.histogram() + rgb.convert('L').histogram(), np.int64).reshape(len(CANAIS), 256)
+
+
+class Estatisticas:
+    """
+    Média, desvio padrão e porcentagem de pixels cortados (0 ou 255) de cada canal, obtidos dos histogramas
+    """
+
+    def __init__(self, contagens: 'np.ndarray', exatas: bool) -> None:
+        import numpy as np
+
+        self.histogramas = contagens
+        self.exatas = exatas
+        self.pixels = int(contagens[0].sum())
+
+        valores = np.arange(256, dtype=np.float64)
+        total = max(self.pixels, 1)
+        self.media = (contagens * valores).sum(axis=1) / total
+        self.desvio = np.sqrt(np.maximum((contagens * valores ** 2).sum(axis=1) / total - self.media ** 2, 0))
+        self.sombras = contagens[:, 0] * 100 / total
+        self.realces = contagens[:, 255] * 100 / total
+
+    def campos(self) -> list:
+        """
+        Linhas da tabela do painel
+        :return: [(canal, média, desvio, sombras %, realces %), ...]
+        """
+        return [
+            (canal, f'{self.media[i]:.1f}', f'{self.desvio[i]:.1f}', f'{self.sombras[i]:.2f}',
+             f'{self.realces[i]:.2f}')
+            for i, canal in enumerate(CANAIS)
+        ]
+
+
+def estatisticas_qimage(imagem: QImage, completa: bool = True, limite: int = PIXELS_ESTIMATIVA) -> Estatisticas:
+    """
+    Estimativa sobre uma amostra regular da imagem, exata quando todos os pixels da resolução total são lidos
+    :param imagem: QImage
+    :param completa: a imagem tem a resolução total do arquivo
+    :param limite: quantidade aproximada de pixels lidos
+    :return: Estatisticas
+    """
+    imagem, pixels, ordem = visao_pixels(imagem)
+    passo = max(1, math.ceil(math.sqrt(pixels.shape[0] * pixels.shape[1] / max(limite, 1))))
+
+    return Estatisticas(histogramas(pixels, ordem, passo), completa and passo == 1)
+
+
+class CalculadoraEstatisticas(QObject):
+    """
+    Calcula os valores exatos em uma thread de trabalho. Como no carregamento de arquivos, cada pedido recebe um
+    número e apenas o mais recente continua
+    """
+    calculadas = pyqtSignal(int, object)
+
+    LIMITE_ITENS = 256
+
+    def __init__(self, fonte: FonteEdicao, parent=None) -> None:
+        super().__init__(parent)
+
+        self.__fonte = fonte
+        self.__executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='histograma')
+        self.__cache = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__pedido = 0
+
+    @property
+    def pedido_atual(self) -> int:
+        return self.__pedido
+
+    @staticmethod
+    def __chave(caminho: str, operacoes: list) -> tuple | None:
+        try:
+            stat = os.stat(caminho)
+        except OSError:
+            return None
+
+        # rotações e inversões não alteram os histogramas, apenas as operações da pilha de edição
+        return caminho, stat.st_mtime_ns, stat.st_size, tuple(operacoes)
+
+    def calcular(self, caminho: str, operacoes: list, exibida: QImage, completa: bool,
+                 refinar: bool = True) -> Estatisticas | None:
+        """
+        Retorna os valores exatos do cache ou uma estimativa pela imagem exibida. Nesse caso os valores exatos são
+        calculados em segundo plano e emitidos em 'calculadas'
+        :param caminho: caminho completo do arquivo
+        :param operacoes: operações da pilha de edição aplicadas à imagem exibida
+        :param exibida: imagem exibida (ou a sua versão reduzida)
+        :param completa: a imagem exibida já tem a resolução total, dispensando uma nova decodificação
+        :param refinar: calcula os valores exatos (desligado enquanto os ajustes são arrastados)
+        :return: Estatisticas ou None quando o arquivo não pode ser lido
+        """
+        chave = self.__chave(caminho, operacoes)
+        if chave is None:
+            return None
+
+        with self.__lock:
+            self.__pedido += 1
+            pedido = self.__pedido
+
+            exatas = self.__cache.get(chave)
+            if exatas is not None:
+                self.__cache.move_to_end(chave)
+                return exatas
+
+        estimativa = estatisticas_qimage(exibida, completa)
+        if estimativa.exatas:
+            self.__adicionar(chave, estimativa)
+        elif refinar:
+            self.__executor.submit(self.__executar, pedido, chave, list(operacoes), exibida if completa else None)
+
+        return estimativa
+
+    def cancelar(self) -> None:
+        with self.__lock:
+            self.__pedido += 1
+
+    def encerrar(self) -> None:
+        self.cancelar()
+        self.__executor.shutdown(wait=False, cancel_futures=True)
+
+    def __obsoleto(self, pedido: int) -> bool:
+        with self.__lock:
+            return pedido != self.__pedido
+
+    def __adicionar(self, chave: tuple, estatisticas: Estatisticas) -> None:
+        with self.__lock:
+            self.__cache[chave] = estatisticas
+            while len(self.__cache) > self.LIMITE_ITENS:
+                self.__cache.popitem(last=False)
+
+    def __executar(self, pedido: int, chave: tuple, operacoes: list, exibida: QImage | None) -> None:
+        if self.__obsoleto(pedido):
+            return
+
+        cancelado = lambda: self.__obsoleto(pedido)
+
+        try:
+            if exibida is not None:
+                imagem, pixels, ordem = visao_pixels(exibida)
+                contagens = histogramas(pixels, ordem, 1, cancelado)
+            elif operacoes:
+                im = aplicar_operacoes(self.__fonte.obter(chave[0]), operacoes, cancelado)
+                contagens = None if im is None or cancelado() else histogramas_pil(im)
+            else:
+                # a orientação não altera os histogramas, o arquivo é apenas decodificado
+                with Image.open(chave[0]) as original:
+                    contagens = histogramas_pil(original)
+        except (OSError, ValueError, SyntaxError, Image.DecompressionBombError):
+            return
+
+        if contagens is None:
+            return
+
+        estatisticas = Estatisticas(contagens, True)
+        self.__adicionar(chave, estatisticas)
+
+        if not self.__obsoleto(pedido):
+            # noinspection PyUnresolvedReferences
+            self.calculadas.emit(pedido, estatisticas)
@@ -0,0 +1,179 @@
+"""
+Funções utilitárias de decodificação de imagens, seguras para uso fora da thread da GUI
+"""
+import io
+
+from PIL import Image, ExifTags
+from PyQt6.QtCore import QSize
+from PyQt6.QtGui import QImage, QImageReader, QPixmap
+
+from src.core.orientacao import orientacao_exif, orientar, troca_eixos
+
+CHAVE_LARGURA = 'largura_original'
+CHAVE_ALTURA = 'altura_original'
+
+# permite decodificar panoramas e scans acima do limite padrão de 256 MB do Qt
+QImageReader.setAllocationLimit(0)
+
+
+def carregar_qimage(caminho: str) -> QImage:
+    """
+    Decodifica o arquivo em um QImage. Ao contrário do QPixmap, o QImage pode ser criado em threads de trabalho
+    :param caminho: caminho completo do arquivo
+    :return: QImage decodificado na orientação EXIF (nulo em caso de erro)
+    """
+    leitor = QImageReader(caminho)
+    leitor.setAutoTransform(True)
+    imagem = leitor.read()
+
+    return imagem if imagem is not None else QImage()
+
+
+def carregar_qimage_reduzida(caminho: str, largura: int, altura: int) -> QImage:
+    """
+    Decodifica o arquivo já na resolução da tela, usando a decodificação reduzida do JPEG quando possível
+    :param caminho: caminho completo do arquivo
+    :param largura: largura máxima
+    :param altura: altura máxima
+    :return: QImage com o tamanho original registrado
+    """
+    try:
+        with Image.open(caminho) as im:
+            orientacao = orientacao_exif(im)
+            original = __orientado(im.size, orientacao)
+            if original[0] <= largura and original[1] <= altura:
+                return carregar_qimage(caminho)
+
+            # a redução é feita na orientação do arquivo, girando apenas os pixels já reduzidos
+            im.thumbnail(__orientado((largura, altura), orientacao), Image.Resampling.LANCZOS, reducing_gap=2.0)
+            imagem = pil_para_qimage(orientar(im, orientacao))
+    except OSError:
+        return QImage()
+
+    definir_tamanho_original(imagem, *original)
+    return imagem
+
+
+def carregar_previa(caminho: str, largura: int, altura: int) -> QImage | None:
+    """
+    Gera rapidamente uma prévia em baixa resolução, pela decodificação reduzida do JPEG (draft) ou pela miniatura
+    embutida no EXIF
+    :param caminho: caminho completo do arquivo
+    :param largura: largura desejada
+    :param altura: altura desejada
+    :return: QImage ou None quando não há caminho rápido
+    """
+    try:
+        with Image.open(caminho) as im:
+            orientacao = orientacao_exif(im)
+            gravado = im.size
+            original = __orientado(gravado, orientacao)
+            if original[0] <= largura and original[1] <= altura:
+                return None
+
+            if im.format == 'JPEG':
+                # o draft escolhe a menor escala que ainda cobre o tamanho pedido, já ajustado à proporção da imagem
+                escala = min(largura / original[0], altura / original[1])
+                im.draft('RGB', (max(1, int(gravado[0] * escala)), max(1, int(gravado[1] * escala))))
+                if im.size == gravado:
+                    return None
+                previa = pil_para_qimage(orientar(im, orientacao))
+            else:
+                # a miniatura do EXIF é gravada na mesma orientação da imagem
+                miniatura = miniatura_exif(im)
+                if miniatura is None:
+                    return None
+                previa = pil_para_qimage(orientar(miniatura, orientacao))
+    except OSError:
+        return None
+
+    definir_tamanho_original(previa, *original)
+    return previa
+
+
+def __orientado(tamanho: tuple, orientacao: int) -> tuple:
+    # tamanho na orientação de exibição (ou o inverso, pois a troca dos eixos é simétrica)
+    return (tamanho[1], tamanho[0]) if troca_eixos(orientacao) else tuple(tamanho)
+
+
+def miniatura_exif(im: Image.Image) -> Image.Image | None:
+    """
+    Extrai a miniatura JPEG embutida no EXIF (IFD1), sem decodificar a imagem
+    :param im: imagem aberta pelo PIL
+    :return: miniatura ou None
+    """
+    dados = im.info.get('exif')
+    if not dados:
+        return None
+
+    try:
+        ifd1 = im.getexif().get_ifd(ExifTags.IFD.IFD1)
+        inicio = ifd1[0x0201]
+        tamanho = ifd1[0x0202]
+    except (KeyError, AttributeError, ValueError):
+        return None
+
+    # os deslocamentos são relativos ao cabeçalho TIFF, após o prefixo 'Exif\0\0'
+    deslocamento = 6 if dados.startswith(b'Exif') else 0
+    miniatura = dados[deslocamento + inicio:deslocamento + inicio + tamanho]
+
+    try:
+        return Image.open(io.BytesIO(miniatura))
+    except OSError:
+        return None
+
+
+def pil_para_qimage(im: Image.Image) -> QImage:
+    """
+    Converte uma imagem do PIL em QImage
+    :param im: imagem do PIL
+    :return: QImage
+    """
+    if im.mode not in ('RGB', 'RGBA'):
+        im = im.convert('RGBA' if 'A' in im.getbands() or 'transparency' in im.info else 'RGB')
+
+    if im.mode == 'RGB':
+        formato = QImage.Format.Format_RGB888
+    else:
+        formato = QImage.Format.Format_RGBA8888
+
+    # o PyQt mantém os bytes apenas enquanto este objeto Python existir, mas as cópias implícitas do Qt (ex: ao
+    # emitir o sinal de uma thread de trabalho) continuam apontando para eles. A cópia é dona dos próprios pixels
+    dados = im.tobytes()
+    return QImage(dados, im.width, im.height, im.width * len(im.getbands()), formato).copy()
+
+
+def definir_tamanho_original(imagem: QImage, largura: int, altura: int) -> None:
+    imagem.setText(CHAVE_LARGURA, str(largura))
+    imagem.setText(CHAVE_ALTURA, str(altura))
+
+
+def tamanho_original(imagem: QImage) -> QSize:
+    """
+    Tamanho da imagem no arquivo, que pode ser maior que o QImage quando decodificado em resolução reduzida
+    :param imagem: QImage
+    :return: QSize
+    """
+    largura = imagem.text(CHAVE_LARGURA)
+    if largura:
+        return QSize(int(largura), int(imagem.text(CHAVE_ALTURA)))
+
+    return imagem.size()
+
+
+def tamanho_bytes(imagem: QImage) -> int:
+    """
+    Quantidade de memória ocupada pelos pixels do QImage
+    :param imagem: QImage
+    :return: tamanho em bytes
+    """
+    return 0 if imagem is None or imagem.isNull() else imagem.sizeInBytes()
+
+
+def tamanho_bytes_pixmap(pixmap: QPixmap) -> int:
+    """
+    Quantidade de memória ocupada pelos pixels do QPixmap
+    :param pixmap: QPixmap
+    :return: tamanho em bytes
+    """
+    return 0 if pixmap is None or pixmap.isNull() else pixmap.width() * pixmap.height() * pixmap.depth() // 8
@@ -0,0 +1,118 @@
+"""
+Instância única do programa: a primeira execução escuta em um QLocalServer e as seguintes apenas enviam o caminho
+a ser aberto, que é exibido em uma nova janela do mesmo processo
+"""
+import getpass
+
+from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtNetwork import QLocalServer, QLocalSocket
+
+
+def nome_servidor() -> str:
+    # um servidor por usuário, para que janelas de usuários diferentes não se misturem
+    try:
+        return f'DoImageViewer-{getpass.getuser()}'
+    except (KeyError, OSError):
+        return 'DoImageViewer'
+
+
+class InstanciaUnica(QObject):
+    """
+    Servidor local que recebe os pedidos de abertura das execuções seguintes, um caminho por linha
+    """
+    abrir = pyqtSignal(str)
+
+    TEMPO_CONEXAO = 500
+
+    def __init__(self, nome: str = None, parent=None) -> None:
+        super().__init__(parent)
+
+        self.__nome = nome or nome_servidor()
+        self.__servidor = None
+        self.__buffers = {}
+
+    def enviar(self, caminho: str) -> bool:
+        """
+        Envia o caminho para a instância em execução
+        :param caminho: arquivo, diretório ou url a ser aberto. Vazio abre uma janela sem imagem
+        :return: True quando outra instância recebeu o pedido
+        """
+        socket = QLocalSocket()
+        socket.connectToServer(self.__nome)
+        if not socket.waitForConnected(self.TEMPO_CONEXAO):
+            return False
+
+        socket.write(caminho.encode('utf-8') + b'\n')
+        enviado = socket.waitForBytesWritten(self.TEMPO_CONEXAO)
+        socket.disconnectFromServer()
+
+        return enviado
+
+    def escutar(self) -> bool:
+        """
+        Passa a receber os pedidos das próximas execuções
+        :return: False quando o servidor não pôde ser criado ou outra instância já escuta (o programa continua
+            funcionando sem ele)
+        """
+        # com UserAccessOption o listen troca o socket existente sem falhar, desligando dos próximos pedidos uma
+        # instância em execução que apenas demorou a responder ao 'enviar'
+        if self.__servidor_ativo():
+            return False
+
+        self.__servidor = QLocalServer(self)
+        self.__servidor.setSocketOptions(QLocalServer.SocketOption.UserAccessOption)
+
+        if not self.__servidor.listen(self.__nome):
+            # o socket de uma execução encerrada de forma anormal continua no disco e impede o listen. Nenhum
+            # servidor atende (conferido acima), então ele pode ser removido
+            QLocalServer.removeServer(self.__nome)
+            if not self.__servidor.listen(self.__nome):
+                return False
+
+        # noinspection PyUnresolvedReferences
+        self.__servidor.newConnection.connect(self.__nova_conexao)
+        return True
+
+    def __servidor_ativo(self) -> bool:
+        # apenas a conexão recusada (ou o socket inexistente) indica que ninguém escuta. Uma instância ocupada
+        # aceita a conexão pela fila do sistema ou, no pior caso, só demora a responder
+        socket = QLocalSocket()
+        socket.connectToServer(self.__nome)
+        if socket.waitForConnected(self.TEMPO_CONEXAO):
+            socket.disconnectFromServer()
+            return True
+
+        return socket.error() not in (
+            QLocalSocket.LocalSocketError.ConnectionRefusedError, QLocalSocket.LocalSocketError.ServerNotFoundError
+        )
+
+    def encerrar(self) -> None:
+        if self.__servidor is not None:
+            self.__servidor.close()
+
+    def __nova_conexao(self) -> None:
+        while self.__servidor.hasPendingConnections():
+            socket = self.__servidor.nextPendingConnection()
+            self.__buffers[socket] = b''
+
+            # noinspection PyUnresolvedReferences
+            socket.readyRead.connect(lambda s=socket: self.__ler(s))
+            # noinspection PyUnresolvedReferences
+            socket.disconnected.connect(lambda s=socket: self.__desconectado(s))
+
+            if socket.bytesAvailable():
+                self.__ler(socket)
+
+    def __ler(self, socket: QLocalSocket) -> None:
+        dados = self.__buffers.get(socket, b'') + bytes(socket.readAll())
+        *linhas, resto = dados.split(b'\n')
+        self.__buffers[socket] = resto
+
+        for linha in linhas:
+            # noinspection PyUnresolvedReferences
+            self.abrir.emit(linha.decode('utf-8', errors='replace'))
+
+    def __desconectado(self, socket: QLocalSocket) -> None:
+        self.__ler(socket)
+        self.__buffers.pop(socket, None)
+        socket.deleteLater()
@@ -0,0 +1,164 @@
+"""
+Controle central da memória ocupada pelas imagens decodificadas. Cada componente que guarda pixels (imagem exibida,
+pré-carregamento, escalas, tiles e etapas de edição) se registra com uma prioridade e informa quanto ocupa.
+Quando o total passa do limite, os componentes de menor prioridade liberam a memória primeiro
+"""
+import os
+import threading
+import weakref
+
+# as de menor valor são descartadas primeiro. A imagem exibida é apenas contabilizada, nunca descartada
+PRIORIDADE_TILES = 0
+PRIORIDADE_ESCALAS = 1
+PRIORIDADE_PREFETCH = 2
+PRIORIDADE_EDICAO = 3
+PRIORIDADE_ATUAL = 4
+
+MB = 1024 * 1024
+
+
+def limite_automatico() -> int:
+    """
+    Limite padrão: um quarto da memória física, entre 512 MB e 4 GB
+    :return: limite em bytes
+    """
+    try:
+        fisica = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (ValueError, AttributeError, OSError):
+        return 1024 * MB
+
+    return min(max(fisica // 4, 512 * MB), 4096 * MB)
+
+
+def memoria_processo() -> tuple:
+    """
+    Memória residente (RSS) do processo, atual e pico. Os valores indisponíveis no sistema são None
+    :return: (atual, pico) em bytes
+    """
+    atual = pico = None
+
+    try:
+        with open('/proc/self/statm') as arquivo:
+            atual = int(arquivo.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+
+    try:
+        import resource
+        import sys
+        # no macOS o valor é em bytes, nos demais em kB
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+    except (ImportError, OSError, ValueError):
+        pass
+
+    return atual, pico
+
+
+def bytes_pil(im) -> int:
+    """
+    Memória ocupada pelos pixels de uma imagem do PIL
+    :param im: imagem do PIL ou None
+    :return: tamanho em bytes
+    """
+    return 0 if im is None else im.width * im.height * len(im.getbands())
+
+
+class GerenciadorMemoria:
+    """
+    Os componentes registrados implementam dois métodos:
+    memoria_ocupada() -> int, que deve apenas ler um contador (é chamado de qualquer thread), e
+    liberar_memoria(bytes) -> int, que descarta os itens menos úteis e retorna quanto foi liberado.
+    Componentes usados apenas na thread da GUI são registrados com gui=True e só são liberados a partir dela
+    """
+    __compartilhado = None
+    __lock_compartilhado = threading.Lock()
+
+    def __init__(self, limite_bytes: int = None) -> None:
+        self.limite = limite_bytes or limite_automatico()
+        self.__consumidores = weakref.WeakKeyDictionary()
+        self.__lock = threading.RLock()
+        self.__pico = 0
+        self.liberados = 0
+
+    @classmethod
+    def compartilhado(cls) -> 'GerenciadorMemoria':
+        with cls.__lock_compartilhado:
+            if cls.__compartilhado is None:
+                cls.__compartilhado = GerenciadorMemoria()
+
+            return cls.__compartilhado
+
+    def registrar(self, consumidor, nome: str, prioridade: int, gui: bool = False) -> None:
+        """
+        :param consumidor: objeto com memoria_ocupada() e liberar_memoria(bytes). A referência é fraca
+        :param nome: nome exibido nas estatísticas
+        :param prioridade: uma das constantes PRIORIDADE_*
+        :param gui: True quando o consumidor só pode ser alterado na thread da GUI
+        :return: None
+        """
+        with self.__lock:
+            self.__consumidores[consumidor] = (nome, prioridade, gui)
+
+    def __itens(self) -> list:
+        with self.__lock:
+            return list(self.__consumidores.items())
+
+    def ocupado(self) -> int:
+        return sum(consumidor.memoria_ocupada() for consumidor, _ in self.__itens())
+
+    def reservar(self, consumidor, tamanho: int = 0) -> bool:
+        """
+        Abre espaço para um novo item, liberando a memória dos consumidores de prioridade menor ou igual à do
+        solicitante. Com tamanho 0 apenas aplica o limite, após o solicitante já ter ocupado a memória
+        :param consumidor: consumidor registrado que vai ocupar a memória
+        :param tamanho: bytes que serão ocupados
+        :return: False quando não há espaço, o item não deve ser guardado (caches) ou o limite já está excedido
+        """
+        na_gui = threading.current_thread() is threading.main_thread()
+
+        with self.__lock:
+            itens = self.__itens()
+            prioridade = self.__consumidores.get(consumidor, (None, PRIORIDADE_ATUAL, False))[1]
+            total = sum(atual.memoria_ocupada() for atual, _ in itens)
+            excesso = total + tamanho - self.limite
+
+            if excesso > 0:
+                candidatos = sorted(
+                    ((dados[1], i, atual) for i, (atual, dados) in enumerate(itens)
+                     if dados[1] <= prioridade and (na_gui or not dados[2])),
+                    key=lambda item: item[:2]
+                )
+
+                for _, _, atual in candidatos:
+                    liberado = atual.liberar_memoria(excesso)
+                    self.liberados += liberado
+                    excesso -= liberado
+                    if excesso <= 0:
+                        break
+
+            # quando não há espaço o item não é guardado e apenas o que já estava ocupado conta para o pico
+            self.__pico = max(self.__pico, self.limite + excesso - (tamanho if excesso > 0 else 0))
+            return excesso <= 0
+
+    def estatisticas(self) -> dict:
+        """
+        Ocupação atual por consumidor, pico e memória do processo
+        :return: dict
+        """
+        por_nome = {}
+        for consumidor, (nome, _, _) in self.__itens():
+            por_nome[nome] = por_nome.get(nome, 0) + consumidor.memoria_ocupada()
+
+        ocupado = sum(por_nome.values())
+        self.__pico = max(self.__pico, ocupado)
+        rss, rss_pico = memoria_processo()
+
+        return {
+            'ocupado': ocupado,
+            'pico': self.__pico,
+            'limite': self.limite,
+            'liberados': self.liberados,
+            'consumidores': por_nome,
+            'rss': rss,
+            'rss_pico': rss_pico
+        }
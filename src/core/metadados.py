@@ -0,0 +1,214 @@
+"""
+Metadados das imagens (dimensões, tamanho, datas e EXIF) lidos com um único 'stat' e apenas o cabeçalho do arquivo.
+Ficam em cache por inode e data de modificação e são lidos em lote, em segundo plano, quando um diretório é indexado
+"""
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from PIL import Image, ExifTags
+
+from src.core.orientacao import TAG_ORIENTACAO, orientacao_exif, troca_eixos
+
+# tags do IFD0
+FABRICANTE = 0x010F
+MODELO = 0x0110
+
+# tags do IFD EXIF
+EXPOSICAO = 0x829A
+ABERTURA = 0x829D
+ISO = 0x8827
+DATA_FOTO = 0x9003
+DISTANCIA_FOCAL = 0x920A
+LENTE = 0xA434
+
+
+class Metadados:
+    def __init__(self, largura: int, altura: int, tamanho: int, data: datetime, formato: str = '',
+                 orientacao: int = 1, exif: dict = None) -> None:
+        self.largura = largura
+        self.altura = altura
+        self.tamanho = tamanho
+        self.data = data
+        self.formato = formato
+        self.orientacao = orientacao
+        self.exif = exif or {}
+
+    @property
+    def camera(self) -> str:
+        fabricante = str(self.exif.get(FABRICANTE, '')).strip()
+        modelo = str(self.exif.get(MODELO, '')).strip()
+
+        # a maioria dos fabricantes repete o próprio nome no modelo
+        if fabricante and modelo.lower().startswith(fabricante.split()[0].lower()):
+            return modelo
+        return f'{fabricante} {modelo}'.strip()
+
+    @property
+    def exposicao(self) -> str:
+        valor = self.exif.get(EXPOSICAO)
+        if not valor:
+            return ''
+
+        valor = float(valor)
+        return f'1/{round(1 / valor)} s' if valor < 1 else f'{valor:g} s'
+
+    def campos(self) -> list:
+        """
+        Campos preenchidos, na ordem de exibição do painel de informações
+        :return: [(rótulo, valor), ...]
+        """
+        abertura = self.exif.get(ABERTURA)
+        focal = self.exif.get(DISTANCIA_FOCAL)
+        data_foto = str(self.exif.get(DATA_FOTO, ''))
+
+        campos = [
+            ('Dimensões', f'{self.largura} x {self.altura} pixels'),
+            ('Tamanho', f'{self.tamanho / 1024:.0f} kB'),
+            ('Formato', self.formato),
+            ('Data', self.data.strftime('%d/%m/%Y %H:%M')),
+            ('Data da foto', data_foto),
+            ('Câmera', self.camera),
+            ('Lente', str(self.exif.get(LENTE, '')).strip()),
+            ('Exposição', self.exposicao),
+            ('Abertura', f'f/{float(abertura):g}' if abertura else ''),
+            ('ISO', str(self.exif.get(ISO, ''))),
+            ('Distância focal', f'{float(focal):g} mm' if focal else ''),
+            ('Orientação', str(self.orientacao) if self.orientacao != 1 else '')
+        ]
+
+        return [(rotulo, valor) for rotulo, valor in campos if valor]
+
+
+def ler_metadados(caminho: str, stat: os.stat_result) -> Metadados:
+    """
+    Lê os metadados do cabeçalho do arquivo, sem decodificar os pixels
+    :param caminho: caminho do arquivo
+    :param stat: resultado do 'stat' do arquivo
+    :return: Metadados
+    """
+    data = datetime.fromtimestamp(min(stat.st_mtime, stat.st_ctime))
+
+    with Image.open(caminho) as im:
+        largura, altura = im.size
+        formato = im.format or ''
+        exif = {}
+        orientacao = 1
+
+        try:
+            tags = im.getexif()
+            orientacao = orientacao_exif(im)
+            exif = {tag: tags[tag] for tag in (FABRICANTE, MODELO, TAG_ORIENTACAO) if tag in tags}
+            exif.update({
+                tag: valor for tag, valor in tags.get_ifd(ExifTags.IFD.Exif).items()
+                if tag in (EXPOSICAO, ABERTURA, ISO, DATA_FOTO, DISTANCIA_FOCAL, LENTE)
+            })
+        except (OSError, ValueError, SyntaxError):
+            pass
+
+    if troca_eixos(orientacao):
+        largura, altura = altura, largura
+
+    return Metadados(largura, altura, stat.st_size, data, formato, orientacao, exif)
+
+
+class CacheMetadados:
+    """
+    Cache dos metadados, compartilhado pelo processo. A chave é (dispositivo, inode, mtime), então arquivos
+    renomeados continuam no cache e arquivos alterados são lidos novamente
+    """
+    LIMITE_ITENS = 50_000
+
+    __compartilhado = None
+    __lock_compartilhado = threading.Lock()
+
+    def __init__(self, limite_itens: int = LIMITE_ITENS) -> None:
+        self.__limite = limite_itens
+        self.__itens = OrderedDict()
+        self.__lock = threading.Lock()
+
+        # apenas um diretório é lido em lote por vez, um novo pedido interrompe o anterior
+        self.__executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='metadados')
+        self.__geracao = 0
+
+    @classmethod
+    def compartilhado(cls) -> 'CacheMetadados':
+        with cls.__lock_compartilhado:
+            if cls.__compartilhado is None:
+                cls.__compartilhado = CacheMetadados()
+
+            return cls.__compartilhado
+
+    @staticmethod
+    def __chave(stat: os.stat_result) -> tuple:
+        return stat.st_dev, stat.st_ino, stat.st_mtime_ns
+
+    def __buscar(self, chave: tuple) -> Metadados | None:
+        with self.__lock:
+            metadados = self.__itens.get(chave)
+            if metadados is not None:
+                self.__itens.move_to_end(chave)
+
+            return metadados
+
+    def __adicionar(self, chave: tuple, metadados: Metadados) -> None:
+        with self.__lock:
+            self.__itens[chave] = metadados
+            while len(self.__itens) > self.__limite:
+                self.__itens.popitem(last=False)
+
+    def obter(self, caminho: str, stat: os.stat_result = None) -> Metadados | None:
+        """
+        Metadados do arquivo, lidos do cabeçalho apenas quando não estão no cache
+        :param caminho: caminho do arquivo
+        :param stat: resultado do 'stat', quando já conhecido
+        :return: Metadados ou None quando o arquivo não pode ser lido
+        """
+        try:
+            stat = stat or os.stat(caminho)
+            chave = self.__chave(stat)
+
+            metadados = self.__buscar(chave)
+            if metadados is None:
+                metadados = ler_metadados(caminho, stat)
+                self.__adicionar(chave, metadados)
+
+            return metadados
+        except (OSError, ValueError, SyntaxError, Image.DecompressionBombError):
+            return None
+
+    def preencher(self, diretorio: str, nomes: list, stats: dict, indice: int = 0) -> None:
+        """
+        Lê em segundo plano os metadados de um diretório, começando pelas imagens mais próximas da exibida
+        :param diretorio: caminho do diretório, terminado em '/'
+        :param nomes: lista ordenada dos arquivos
+        :param stats: nome -> os.stat_result, obtidos na indexação do diretório
+        :param indice: posição da imagem exibida
+        :return: None
+        """
+        with self.__lock:
+            self.__geracao += 1
+            geracao = self.__geracao
+
+            pendentes = [
+                nome for _, nome in sorted((abs(i - indice), nome) for i, nome in enumerate(nomes))
+                if nome in stats and self.__chave(stats[nome]) not in self.__itens
+            ]
+
+        if pendentes:
+            self.__executor.submit(self.__preencher, geracao, diretorio, pendentes, stats)
+
+    def __preencher(self, geracao: int, diretorio: str, nomes: list, stats: dict) -> None:
+        for nome in nomes:
+            if geracao != self.__geracao:
+                return
+
+            self.obter(f'{diretorio}{nome}', stats[nome])
+
+    def encerrar(self) -> None:
+        with self.__lock:
+            self.__geracao += 1
+
+        self.__executor.shutdown(wait=False, cancel_futures=True)
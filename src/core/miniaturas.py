@@ -0,0 +1,123 @@
+"""
+Geração de miniaturas e cache persistente em disco (SQLite), endereçado por caminho, data de modificação e tamanho.
+Este módulo não depende do Qt, para que a geração possa rodar em processos de trabalho
+"""
+import hashlib
+import io
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from PIL import Image
+
+from src.core.orientacao import orientacao_exif, orientar
+
+TAMANHO_MINIATURA = 128
+
+
+def chave_miniatura(caminho: str, mtime_ns: int, tamanho: int) -> str:
+    """
+    Chave do cache: muda sempre que o arquivo é alterado
+    :param caminho: caminho completo do arquivo
+    :param mtime_ns: data de modificação em nanossegundos
+    :param tamanho: tamanho do arquivo em bytes
+    :return: hash sha1
+    """
+    return hashlib.sha1(f'{caminho}|{mtime_ns}|{tamanho}'.encode('utf-8', 'surrogateescape')).hexdigest()
+
+
+def gerar_miniatura(caminho: str, tamanho: int = TAMANHO_MINIATURA) -> bytes | None:
+    """
+    Gera a miniatura em JPEG. Executada nos processos de trabalho
+    :param caminho: caminho completo do arquivo
+    :param tamanho: lado maior da miniatura
+    :return: bytes do JPEG ou None em caso de erro
+    """
+    try:
+        with Image.open(caminho) as im:
+            orientacao = orientacao_exif(im)
+            # o thumbnail usa a decodificação reduzida do JPEG (draft) quando possível
+            im.thumbnail((tamanho, tamanho), Image.Resampling.BILINEAR, reducing_gap=2.0)
+            im = orientar(im, orientacao)
+            if im.mode != 'RGB':
+                im = im.convert('RGB')
+
+            saida = io.BytesIO()
+            im.save(saida, 'JPEG', quality=85)
+            return saida.getvalue()
+    except (OSError, ValueError, SyntaxError, Image.DecompressionBombError):
+        return None
+
+
+class CacheMiniaturas:
+    """
+    Armazena as miniaturas em um banco SQLite, descartando as acessadas há mais tempo quando o limite é atingido
+    """
+    __CAMINHO = f'{str(Path.home())}/.DoImageViewer/miniaturas.db'
+    LIMITE_BYTES = 256 * 1024 * 1024
+
+    def __init__(self, caminho: str = None, limite_bytes: int = LIMITE_BYTES) -> None:
+        self.__limite = limite_bytes
+        self.__lock = threading.Lock()
+
+        caminho = caminho or self.__CAMINHO
+        if caminho != ':memory:':
+            Path(caminho).parent.mkdir(parents=True, exist_ok=True)
+
+        self.__conexao = sqlite3.connect(caminho, check_same_thread=False, isolation_level=None)
+        self.__conexao.execute('PRAGMA journal_mode=WAL')
+        self.__conexao.execute('PRAGMA synchronous=NORMAL')
+        self.__conexao.execute(
+            'CREATE TABLE IF NOT EXISTS miniaturas '
+            '(chave TEXT PRIMARY KEY, dados BLOB NOT NULL, tamanho INTEGER NOT NULL, acesso REAL NOT NULL)'
+        )
+        self.__conexao.execute('CREATE INDEX IF NOT EXISTS miniaturas_acesso ON miniaturas (acesso)')
+
+        self.__ocupado = self.__conexao.execute('SELECT COALESCE(SUM(tamanho), 0) FROM miniaturas').fetchone()[0]
+
+    def obter(self, chave: str) -> bytes | None:
+        with self.__lock:
+            linha = self.__conexao.execute('SELECT dados FROM miniaturas WHERE chave = ?', (chave,)).fetchone()
+            if linha is None:
+                return None
+
+            self.__conexao.execute('UPDATE miniaturas SET acesso = ? WHERE chave = ?', (time.time(), chave))
+            return linha[0]
+
+    def adicionar(self, chave: str, dados: bytes) -> None:
+        with self.__lock:
+            anterior = self.__conexao.execute('SELECT tamanho FROM miniaturas WHERE chave = ?', (chave,)).fetchone()
+            if anterior is not None:
+                self.__ocupado -= anterior[0]
+
+            self.__conexao.execute(
+                'INSERT OR REPLACE INTO miniaturas (chave, dados, tamanho, acesso) VALUES (?, ?, ?, ?)',
+                (chave, sqlite3.Binary(dados), len(dados), time.time())
+            )
+            self.__ocupado += len(dados)
+
+            if self.__ocupado > self.__limite:
+                self.__descartar()
+
+    def __descartar(self) -> None:
+        # remove as menos acessadas até liberar 10% do limite
+        alvo = int(self.__limite * .9)
+        linhas = self.__conexao.execute('SELECT chave, tamanho FROM miniaturas ORDER BY acesso').fetchall()
+
+        removidas = []
+        for chave, tamanho in linhas:
+            if self.__ocupado <= alvo:
+                break
+            removidas.append((chave,))
+            self.__ocupado -= tamanho
+
+        self.__conexao.executemany('DELETE FROM miniaturas WHERE chave = ?', removidas)
+
+    @property
+    def ocupado(self) -> int:
+        return self.__ocupado
+
+    def fechar(self) -> None:
+        with self.__lock:
+            self.__conexao.close()
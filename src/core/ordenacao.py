@@ -0,0 +1,100 @@
+"""
+Ordenações da lista de imagens: natural, data de modificação, tamanho e data da foto (EXIF).
+As chaves são calculadas uma única vez por arquivo e a ordenação é um único 'sort', O(n log n)
+"""
+import os
+import re
+import threading
+from datetime import datetime
+from typing import Callable
+
+from PIL import Image, ExifTags
+
+DIGITOS = re.compile(r'(\d+)')
+
+NATURAL = 'natural'
+MODIFICACAO = 'modificacao'
+TAMANHO = 'tamanho'
+DATA_EXIF = 'data_exif'
+
+NOMES_ORDENS = {
+    NATURAL: 'Nome',
+    MODIFICACAO: 'Data de modificação',
+    TAMANHO: 'Tamanho',
+    DATA_EXIF: 'Data da foto (EXIF)'
+}
+
+__cache_exif = {}
+__lock_exif = threading.Lock()
+
+
+def chave_natural(nome: str) -> tuple:
+    """
+    Chave de ordenação natural: '2.jpg' antes de '10.jpg' e sem diferenciar maiúsculas de minúsculas
+    :param nome: nome do arquivo
+    :return: tupla alternando texto e números
+    """
+    partes = DIGITOS.split(nome)
+    return tuple(int(parte) if i % 2 else parte.casefold() for i, parte in enumerate(partes))
+
+
+def data_exif(caminho: str, stat: os.stat_result) -> str:
+    """
+    Data em que a foto foi tirada, lida apenas do cabeçalho do arquivo. Usa a data de modificação quando não há EXIF
+    :param caminho: caminho completo do arquivo
+    :param stat: resultado do 'stat' do arquivo
+    :return: data no formato 'AAAA:MM:DD HH:MM:SS'
+    """
+    chave = (caminho, stat.st_mtime_ns, stat.st_size)
+    with __lock_exif:
+        data = __cache_exif.get(chave)
+
+    if data is None:
+        data = ''
+        try:
+            with Image.open(caminho) as im:
+                exif = im.getexif()
+                data = exif.get_ifd(ExifTags.IFD.Exif).get(0x9003) or exif.get(0x0132) or ''
+        except (OSError, ValueError, SyntaxError):
+            pass
+
+        if not data:
+            # mesmo formato do EXIF, para que arquivos com e sem EXIF sejam comparáveis
+            data = datetime.fromtimestamp(stat.st_mtime).strftime('%Y:%m:%d %H:%M:%S')
+
+        with __lock_exif:
+            __cache_exif[chave] = data
+
+    return data
+
+
+def funcao_chave(ordem: str, caminho: str) -> Callable[[str, os.stat_result], tuple]:
+    """
+    Retorna a função que calcula a chave de um arquivo na ordem escolhida.
+    O nome natural é sempre o desempate, para que a ordem seja estável entre atualizações
+    :param ordem: natural, modificacao, tamanho ou data_exif
+    :param caminho: diretório dos arquivos
+    :return: função (nome, stat) -> chave
+    """
+    if ordem == MODIFICACAO:
+        return lambda nome, stat: (stat.st_mtime_ns, chave_natural(nome))
+    if ordem == TAMANHO:
+        return lambda nome, stat: (stat.st_size, chave_natural(nome))
+    if ordem == DATA_EXIF:
+        return lambda nome, stat: (data_exif(f'{caminho}{nome}', stat), chave_natural(nome))
+
+    return lambda nome, stat: chave_natural(nome)
+
+
+def ordenar(stats: dict, ordem: str = NATURAL, caminho: str = '') -> tuple:
+    """
+    Ordena os arquivos, calculando a chave de cada um uma única vez
+    :param stats: dicionário nome -> os.stat_result
+    :param ordem: natural, modificacao, tamanho ou data_exif
+    :param caminho: diretório dos arquivos
+    :return: (chaves, nomes) em ordem
+    """
+    chave = funcao_chave(ordem, caminho)
+    pares = sorted((chave(nome, stat), nome) for nome, stat in stats.items())
+
+    return [x for x, _ in pares], [nome for _, nome in pares]
@@ -0,0 +1,165 @@
+"""
+Orientação EXIF das imagens: aplicação na leitura e gravação sem perdas em arquivos JPEG, alterando apenas a tag
+de orientação, sem recomprimir a imagem
+"""
+import os
+import stat
+import struct
+import tempfile
+
+from PIL import Image
+
+TAG_ORIENTACAO = 0x0112
+
+# matriz 2x2 (coordenadas com o eixo y para baixo) que leva a imagem gravada à imagem exibida, por orientação EXIF
+MATRIZES = {
+    1: ((1, 0), (0, 1)),
+    2: ((-1, 0), (0, 1)),
+    3: ((-1, 0), (0, -1)),
+    4: ((1, 0), (0, -1)),
+    5: ((0, 1), (1, 0)),
+    6: ((0, -1), (1, 0)),
+    7: ((0, -1), (-1, 0)),
+    8: ((0, 1), (-1, 0))
+}
+ORIENTACOES = {matriz: orientacao for orientacao, matriz in MATRIZES.items()}
+
+TRANSPOSICOES = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT,
+    3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270,
+    7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90
+}
+
+
+def orientacao_exif(im: Image.Image) -> int:
+    """
+    Orientação registrada no EXIF
+    :param im: imagem aberta pelo PIL
+    :return: valor de 1 a 8
+    """
+    try:
+        orientacao = im.getexif().get(TAG_ORIENTACAO, 1)
+    except (OSError, ValueError, SyntaxError):
+        return 1
+
+    return orientacao if orientacao in MATRIZES else 1
+
+
+def orientar(im: Image.Image, orientacao: int) -> Image.Image:
+    """
+    Aplica a orientação aos pixels
+    :param im: imagem do PIL
+    :param orientacao: valor EXIF de 1 a 8
+    :return: imagem na orientação de exibição
+    """
+    transposicao = TRANSPOSICOES.get(orientacao)
+    return im if transposicao is None else im.transpose(transposicao)
+
+
+def troca_eixos(orientacao: int) -> bool:
+    return orientacao in (5, 6, 7, 8)
+
+
+def compor(orientacao: int, matriz: tuple) -> int:
+    """
+    Orientação resultante de aplicar uma rotação/inversão sobre a orientação atual
+    :param orientacao: orientação EXIF atual
+    :param matriz: matriz 2x2 da rotação/inversão aplicada à imagem exibida
+    :return: nova orientação EXIF
+    """
+    (a, b), (c, d) = matriz
+    (e, f), (g, h) = MATRIZES[orientacao]
+
+    return ORIENTACOES[((a * e + b * g, a * f + b * h), (c * e + d * g, c * f + d * h))]
+
+
+def __segmentos(dados: bytes):
+    # percorre os segmentos do cabeçalho JPEG até o início dos dados comprimidos (SOS)
+    posicao = 2
+    while posicao + 4 <= len(dados) and dados[posicao] == 0xFF:
+        marcador = dados[posicao + 1]
+        if marcador == 0xDA:
+            return
+
+        tamanho = struct.unpack('>H', dados[posicao + 2:posicao + 4])[0]
+        yield marcador, posicao, posicao + 2 + tamanho
+        posicao += 2 + tamanho
+
+
+def __alterar_tag(exif: bytearray, orientacao: int) -> bool:
+    # altera a tag de orientação do IFD0 no próprio bloco, sem mudar nenhum deslocamento
+    tiff = 6
+    ordem = '<' if exif[tiff:tiff + 2] == b'II' else '>'
+    ifd0 = tiff + struct.unpack(f'{ordem}I', exif[tiff + 4:tiff + 8])[0]
+    quantidade = struct.unpack(f'{ordem}H', exif[ifd0:ifd0 + 2])[0]
+
+    for i in range(quantidade):
+        entrada = ifd0 + 2 + i * 12
+        tag, tipo = struct.unpack(f'{ordem}HH', exif[entrada:entrada + 4])
+        if tag == TAG_ORIENTACAO and tipo == 3:
+            exif[entrada + 8:entrada + 10] = struct.pack(f'{ordem}H', orientacao)
+            return True
+
+    return False
+
+
+def gravar_orientacao_jpeg(origem: str, destino: str, orientacao: int) -> None:
+    """
+    Grava o JPEG com a nova orientação EXIF, copiando os dados comprimidos sem alteração (sem perdas e instantâneo).
+    A gravação é feita em um arquivo temporário renomeado no final
+    :param origem: arquivo JPEG original
+    :param destino: arquivo a ser gravado, pode ser o próprio original
+    :param orientacao: valor EXIF de 1 a 8
+    :return: None
+    """
+    with open(origem, 'rb') as arquivo:
+        dados = arquivo.read()
+
+    if dados[:2] != b'\xff\xd8':
+        raise ValueError(f'{origem} não é um arquivo JPEG')
+
+    segmento_exif = None
+    insercao = 2
+    for marcador, inicio, fim in __segmentos(dados):
+        if marcador == 0xE1 and dados[inicio + 4:inicio + 10] == b'Exif\x00\x00':
+            segmento_exif = (inicio, fim)
+            break
+        if marcador == 0xE0:
+            # o novo EXIF fica após o JFIF, que deve ser o primeiro segmento
+            insercao = fim
+
+    if segmento_exif is not None:
+        inicio, fim = segmento_exif
+        exif = bytearray(dados[inicio + 4:fim])
+
+        if not __alterar_tag(exif, orientacao):
+            # sem a tag no IFD0 o bloco é regravado pelo PIL com a tag adicionada
+            tags = Image.Exif()
+            tags.load(bytes(exif[6:]))
+            tags[TAG_ORIENTACAO] = orientacao
+            exif = bytearray(tags.tobytes())
+
+        novo = dados[:inicio] + b'\xff\xe1' + struct.pack('>H', len(exif) + 2) + bytes(exif) + dados[fim:]
+    else:
+        tags = Image.Exif()
+        tags[TAG_ORIENTACAO] = orientacao
+        exif = tags.tobytes()
+        novo = dados[:insercao] + b'\xff\xe1' + struct.pack('>H', len(exif) + 2) + exif + dados[insercao:]
+
+    diretorio = os.path.dirname(os.path.abspath(destino))
+    modo = stat.S_IMODE(os.stat(destino if os.path.exists(destino) else origem).st_mode)
+
+    descritor, temporario = tempfile.mkstemp(prefix='.orientacao-', dir=diretorio)
+    try:
+        with os.fdopen(descritor, 'wb') as arquivo:
+            arquivo.write(novo)
+        os.chmod(temporario, modo)
+        os.replace(temporario, destino)
+    except OSError:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
@@ -0,0 +1,289 @@
+"""
+Carregamento de imagens por URL: o download é feito em memória, em uma thread de trabalho, com progresso, prévias
+parciais e cancelamento. Os arquivos baixados ficam em um cache LRU por URL, revalidado pelo ETag
+"""
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from PyQt6.QtCore import QObject, pyqtSignal, QSize, QBuffer, QByteArray, QIODevice, Qt
+from PyQt6.QtGui import QImage, QImageReader
+
+from src.core.imagem import definir_tamanho_original
+
+TAMANHO_BLOCO = 64 * 1024
+TEMPO_LIMITE = 15
+
+# formatos do Qt -> extensão usada no arquivo local
+EXTENSOES_FORMATO = {'jpeg': 'jpg', 'jpg': 'jpg', 'png': 'png', 'bmp': 'bmp', 'tiff': 'tif', 'webp': 'webp'}
+
+
+class Download:
+    def __init__(self, dados: bytes, etag: str | None, modificado: str | None) -> None:
+        self.dados = dados
+        self.etag = etag
+        self.modificado = modificado
+
+
+class CacheUrls:
+    """
+    Cache LRU dos downloads, por URL, limitado pela memória ocupada
+    """
+    LIMITE_BYTES = 256 * 1024 * 1024
+
+    __compartilhado = None
+    __lock_compartilhado = threading.Lock()
+
+    def __init__(self, limite_bytes: int = LIMITE_BYTES) -> None:
+        self.__limite = limite_bytes
+        self.__itens = OrderedDict()
+        self.__ocupado = 0
+        self.__lock = threading.Lock()
+
+    @classmethod
+    def compartilhado(cls) -> 'CacheUrls':
+        with cls.__lock_compartilhado:
+            if cls.__compartilhado is None:
+                cls.__compartilhado = CacheUrls()
+
+            return cls.__compartilhado
+
+    def obter(self, url: str) -> Download | None:
+        with self.__lock:
+            download = self.__itens.get(url)
+            if download is not None:
+                self.__itens.move_to_end(url)
+
+            return download
+
+    def adicionar(self, url: str, download: Download) -> None:
+        tamanho = len(download.dados)
+        if tamanho > self.__limite:
+            return
+
+        with self.__lock:
+            if url in self.__itens:
+                self.__ocupado -= len(self.__itens.pop(url).dados)
+
+            while self.__itens and self.__ocupado + tamanho > self.__limite:
+                _, antigo = self.__itens.popitem(last=False)
+                self.__ocupado -= len(antigo.dados)
+
+            self.__itens[url] = download
+            self.__ocupado += tamanho
+
+    def __len__(self) -> int:
+        return len(self.__itens)
+
+
+def baixar(url: str, cache: CacheUrls, cancelado: Callable[[], bool] = lambda: False,
+           progresso: Callable[[bytes, int], None] = None) -> bytes | None:
+    """
+    Baixa o conteúdo da URL em memória, em blocos. Quando a URL está no cache, o servidor é consultado com o ETag
+    (ou a data de modificação) e o conteúdo só é baixado novamente se tiver mudado
+    :param url: endereço http(s)
+    :param cache: cache dos downloads
+    :param cancelado: função consultada a cada bloco, interrompe o download quando retorna True
+    :param progresso: função chamada a cada bloco com (dados recebidos até o momento, tamanho total ou 0)
+    :return: conteúdo baixado ou None quando cancelado
+    """
+    # o urllib (e o ssl, o http e o email) só é carregado no primeiro download, fora da inicialização do programa
+    from urllib.error import HTTPError
+    from urllib.request import Request, urlopen
+
+    anterior = cache.obter(url)
+    requisicao = Request(url, headers={'User-Agent': 'DoImageViewer'})
+
+    if anterior is not None:
+        if anterior.etag:
+            requisicao.add_header('If-None-Match', anterior.etag)
+        if anterior.modificado:
+            requisicao.add_header('If-Modified-Since', anterior.modificado)
+
+    try:
+        resposta = urlopen(requisicao, timeout=TEMPO_LIMITE)
+    except HTTPError as erro:
+        # 304: o conteúdo em cache continua válido
+        if erro.code == 304 and anterior is not None:
+            return anterior.dados
+        raise
+
+    with resposta:
+        total = int(resposta.headers.get('Content-Length') or 0)
+        recebidos = bytearray()
+
+        while True:
+            if cancelado():
+                return None
+
+            bloco = resposta.read(TAMANHO_BLOCO)
+            if not bloco:
+                break
+
+            recebidos += bloco
+            if progresso is not None:
+                progresso(recebidos, total)
+
+        dados = bytes(recebidos)
+        cache.adicionar(url, Download(dados, resposta.headers.get('ETag'), resposta.headers.get('Last-Modified')))
+
+    return dados
+
+
+def decodificar_parcial(dados: bytes, largura: int, altura: int) -> QImage | None:
+    """
+    Decodifica os dados recebidos até o momento, já reduzidos ao tamanho da tela. Em JPEGs a parte que ainda não
+    chegou fica em branco (ou borrada, nos progressivos)
+    :param dados: início do arquivo
+    :param largura: largura máxima
+    :param altura: altura máxima
+    :return: QImage com o tamanho original registrado, ou None quando ainda não é possível decodificar
+    """
+    buffer = QBuffer()
+    buffer.setData(QByteArray(dados))
+    buffer.open(QIODevice.OpenModeFlag.ReadOnly)
+
+    leitor = QImageReader(buffer)
+    leitor.setAutoTransform(True)
+    tamanho = leitor.size()
+    if not tamanho.isValid():
+        return None
+
+    if tamanho.width() > largura or tamanho.height() > altura:
+        leitor.setScaledSize(tamanho.scaled(largura, altura, Qt.AspectRatioMode.KeepAspectRatio))
+
+    imagem = leitor.read()
+    if imagem.isNull():
+        return None
+
+    definir_tamanho_original(imagem, tamanho.width(), tamanho.height())
+    return imagem
+
+
+def formato_imagem(dados: bytes) -> str | None:
+    """
+    Extensão do arquivo a partir do conteúdo, sem depender da URL
+    :param dados: conteúdo do arquivo
+    :return: extensão ou None quando não é uma imagem suportada
+    """
+    buffer = QBuffer()
+    buffer.setData(QByteArray(dados[:64 * 1024]))
+    buffer.open(QIODevice.OpenModeFlag.ReadOnly)
+
+    return EXTENSOES_FORMATO.get(bytes(QImageReader.imageFormat(buffer)).decode())
+
+
+class CarregadorUrl(QObject):
+    """
+    Executa os downloads em uma thread de trabalho. Como no carregamento de arquivos, cada pedido recebe um número e
+    apenas o mais recente continua; os anteriores são interrompidos no próximo bloco.
+    O arquivo concluído é gravado no diretório informado, com um nome único por URL, para ser exibido como os demais
+    """
+    progresso = pyqtSignal(int, int, int)
+    parcial = pyqtSignal(int, QImage)
+    concluido = pyqtSignal(int, str)
+    falhou = pyqtSignal(int, str)
+
+    # intervalo mínimo entre as prévias parciais, em segundos
+    INTERVALO_PARCIAL = .25
+
+    def __init__(self, diretorio: str, parent=None) -> None:
+        super().__init__(parent)
+
+        self.__diretorio = diretorio
+        self.__cache = CacheUrls.compartilhado()
+        self.__executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='rede')
+        self.__lock = threading.Lock()
+        self.__pedido = 0
+
+    @property
+    def pedido_atual(self) -> int:
+        return self.__pedido
+
+    def carregar(self, url: str, alvo: QSize) -> int:
+        """
+        Inicia o download, interrompendo o anterior
+        :param url: endereço http(s) da imagem
+        :param alvo: tamanho da área de exibição, usado pelas prévias parciais
+        :return: número do pedido
+        """
+        with self.__lock:
+            self.__pedido += 1
+            pedido = self.__pedido
+
+        self.__executor.submit(self.__executar, pedido, url, alvo)
+        return pedido
+
+    def cancelar(self) -> None:
+        with self.__lock:
+            self.__pedido += 1
+
+    def encerrar(self) -> None:
+        self.cancelar()
+        self.__executor.shutdown(wait=False, cancel_futures=True)
+
+    def __obsoleto(self, pedido: int) -> bool:
+        with self.__lock:
+            return pedido != self.__pedido
+
+    def __executar(self, pedido: int, url: str, alvo: QSize) -> None:
+        ultimo_parcial = [time.monotonic()]
+
+        def progresso(recebidos: bytes, total: int) -> None:
+            # noinspection PyUnresolvedReferences
+            self.progresso.emit(pedido, len(recebidos), total)
+
+            if time.monotonic() - ultimo_parcial[0] >= self.INTERVALO_PARCIAL and len(recebidos) < total:
+                parcial = decodificar_parcial(recebidos, alvo.width(), alvo.height())
+                ultimo_parcial[0] = time.monotonic()
+
+                if parcial is not None and not self.__obsoleto(pedido):
+                    # noinspection PyUnresolvedReferences
+                    self.parcial.emit(pedido, parcial)
+
+        try:
+            dados = baixar(url, self.__cache, lambda: self.__obsoleto(pedido), progresso)
+            if dados is None or self.__obsoleto(pedido):
+                return
+
+            extensao = formato_imagem(dados)
+            if extensao is None:
+                # noinspection PyUnresolvedReferences
+                self.falhou.emit(pedido, f"{url} não é uma imagem suportada")
+                return
+
+            arquivo = self.__gravar(url, extensao, dados)
+            if not self.__obsoleto(pedido):
+                # noinspection PyUnresolvedReferences
+                self.concluido.emit(pedido, arquivo)
+
+        except (OSError, ValueError) as erro:
+            # noinspection PyUnresolvedReferences
+            self.falhou.emit(pedido, f"Erro ao baixar {url}: {erro}")
+
+    def __gravar(self, url: str, extensao: str, dados: bytes) -> str:
+        # um arquivo por URL, para que downloads diferentes não se sobrescrevam
+        nome = f"url-{hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]}.{extensao}"
+        caminho = os.path.join(self.__diretorio, nome)
+
+        if os.path.isfile(caminho) and os.path.getsize(caminho) == len(dados):
+            with open(caminho, 'rb') as arquivo:
+                if arquivo.read() == dados:
+                    return caminho
+
+        descritor, temporario = tempfile.mkstemp(prefix='.url-', dir=self.__diretorio)
+        try:
+            with os.fdopen(descritor, 'wb') as arquivo:
+                arquivo.write(dados)
+            os.replace(temporario, caminho)
+        except OSError:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            raise
+
+        return caminho
@@ -0,0 +1,79 @@
+"""
+Aplicação das edições na resolução total em segundo plano. Enquanto a imagem é editada apenas a versão reduzida é
+processada, e a resolução total só é calculada ao gravar ou quando o zoom exige, sem travar a interface
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtGui import QImage
+
+from src.core.edicao import FonteEdicao, aplicar_operacoes
+from src.core.imagem import pil_para_qimage
+
+
+class RenderizadorEdicao(QObject):
+    """
+    Como no carregamento de arquivos, cada pedido recebe um número e apenas o mais recente continua.
+    Os anteriores são interrompidos entre uma operação e outra
+    """
+    concluida = pyqtSignal(int, QImage)
+    falhou = pyqtSignal(int, str)
+
+    def __init__(self, fonte: FonteEdicao, parent=None) -> None:
+        super().__init__(parent)
+
+        self.__fonte = fonte
+        self.__executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='renderizacao')
+        self.__lock = threading.Lock()
+        self.__pedido = 0
+
+    @property
+    def pedido_atual(self) -> int:
+        return self.__pedido
+
+    def renderizar(self, caminho: str, operacoes: list) -> int:
+        """
+        Inicia a aplicação das operações sobre a imagem original, interrompendo a anterior
+        :param caminho: caminho completo do arquivo
+        :param operacoes: [(tipo, parâmetro), ...], copiadas da pilha de edição
+        :return: número do pedido
+        """
+        with self.__lock:
+            self.__pedido += 1
+            pedido = self.__pedido
+
+        self.__executor.submit(self.__executar, pedido, caminho, list(operacoes))
+        return pedido
+
+    def cancelar(self) -> None:
+        with self.__lock:
+            self.__pedido += 1
+
+    def encerrar(self) -> None:
+        self.cancelar()
+        self.__executor.shutdown(wait=False, cancel_futures=True)
+
+    def __obsoleto(self, pedido: int) -> bool:
+        with self.__lock:
+            return pedido != self.__pedido
+
+    def __executar(self, pedido: int, caminho: str, operacoes: list) -> None:
+        if self.__obsoleto(pedido):
+            return
+
+        try:
+            im = aplicar_operacoes(self.__fonte.obter(caminho), operacoes, lambda: self.__obsoleto(pedido))
+            if im is None or self.__obsoleto(pedido):
+                return
+
+            # o QImage é dono dos pixels: a cópia enfileirada pelo sinal continua válida após o fim desta thread
+            imagem = pil_para_qimage(im)
+            if not self.__obsoleto(pedido):
+                # noinspection PyUnresolvedReferences
+                self.concluida.emit(pedido, imagem)
+
+        except (OSError, ValueError, Image.DecompressionBombError) as erro:
+            # noinspection PyUnresolvedReferences
+            self.falhou.emit(pedido, f"Erro ao aplicar as edições: {erro}")
@@ -0,0 +1,169 @@
+"""
+Pirâmide de níveis (mipmap) dividida em tiles, para desenhar imagens muito grandes apenas na área visível
+"""
+import math
+import threading
+from collections import OrderedDict
+
+from PyQt6.QtCore import QObject, pyqtSignal, QRect, QRectF, Qt
+from PyQt6.QtGui import QImage, QPixmap, QPainter
+
+from src.core.imagem import tamanho_bytes, tamanho_bytes_pixmap
+from src.core.memoria import GerenciadorMemoria, PRIORIDADE_TILES
+
+
+class PiramideTiles(QObject):
+    """
+    Cada nível tem metade do tamanho do anterior. Os níveis são gerados em uma thread de trabalho e os tiles são
+    convertidos em QPixmap sob demanda, mantendo apenas os mais recentes.
+    Sob pressão de memória os tiles e depois os níveis são descartados, e o desenho passa a usar o nível mais
+    detalhado que restou
+    """
+    nivel_pronto = pyqtSignal()
+
+    TAMANHO_TILE = 512
+    LIMITE_TILES = 96
+
+    def __init__(self, imagem: QImage, parent=None) -> None:
+        super().__init__(parent)
+
+        self.__niveis: list[QImage | None] = [imagem]
+        self.__tiles = OrderedDict()
+        self.__cancelado = False
+        self.__lock = threading.Lock()
+
+        # o nível 0 compartilha os pixels do pixmap exibido (toImage não copia no backend raster), não é contado
+        # nem descartado
+        self.__bytes_niveis = 0
+        self.__bytes_tiles = 0
+        GerenciadorMemoria.compartilhado().registrar(self, 'pirâmide de tiles', PRIORIDADE_TILES, gui=True)
+
+        threading.Thread(target=self.__construir, name='piramide', daemon=True).start()
+
+    def __construir(self) -> None:
+        nivel = self.__niveis[0]
+
+        while max(nivel.width(), nivel.height()) > self.TAMANHO_TILE and not self.__cancelado:
+            largura, altura = max(1, nivel.width() // 2), max(1, nivel.height() // 2)
+
+            # sem espaço os níveis seguintes não são gerados e o desenho usa os mais detalhados
+            if not GerenciadorMemoria.compartilhado().reservar(self, largura * altura * nivel.depth() // 8):
+                return
+
+            nivel = nivel.scaled(
+                largura, altura, Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.SmoothTransformation
+            )
+
+            with self.__lock:
+                if self.__cancelado:
+                    return
+                self.__niveis.append(nivel)
+                self.__bytes_niveis += tamanho_bytes(nivel)
+
+            # noinspection PyUnresolvedReferences
+            self.nivel_pronto.emit()
+
+    def cancelar(self) -> None:
+        with self.__lock:
+            self.__cancelado = True
+            del self.__niveis[1:]
+            self.__bytes_niveis = 0
+
+        self.__tiles.clear()
+        self.__bytes_tiles = 0
+
+    def memoria_ocupada(self) -> int:
+        return self.__bytes_niveis + self.__bytes_tiles
+
+    def liberar_memoria(self, necessario: int) -> int:
+        """
+        Descarta os tiles menos recentes e, caso não seja suficiente, os níveis a partir do maior
+        :param necessario: bytes a serem liberados
+        :return: bytes liberados
+        """
+        liberado = 0
+        while self.__tiles and liberado < necessario:
+            liberado += tamanho_bytes_pixmap(self.__tiles.popitem(last=False)[1])
+        self.__bytes_tiles -= liberado
+
+        with self.__lock:
+            for indice in range(1, len(self.__niveis)):
+                if liberado >= necessario:
+                    break
+
+                tamanho = tamanho_bytes(self.__niveis[indice])
+                self.__niveis[indice] = None
+                self.__bytes_niveis -= tamanho
+                liberado += tamanho
+
+        return liberado
+
+    def __nivel(self, escala: float) -> int:
+        # escolhe o nível mais próximo cuja resolução ainda é maior ou igual à da tela, entre os não descartados
+        if escala <= 0 or escala >= 1:
+            return 0
+
+        indice = min(int(math.floor(math.log2(1 / escala))), len(self.__niveis) - 1)
+        while self.__niveis[indice] is None:
+            indice -= 1
+
+        return indice
+
+    def __tile(self, indice: int, coluna: int, linha: int, origem: QRect) -> QPixmap:
+        chave = (indice, coluna, linha)
+        pixmap = self.__tiles.get(chave)
+
+        if pixmap is None:
+            pixmap = QPixmap.fromImage(self.__niveis[indice].copy(origem))
+            self.__tiles[chave] = pixmap
+            self.__bytes_tiles += tamanho_bytes_pixmap(pixmap)
+
+            while len(self.__tiles) > self.LIMITE_TILES:
+                self.__bytes_tiles -= tamanho_bytes_pixmap(self.__tiles.popitem(last=False)[1])
+        else:
+            self.__tiles.move_to_end(chave)
+
+        return pixmap
+
+    def desenhar(self, painter: QPainter, area: QRect) -> None:
+        """
+        Desenha apenas os tiles que cruzam a área visível, no nível adequado ao zoom atual.
+        O painter deve estar nas coordenadas em pixels do nível 0
+        :param painter: QPainter do widget
+        :param area: área do widget a ser desenhada
+        :return: None
+        """
+        base = self.__niveis[0]
+        transformacao = painter.worldTransform()
+        inversa, inversivel = transformacao.inverted()
+        if not inversivel:
+            return
+
+        visivel = inversa.mapRect(QRectF(area)).intersected(QRectF(0, 0, base.width(), base.height()))
+        if visivel.isEmpty():
+            return
+
+        escala = math.hypot(transformacao.m11(), transformacao.m12())
+        indice = self.__nivel(escala)
+        nivel = self.__niveis[indice]
+
+        fator_x = base.width() / nivel.width()
+        fator_y = base.height() / nivel.height()
+        tamanho = self.TAMANHO_TILE
+
+        coluna_inicial = int(visivel.left() / fator_x) // tamanho
+        coluna_final = int(visivel.right() / fator_x) // tamanho
+        linha_inicial = int(visivel.top() / fator_y) // tamanho
+        linha_final = int(visivel.bottom() / fator_y) // tamanho
+
+        for linha in range(linha_inicial, linha_final + 1):
+            for coluna in range(coluna_inicial, coluna_final + 1):
+                origem = QRect(coluna * tamanho, linha * tamanho, tamanho, tamanho).intersected(nivel.rect())
+                if origem.isEmpty():
+                    continue
+
+                destino = QRectF(
+                    origem.x() * fator_x, origem.y() * fator_y, origem.width() * fator_x, origem.height() * fator_y
+                )
+                painter.drawPixmap(destino, self.__tile(indice, coluna, linha, origem), QRectF(0, 0, origem.width(),
+                                                                                            origem.height()))
@@ -1,18 +1,65 @@
 import datetime
+import html
 import math
-
-from PyQt6.QtCore import QRect, QPoint, Qt, pyqtSignal
-from PyQt6.QtGui import QPixmap, QPainter, QMouseEvent, QWheelEvent, QPaintEvent, QCursor, QTransform
-from PyQt6.QtWidgets import QWidget, QLabel, QDialog, QVBoxLayout, QDialogButtonBox
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, Future
+from functools import partial
+from typing import Callable
+
+from PyQt6.QtCore import QRect, QPoint, Qt, pyqtSignal, QSize, QPointF, QObject, QAbstractListModel, QModelIndex, \
+    QTimer, QRectF
+from PyQt6.QtGui import QPixmap, QPainter, QMouseEvent, QWheelEvent, QPaintEvent, QCursor, QTransform, QColor, \
+    QIcon, QImage, QPolygonF, QPen
+from PyQt6.QtWidgets import QWidget, QLabel, QDialog, QVBoxLayout, QDialogButtonBox, QListView, QListWidget, \
+    QListWidgetItem, QSlider, QGridLayout
+
+from src.core.amostragem import AmostradorCor
+from src.core.escalas import EscalasPixmap
+from src.core.galeria import NOMES_PREVIAS, TAMANHO_PREVIA
+from src.core.histograma import Estatisticas
+from src.core.imagem import tamanho_bytes_pixmap
+from src.core.memoria import GerenciadorMemoria, PRIORIDADE_ATUAL, PRIORIDADE_ESCALAS, MB
+from src.core.miniaturas import CacheMiniaturas, chave_miniatura, gerar_miniatura, TAMANHO_MINIATURA
+from src.core.tiles import PiramideTiles
 
 
 class ImageViewer(QWidget):
+    # emitido quando o zoom exige mais pixels do que a imagem reduzida exibida possui
+    resolucao_insuficiente = pyqtSignal()
+    # posição no tamanho original e cor (r, g, b) sob o cursor, ou uma tupla vazia fora da imagem
+    cor_cursor = pyqtSignal(int, int, tuple)
+
+    # acima deste tamanho a imagem é desenhada em tiles a partir de uma pirâmide de níveis
+    LIMITE_PIXELS_TILES = 24_000_000
 
     def __init__(self, parent, antialiasing: bool = True) -> None:
         super().__init__(parent)
 
         # Imagem
         self.m_pixmap = QPixmap()
+        self.__tamanho_original = QSize()
+        self.__fator = 1.0
+        # rotações e inversões são aplicadas apenas no desenho, o pixmap fica sempre na orientação do arquivo
+        self.__transformacao = QTransform()
+        self.__resolucao_pedida = False
+        self.__piramide = None
+        # leitura das cores pelos pixels da imagem exibida, criada no primeiro uso
+        self.__amostrador = None
+        self.__lado_amostra = 1
+        self.__leitura_cursor = False
+        GerenciadorMemoria.compartilhado().registrar(self, 'imagem exibida', PRIORIDADE_ATUAL, gui=True)
+
+        # versões reduzidas para o zoom atual e o caminho rápido durante o arraste ou zoom
+        self.__escalas = EscalasPixmap(self)
+        self.__escalas.atualizada.connect(self.update)
+        self.__interagindo = False
+        self.__timer_interacao = QTimer(self)
+        self.__timer_interacao.setSingleShot(True)
+        self.__timer_interacao.setInterval(150)
+        self.__timer_interacao.timeout.connect(self.__fim_interacao)
 
         # Variáveis de controle
         self.m_rect = QRect()
@@ -23,7 +70,6 @@ class ImageViewer(QWidget):
 
         # Variaveis de configuração
         self.__arrastando_imagem = False
-        self.__rotacao = 0
         self.__antialiasing = antialiasing
         self.__filtro = None
 
@@ -46,9 +92,11 @@ class ImageViewer(QWidget):
         # desenhar a imagem
         painter = QPainter()
         painter.begin(self)
-        painter.translate(paint_event.rect().center())
+        # o centro do widget, e não o da área atualizada: uma atualização parcial não desloca a imagem
+        painter.translate(self.rect().center())
         painter.scale(self.m_scale, self.m_scale)
         painter.translate(self.m_delta)
+        painter.setTransform(self.__transformacao, True)
 
         # Adiciona o filtro
         if self.__filtro is not None:
@@ -63,9 +111,71 @@ class ImageViewer(QWidget):
                 self.__antialiasing
             )
 
-        painter.drawPixmap(self.m_rect.topLeft(), self.m_pixmap)
+        if self.__usar_tiles():
+            painter.translate(QPointF(self.m_rect.topLeft()))
+            painter.scale(self.__fator, self.__fator)
+            self.__piramide.desenhar(painter, paint_event.rect())
+        else:
+            self.__desenhar_pixmap(painter)
+
         painter.end()
 
+    def __desenhar_pixmap(self, painter: QPainter):
+        # escala entre os pixels do pixmap e os pixels da tela
+        razao = self.devicePixelRatioF()
+        escala = self.m_scale * self.__fator * razao
+
+        if self.__antialiasing and 0 < escala < 1:
+            reduzido = self.__escalas.obter(escala)
+
+            if reduzido is not None:
+                # a versão reduzida é desenhada sem escala, apenas orientada e alinhada aos pixels da tela
+                destino = painter.transform().mapRect(QRectF(self.m_rect))
+                reduzido.setDevicePixelRatio(razao)
+                orientado = self.__transformacao.mapRect(QRectF(QPointF(0, 0), reduzido.deviceIndependentSize()))
+
+                painter.setTransform(
+                    self.__transformacao *
+                    QTransform.fromTranslate(round(destino.x()) - orientado.x(), round(destino.y()) - orientado.y())
+                )
+                painter.drawPixmap(QPointF(0, 0), reduzido)
+                return
+
+            if not self.__interagindo:
+                self.__escalas.pedir(self.m_pixmap, escala)
+
+        if self.__interagindo:
+            # caminho rápido (vizinho mais próximo) enquanto a imagem é arrastada ou ampliada
+            painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform, False)
+
+        painter.drawPixmap(self.m_rect, self.m_pixmap)
+
+    def __interacao(self):
+        self.__interagindo = True
+        self.__timer_interacao.start()
+
+    def __fim_interacao(self):
+        self.__interagindo = False
+        self.update()
+
+    def __usar_tiles(self) -> bool:
+        if self.m_pixmap.width() * self.m_pixmap.height() <= self.LIMITE_PIXELS_TILES:
+            return False
+
+        if self.__piramide is None:
+            self.__piramide = PiramideTiles(self.m_pixmap.toImage(), self)
+            self.__piramide.nivel_pronto.connect(self.update)
+
+        return True
+
+    def __descartar_piramide(self):
+        self.__escalas.limpar()
+
+        if self.__piramide is not None:
+            self.__piramide.cancelar()
+            self.__piramide.deleteLater()
+            self.__piramide = None
+
     def mousePressEvent(self, mouse_event: QMouseEvent):
         self.m_reference = mouse_event.pos()
         self.m_mouse_global = mouse_event.globalPosition()
@@ -80,11 +190,26 @@ class ImageViewer(QWidget):
         self.__arrastando_imagem = False
 
     def mouseMoveEvent(self, mouse_event: QMouseEvent):
+        # só redesenha quando a imagem foi de fato arrastada
         if self.__arrastando_imagem:
-            self.m_delta += (mouse_event.pos() - self.m_reference) * 1.0 / self.m_scale
+            delta = self.m_delta + (mouse_event.pos() - self.m_reference) * 1.0 / self.m_scale
+
+            if delta != self.m_delta:
+                self.m_delta = delta
+                self.__interacao()
+                self.update()
 
         self.m_reference = mouse_event.pos()
-        self.update()
+
+        if self.__leitura_cursor and not self.__arrastando_imagem:
+            posicao = self.__posicao_imagem(QPointF(mouse_event.pos()))
+
+            if posicao is None:
+                # noinspection PyUnresolvedReferences
+                self.cor_cursor.emit(0, 0, ())
+            else:
+                # noinspection PyUnresolvedReferences
+                self.cor_cursor.emit(int(posicao.x()), int(posicao.y()), self.__cor_em(posicao) or ())
 
     def wheelEvent(self, event: QWheelEvent):
         """
@@ -98,6 +223,9 @@ class ImageViewer(QWidget):
             self.__scale(-.01)
 
     def __scale(self, s: float):
+        escala_anterior = self.m_scale
+        delta_anterior = QPoint(self.m_delta)
+
         # mouse_x = self.m_reference.x()
         # mouse_y = self.m_reference.y()
         # tela_x = int(self.size().width() / 2)
@@ -125,33 +253,38 @@ class ImageViewer(QWidget):
             #     self.m_delta = QPoint(0, 0)
 
         if self.m_scale <= .5:
-            if self.__rotacao == 90 or self.__rotacao == 270:
-                pixm_y = self.m_pixmap.size().width()
-                pixm_x = self.m_pixmap.size().height()
+            self.m_delta = QPoint(0, 0)
 
-                self.m_delta = (QPoint(pixm_x, pixm_y) - QPoint(pixm_y, pixm_x)) / 2
-            else:
-                self.m_delta = QPoint(0, 0)
+        # nos limites do zoom a vista não muda e não há o que redesenhar
+        if (self.m_scale, self.m_delta) == (escala_anterior, delta_anterior):
+            return
 
+        self.__interacao()
+        self.verificar_resolucao()
         self.update()
 
+    def verificar_resolucao(self):
+        """
+        Emite 'resolucao_insuficiente' quando o zoom atual exige mais pixels do que a imagem exibida possui
+        :return: None
+        """
+        if self.__fator > 1 and self.m_scale * self.__fator > 1 and not self.__resolucao_pedida:
+            self.__resolucao_pedida = True
+            # noinspection PyUnresolvedReferences
+            self.resolucao_insuficiente.emit()
+
     def __calcular_centro(self):
         try:
             # definição de tamanhos
             tela_y = self.parentWidget().parentWidget().height() - 73  # self.size().height()
             tela_x = self.parentWidget().parentWidget().width() - 70  # self.size().width()
 
-            # Verifica se as dimensões estão invertidas, como resultado da rotação da imagem
-            if self.__rotacao == 90 or self.__rotacao == 270:
-                pixm_y = self.m_pixmap.size().width()
-                pixm_x = self.m_pixmap.size().height()
+            # o retângulo já considera a rotação e o tamanho original da imagem
+            exibido = self.__transformacao.mapRect(self.m_rect)
+            pixm_x = exibido.width()
+            pixm_y = exibido.height()
 
-                self.m_delta = (QPoint(pixm_x, pixm_y) - QPoint(pixm_y, pixm_x)) / 2
-            else:
-                pixm_x = self.m_pixmap.size().width()
-                pixm_y = self.m_pixmap.size().height()
-
-                self.m_delta = QPoint(0, 0)
+            self.m_delta = QPoint(0, 0)
 
             # definição do lado maior e da orientação da imagem
             lado_maior = max(pixm_x, pixm_y)
@@ -167,194 +300,108 @@ class ImageViewer(QWidget):
                 zoom_minimo = round(zoom_minimo, 1)
 
             self.m_scale = zoom_minimo
+            self.verificar_resolucao()
             self.update()
         except ZeroDivisionError:
             pass
 
-    @staticmethod
-    def __verifica_igualdade_pixels(ant, atual, fator):
-        # return ant == atual or \
-        #    ((abs(ant.red() - atual.red()) <= fator) and (abs(ant.green() - atual.green()) <= fator) and (
-        #        abs(ant.blue() - atual.blue())) <= fator)
-
-        red_diff = abs(ant.red() - atual.red())
-        green_diff = abs(ant.green() - atual.green())
-        blue_diff = abs(ant.blue() - atual.blue())
-        alpha_diff = abs(ant.alpha() - atual.alpha())
-
-        # Calculate the total color difference
-        total_diff = red_diff + green_diff + blue_diff + alpha_diff
-
-        return total_diff <= fator
-
-    def __cut_image(self, im: QPixmap, fator=3) -> (int, int, int, int):
-
-        fator = 50
-
-        width = im.size().width()
-        height = im.size().height()
-
-        metade_vertical = math.floor(height / 2)
-        metade_horizontal = math.floor(width / 2)
-
-        x1 = 0
-        x2 = 0
-        x3 = 0
-        x4 = 0
-
-        # START
-        col = 1
-        while col < math.floor(width / 2):
-            pixel_anterior = im.toImage().pixelColor(col - 1, metade_vertical)  # getpixel((col - 1, metade_vertical))
-            pixel_atual = im.toImage().pixelColor(col, metade_vertical)
-
-            if self.__verifica_igualdade_pixels(pixel_anterior, pixel_atual, fator):
-                x1 += 1
-            else:
-                x1 += 1
-                break
-
-            col += 1
-
-        # END
-        col = width - 2
-        while col > math.floor(width / 2):
-            pixel_anterior = im.toImage().pixelColor(col + 1, metade_vertical)
-            pixel_atual = im.toImage().pixelColor(col, metade_vertical)
-
-            if self.__verifica_igualdade_pixels(pixel_anterior, pixel_atual, fator):
-                x2 += 1
-            else:
-                x2 += 1
-                break
-
-            col -= 1
-
-        # TOP
-        lin = 1
-        while lin < math.floor(height / 2):
-            pixel_anterior = im.toImage().pixelColor(metade_horizontal, lin - 1)
-            pixel_atual = im.toImage().pixelColor(metade_horizontal, lin)
-
-            if self.__verifica_igualdade_pixels(pixel_anterior, pixel_atual, fator):
-                x3 += 1
-            else:
-                x3 += 1
-                break
+    def __atualizar_rect(self):
+        # o retângulo de desenho tem o tamanho original, mesmo quando a imagem exibida é reduzida.
+        # Fica centralizado na origem, onde as rotações e inversões são aplicadas
+        self.m_rect = QRect(QPoint(0, 0), self.m_pixmap.size() * self.__fator)
+        self.m_rect.translate(-self.m_rect.center())
 
-            lin += 1
+    def adicionar_imagem(self, pixmap: QPixmap, tamanho_original: QSize = None) -> None:
+        self.__descartar_piramide()
+        self.m_pixmap = pixmap
+        self.__amostrador = None
+        self.__transformacao = QTransform()
+        self.__resolucao_pedida = False
 
-        # BOT
-        lin = height - 2
-        while lin > math.floor(height / 2):
-            pixel_anterior = im.toImage().pixelColor(metade_horizontal, lin + 1)
-            pixel_atual = im.toImage().pixelColor(metade_horizontal, lin)
+        if tamanho_original is not None and not pixmap.isNull() and tamanho_original.width() > pixmap.width():
+            self.__tamanho_original = tamanho_original
+            self.__fator = tamanho_original.width() / pixmap.width()
+        else:
+            self.__tamanho_original = pixmap.size()
+            self.__fator = 1.0
 
-            if self.__verifica_igualdade_pixels(pixel_anterior, pixel_atual, fator):
-                x4 += 1
-            else:
-                x4 += 1
-                break
+        self.__atualizar_rect()
+        self.__calcular_centro()
 
-            lin -= 1
+        # abre espaço para a nova imagem, descartando caches de menor prioridade
+        GerenciadorMemoria.compartilhado().reservar(self)
 
-        return x1, width - x2, x3, height - x4
+    def substituir_imagem(self, pixmap: QPixmap) -> None:
+        """
+        Troca a imagem exibida por outra versão da mesma imagem (ex: a prévia pela resolução total),
+        mantendo o zoom, a posição e as rotações aplicadas
+        :param pixmap: nova versão da imagem, sem rotações
+        :return: None
+        """
+        if pixmap.isNull():
+            return
 
-    def __crop_margem(self, pix: QPixmap) -> QPixmap:
-        x, w, y, h = self.__cut_image(pix)
+        self.__descartar_piramide()
+        self.__fator = max(1.0, self.__tamanho_original.width() / pixmap.width())
+        self.__resolucao_pedida = False
+        self.m_pixmap = pixmap
+        self.__amostrador = None
 
-        # im1 = im.crop((x, y, w, h))
+        self.__atualizar_rect()
+        self.update()
+        GerenciadorMemoria.compartilhado().reservar(self)
 
-        return pix.copy(QRect(x, y, w, h))
+    def memoria_ocupada(self) -> int:
+        return tamanho_bytes_pixmap(self.m_pixmap)
 
     @staticmethod
-    def color_difference(color1, color2, threshold):
-        red_diff = abs(color1.red() - color2.red())
-        green_diff = abs(color1.green() - color2.green())
-        blue_diff = abs(color1.blue() - color2.blue())
-        alpha_diff = abs(color1.alpha() - color2.alpha())
-        total_diff = red_diff + green_diff + blue_diff + alpha_diff
-        return total_diff <= threshold
-
-    def detect_borders(self, image, width, height, fator):
-        x1, x2, y1, y2 = 0, 0, 0, 0
-
-        # Check left border
-        col = 1
-        while col < width / 2:
-            if self.color_difference(image.pixelColor(col - 1, height // 2), image.pixelColor(col, height // 2), fator):
-                x1 += 1
-            else:
-                x1 += 1
-                break
-            col += 1
-
-        # Check right border
-        col = width - 2
-        while col > width / 2:
-            if self.color_difference(image.pixelColor(col + 1, height // 2), image.pixelColor(col, height // 2), fator):
-                x2 += 1
-            else:
-                x2 += 1
-                break
-            col -= 1
-
-        # Check top border
-        lin = 1
-        while lin < height / 2:
-            if self.color_difference(image.pixelColor(width // 2, lin - 1), image.pixelColor(width // 2, lin), fator):
-                y1 += 1
-            else:
-                y1 += 1
-                break
-            lin += 1
-
-        # Check bottom border
-        lin = height - 2
-        while lin > height / 2:
-            if self.color_difference(image.pixelColor(width // 2, lin + 1), image.pixelColor(width // 2, lin), fator):
-                y2 += 1
-            else:
-                y2 += 1
-                break
-            lin -= 1
+    def liberar_memoria(_: int) -> int:
+        # a imagem exibida nunca é descartada
+        return 0
 
-        return x1, width - x2, y1, height - y2
+    def tamanho_exibido(self) -> QSize:
+        """
+        Tamanho da imagem na tela com o zoom atual, sem as rotações
+        :return: QSize
+        """
+        return self.__tamanho_original * self.m_scale
 
-    def crop_margins(self, pixmap, threshold):
-        image = pixmap.toImage()
-        width = image.width()
-        height = image.height()
+    def reduzida(self) -> bool:
+        """
+        Indica se a imagem exibida tem resolução menor que a do arquivo
+        :return: bool
+        """
+        return self.__fator > 1
 
-        x, w, y, h = self.detect_borders(image, width, height, threshold)
-        return pixmap.copy(QRect(x, y, w - x, h - y))
+    def imagem_exibida(self) -> QImage:
+        """
+        Pixels da imagem exibida, sem as rotações (o QImage compartilha os dados do pixmap, sem cópia)
+        :return: QImage
+        """
+        return self.m_pixmap.toImage()
 
-    def adicionar_imagem(self, pixmap: QPixmap) -> None:
-        self.m_pixmap = pixmap
+    def orientacao(self) -> tuple:
+        """
+        Rotações e inversões aplicadas pelo usuário
+        :return: matriz 2x2 ((xx, xy), (yx, yy)), com o eixo y para baixo
+        """
+        t = self.__transformacao
+        return (round(t.m11()), round(t.m21())), (round(t.m12()), round(t.m22()))
 
-        self.m_rect = self.m_pixmap.rect()
-        self.m_rect.translate(-self.m_rect.center())
+    def imagem_orientada(self) -> QPixmap:
+        """
+        Pixmap exibido com as rotações e inversões aplicadas, usado ao gravar a imagem
+        :return: QPixmap
+        """
+        if self.__transformacao.isIdentity():
+            return self.m_pixmap
 
-        self.__rotacao = 0
-        self.__calcular_centro()
+        return self.m_pixmap.transformed(self.__transformacao)
 
     def rotacionar(self, direcao: str):
-        rotacao = 90
-        if direcao == 'dir':
-            self.__rotacao += 90
-        else:
-            self.__rotacao -= -90
-            rotacao *= -1
-
-        if self.__rotacao >= 360:
-            self.__rotacao = 0
-
-        if self.__rotacao <= -360:
-            self.__rotacao = 360
-
         rm = QTransform()
-        rm.rotate(rotacao)
-        self.m_pixmap = self.m_pixmap.transformed(rm)
+        rm.rotate(90 if direcao == 'dir' else -90)
+        self.__transformacao *= rm
         self.__calcular_centro()
         self.update()
 
@@ -373,21 +420,582 @@ class ImageViewer(QWidget):
     def inverter_horizontal(self):
         rm = QTransform()
         rm.scale(-1, 1)
-        self.m_pixmap = self.m_pixmap.transformed(rm)
+        self.__transformacao *= rm
         self.update()
 
     def inverter_vertical(self):
         rm = QTransform()
         rm.scale(1, -1)
-        self.m_pixmap = self.m_pixmap.transformed(rm)
+        self.__transformacao *= rm
         self.update()
 
+    def encerrar(self):
+        # interrompe o trabalho em segundo plano ao fechar a janela
+        self.__descartar_piramide()
+        self.__escalas.encerrar()
+
     def mudar_antialiasing(self, on: bool):
         self.__antialiasing = on
 
+    def definir_amostragem(self, lado: int, leitura_cursor: bool) -> None:
+        """
+        :param lado: lado da área N x N (em pixels do original) cuja média é a cor selecionada
+        :param leitura_cursor: emite 'cor_cursor' a cada movimento do mouse
+        :return: None
+        """
+        self.__lado_amostra = max(1, lado)
+        self.__leitura_cursor = leitura_cursor
+
+    def __posicao_imagem(self, pos: QPointF) -> QPointF | None:
+        # o mesmo caminho do paintEvent, invertido: tela -> imagem no tamanho original, antes das rotações
+        tela = self.__transformacao * QTransform.fromTranslate(self.m_delta.x(), self.m_delta.y()) * \
+            QTransform.fromScale(self.m_scale, self.m_scale) * \
+            QTransform.fromTranslate(self.rect().center().x(), self.rect().center().y())
+        inversa, invertida = tela.inverted()
+        if not invertida or self.m_pixmap.isNull():
+            return None
+
+        posicao = inversa.map(pos) - QPointF(self.m_rect.topLeft())
+        if not (0 <= posicao.x() < self.m_rect.width() and 0 <= posicao.y() < self.m_rect.height()):
+            return None
+
+        return posicao
+
+    def amostrar(self, pos: QPoint) -> tuple | None:
+        """
+        Cor da imagem exibida no ponto do widget, média da área definida em definir_amostragem
+        :param pos: posição no widget
+        :return: (r, g, b) ou None fora da imagem
+        """
+        posicao = self.__posicao_imagem(QPointF(pos))
+        return self.__cor_em(posicao) if posicao is not None else None
+
+    def __cor_em(self, posicao: QPointF) -> tuple | None:
+        if self.__amostrador is None:
+            # no backend raster o QImage compartilha os pixels do pixmap, sem cópia
+            self.__amostrador = AmostradorCor(self.m_pixmap.toImage())
+
+        # em uma versão reduzida cada pixel já é a média de vários pixels do original, a área diminui na mesma proporção
+        return self.__amostrador.cor(
+            int(posicao.x() / self.__fator), int(posicao.y() / self.__fator),
+            max(1, round(self.__lado_amostra / self.__fator))
+        )
+
     def get_posicao_mouse(self) -> ():
-        screen = self.grab()
-        return screen.toImage().pixelColor(self.m_reference.x(), self.m_reference.y()).getRgb()
+        # lê a cor do pixel da imagem sob o cursor, sem desenhar o widget
+        cor = self.amostrar(self.m_reference)
+        return cor + (255,) if cor is not None else None
+
+
+class GeradorMiniaturas(QObject):
+    """
+    Gera as miniaturas em um pool de processos e as guarda no cache em disco, mantendo as mais recentes em memória
+    """
+    pronta = pyqtSignal(str)
+
+    LIMITE_MEMORIA = 512
+
+    __compartilhado = None
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+
+        self.__cache = CacheMiniaturas()
+        self.__memoria = OrderedDict()
+        self.__bytes_memoria = 0
+        self.__pendentes: dict[str, Future] = {}
+        self.__lock = threading.Lock()
+        self.__executor = None
+
+        # as miniaturas descartadas são lidas novamente do cache em disco
+        GerenciadorMemoria.compartilhado().registrar(self, 'miniaturas', PRIORIDADE_ESCALAS, gui=True)
+
+    @classmethod
+    def compartilhado(cls) -> 'GeradorMiniaturas':
+        """
+        Gerador único do processo, usado por todas as janelas (mesmo pool de processos e cache em memória)
+        :return: GeradorMiniaturas
+        """
+        if cls.__compartilhado is None:
+            cls.__compartilhado = GeradorMiniaturas()
+
+        return cls.__compartilhado
+
+    def __pool(self) -> ProcessPoolExecutor:
+        # o pool só é criado quando a primeira miniatura precisa ser gerada
+        if self.__executor is None:
+            self.__executor = ProcessPoolExecutor(
+                max_workers=max(1, (os.cpu_count() or 2) - 1),
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return self.__executor
+
+    def obter(self, caminho: str, stat: os.stat_result) -> QPixmap | None:
+        """
+        Retorna a miniatura da memória ou do disco. Caso não exista, agenda a geração e retorna None
+        :param caminho: caminho completo do arquivo
+        :param stat: resultado do 'stat' do arquivo
+        :return: QPixmap ou None
+        """
+        chave = chave_miniatura(caminho, stat.st_mtime_ns, stat.st_size)
+        pixmap = self.__memoria.get(chave)
+        if pixmap is not None:
+            self.__memoria.move_to_end(chave)
+            return pixmap
+
+        dados = self.__cache.obter(chave)
+        if dados is not None:
+            pixmap = QPixmap()
+            pixmap.loadFromData(dados)
+            tamanho = tamanho_bytes_pixmap(pixmap)
+            if not GerenciadorMemoria.compartilhado().reservar(self, tamanho):
+                return pixmap
+
+            self.__memoria[chave] = pixmap
+            self.__bytes_memoria += tamanho
+
+            while len(self.__memoria) > self.LIMITE_MEMORIA:
+                self.__bytes_memoria -= tamanho_bytes_pixmap(self.__memoria.popitem(last=False)[1])
+            return pixmap
+
+        with self.__lock:
+            if caminho not in self.__pendentes:
+                futuro = self.__pool().submit(gerar_miniatura, caminho, TAMANHO_MINIATURA)
+                self.__pendentes[caminho] = futuro
+                futuro.add_done_callback(partial(self.__concluida, caminho, chave))
+
+        return None
+
+    def memoria_ocupada(self) -> int:
+        return self.__bytes_memoria
+
+    def liberar_memoria(self, necessario: int) -> int:
+        """
+        Descarta as miniaturas menos recentes da memória
+        :param necessario: bytes a serem liberados
+        :return: bytes liberados
+        """
+        liberado = 0
+        while self.__memoria and liberado < necessario:
+            liberado += tamanho_bytes_pixmap(self.__memoria.popitem(last=False)[1])
+
+        self.__bytes_memoria -= liberado
+        return liberado
+
+    def __concluida(self, caminho: str, chave: str, futuro: Future) -> None:
+        with self.__lock:
+            self.__pendentes.pop(caminho, None)
+
+        if futuro.cancelled() or futuro.exception() is not None:
+            return
+
+        dados = futuro.result()
+        if dados:
+            self.__cache.adicionar(chave, dados)
+            # noinspection PyUnresolvedReferences
+            self.pronta.emit(caminho)
+
+    def cancelar(self, manter: set = frozenset()) -> None:
+        """
+        Cancela as miniaturas ainda não iniciadas, exceto as indicadas
+        :param manter: caminhos que continuam necessários
+        :return: None
+        """
+        with self.__lock:
+            for caminho in [x for x in self.__pendentes if x not in manter]:
+                if self.__pendentes[caminho].cancel():
+                    del self.__pendentes[caminho]
+
+    def encerrar(self) -> None:
+        self.cancelar()
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=False, cancel_futures=True)
+        self.__cache.fechar()
+
+
+class ModeloMiniaturas(QAbstractListModel):
+    """
+    Modelo da lista de miniaturas. Os dados só são pedidos para os itens visíveis, então as miniaturas de diretórios
+    com dezenas de milhares de arquivos são geradas conforme a rolagem
+    """
+
+    def __init__(self, gerador: GeradorMiniaturas, parent=None) -> None:
+        super().__init__(parent)
+
+        self.__gerador = gerador
+        self.__gerador.pronta.connect(self.__miniatura_pronta)
+
+        self.__caminho = ''
+        self.__lista = []
+        self.__linhas = {}
+        self.__stat: Callable[[str], os.stat_result | None] = lambda nome: None
+
+        self.__vazia = QPixmap(TAMANHO_MINIATURA, TAMANHO_MINIATURA)
+        self.__vazia.fill(QColor(0, 0, 0, 0))
+
+    def definir(self, caminho: str, lista: list, stat: Callable[[str], os.stat_result | None]) -> None:
+        self.beginResetModel()
+        self.__caminho = caminho
+        self.__lista = lista
+        self.__linhas = {}
+        self.__stat = stat
+        self.endResetModel()
+
+    def mesma_lista(self, caminho: str, lista: list) -> bool:
+        return caminho == self.__caminho and (lista is self.__lista or lista == self.__lista)
+
+    def caminho(self, linha: int) -> str:
+        return f'{self.__caminho}{self.__lista[linha]}'
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.__lista)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.__lista):
+            return None
+
+        nome = self.__lista[index.row()]
+
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return nome
+
+        if role == Qt.ItemDataRole.DecorationRole:
+            stat = self.__stat(nome)
+            if stat is None:
+                return self.__vazia
+
+            return self.__gerador.obter(f'{self.__caminho}{nome}', stat) or self.__vazia
+
+        return None
+
+    def __miniatura_pronta(self, caminho: str) -> None:
+        if not caminho.startswith(self.__caminho):
+            return
+
+        # o mapa nome -> linha só é montado quando a primeira miniatura fica pronta
+        if not self.__linhas:
+            self.__linhas = {nome: i for i, nome in enumerate(self.__lista)}
+
+        linha = self.__linhas.get(caminho[len(self.__caminho):])
+        if linha is not None:
+            indice = self.index(linha)
+            # noinspection PyUnresolvedReferences
+            self.dataChanged.emit(indice, indice, [Qt.ItemDataRole.DecorationRole])
+
+
+class FaixaMiniaturas(QListView):
+    """
+    Faixa (ou grade) virtualizada de miniaturas do diretório
+    """
+    selecionada = pyqtSignal(int)
+
+    def __init__(self, gerador: GeradorMiniaturas, theme, parent=None) -> None:
+        super().__init__(parent)
+
+        self.__gerador = gerador
+        self.__modelo = ModeloMiniaturas(gerador, self)
+        self.setModel(self.__modelo)
+
+        self.setUniformItemSizes(True)
+        self.setMovement(QListView.Movement.Static)
+        self.setResizeMode(QListView.ResizeMode.Adjust)
+        self.setIconSize(QSize(96, 96))
+        self.setGridSize(QSize(104, 104))
+        self.setSelectionMode(QListView.SelectionMode.SingleSelection)
+        self.definir_grade(False)
+        self.setStyleSheet(
+            "QListView {background-color: " + theme.color_primary + "; border: None;}"
+            "QListView::item:selected {background-color: " + theme.color_accent + ";}"
+        )
+
+        # noinspection PyUnresolvedReferences
+        self.clicked.connect(lambda indice: self.selecionada.emit(indice.row()))
+
+        # ao rolar, cancela as miniaturas que saíram da área visível
+        self.__timer = QTimer(self)
+        self.__timer.setSingleShot(True)
+        self.__timer.setInterval(150)
+        self.__timer.timeout.connect(self.__cancelar_invisiveis)
+        self.horizontalScrollBar().valueChanged.connect(self.__timer.start)
+        self.verticalScrollBar().valueChanged.connect(self.__timer.start)
+
+    def definir_grade(self, grade: bool) -> None:
+        self.setFlow(QListView.Flow.LeftToRight)
+        self.setWrapping(grade)
+
+    def definir(self, caminho: str, lista: list, stat: Callable[[str], os.stat_result | None], indice: int) -> None:
+        if not self.__modelo.mesma_lista(caminho, lista):
+            self.__gerador.cancelar()
+            self.__modelo.definir(caminho, lista, stat)
+
+        self.selecionar(indice)
+
+    def recarregar(self) -> None:
+        """
+        Pede novamente as miniaturas visíveis, com o stat atual dos arquivos (ex: após regravar um arquivo)
+        :return: None
+        """
+        self.viewport().update()
+
+    def selecionar(self, indice: int) -> None:
+        if 0 <= indice < self.__modelo.rowCount():
+            modelo_indice = self.__modelo.index(indice)
+            self.setCurrentIndex(modelo_indice)
+            self.scrollTo(modelo_indice, QListView.ScrollHint.PositionAtCenter)
+
+    def __cancelar_invisiveis(self) -> None:
+        area = self.viewport().rect()
+        visiveis = set()
+
+        for ponto in (area.topLeft(), area.bottomRight()):
+            indice = self.indexAt(ponto)
+            if indice.isValid():
+                visiveis.add(indice.row())
+
+        if visiveis:
+            inicio, fim = min(visiveis), max(visiveis)
+            self.__gerador.cancelar({self.__modelo.caminho(x) for x in range(inicio, fim + 1)})
+
+
+class GaleriaFiltros(QListWidget):
+    """
+    Prévias de todos os filtros sobre a imagem exibida. As prévias chegam uma a uma, conforme ficam prontas
+    """
+    selecionado = pyqtSignal(int)
+
+    def __init__(self, theme, parent=None) -> None:
+        super().__init__(parent)
+
+        self.setViewMode(QListWidget.ViewMode.IconMode)
+        self.setMovement(QListWidget.Movement.Static)
+        self.setResizeMode(QListWidget.ResizeMode.Adjust)
+        self.setFlow(QListWidget.Flow.LeftToRight)
+        self.setWrapping(True)
+        self.setUniformItemSizes(True)
+        self.setIconSize(QSize(TAMANHO_PREVIA, TAMANHO_PREVIA))
+        self.setGridSize(QSize(TAMANHO_PREVIA + 12, TAMANHO_PREVIA + 28))
+        self.setSelectionMode(QListWidget.SelectionMode.SingleSelection)
+        self.setStyleSheet(
+            "QListWidget {background-color: " + theme.color_primary + "; color: " + theme.color_text +
+            "; border: None;}"
+            "QListWidget::item:selected {background-color: " + theme.color_accent + ";}"
+        )
+
+        for nome in NOMES_PREVIAS:
+            self.addItem(QListWidgetItem(nome))
+
+        # noinspection PyUnresolvedReferences
+        self.itemClicked.connect(lambda item: self.selecionado.emit(self.row(item)))
+
+    def limpar(self) -> None:
+        for linha in range(self.count()):
+            self.item(linha).setIcon(QIcon())
+
+    def definir_previa(self, indice: int, imagem: QImage) -> None:
+        """
+        :param indice: 0 para a original, os seguintes na ordem de FILTROS
+        :param imagem: prévia já reduzida
+        :return: None
+        """
+        if 0 <= indice < self.count():
+            self.item(indice).setIcon(QIcon(QPixmap.fromImage(imagem)))
+
+    def marcar(self, indice: int) -> None:
+        if 0 <= indice < self.count():
+            self.setCurrentRow(indice)
+
+
+class PainelAjustes(QWidget):
+    """
+    Controles deslizantes das correções. Durante o arraste 'alterado' é emitido a cada valor e, ao soltar, 'confirmado'
+    """
+    alterado = pyqtSignal(str, float)
+    confirmado = pyqtSignal(str, float)
+
+    # cada passo do controle vale 0.01 no fator
+    PASSOS = 100
+
+    def __init__(self, ajustes: tuple, minimo: float, maximo: float, theme, parent=None) -> None:
+        """
+        :param ajustes: ((tipo, rótulo), ...)
+        :param minimo: menor fator
+        :param maximo: maior fator
+        :param theme: tema da janela
+        :param parent: widget pai
+        """
+        super().__init__(parent)
+
+        self.__controles = {}
+        self.__valores = {}
+
+        layout = QGridLayout(self)
+        layout.setColumnStretch(1, 1)
+        self.setMinimumWidth(200)
+        self.setStyleSheet(
+            "QWidget {background-color: " + theme.color_primary + "; color: " + theme.color_text + ";}"
+        )
+
+        for linha, (tipo, rotulo) in enumerate(ajustes):
+            controle = QSlider(Qt.Orientation.Horizontal, self)
+            controle.setRange(round(minimo * self.PASSOS), round(maximo * self.PASSOS))
+            controle.setValue(self.PASSOS)
+            controle.setPageStep(self.PASSOS // 10)
+            valor = QLabel(self.__formatar(1.0), self)
+
+            # noinspection PyUnresolvedReferences
+            controle.valueChanged.connect(lambda passo, t=tipo: self.__alterado(t, passo))
+            # noinspection PyUnresolvedReferences
+            controle.sliderReleased.connect(lambda t=tipo: self.__confirmado(t))
+
+            layout.addWidget(QLabel(rotulo, self), linha, 0)
+            layout.addWidget(controle, linha, 1)
+            layout.addWidget(valor, linha, 2)
+            self.__controles[tipo] = controle
+            self.__valores[tipo] = valor
+
+        layout.setRowStretch(len(ajustes), 1)
+
+    @staticmethod
+    def __formatar(fator: float) -> str:
+        return f'{fator:.2f}'
+
+    def __alterado(self, tipo: str, passo: int) -> None:
+        fator = passo / self.PASSOS
+        self.__valores[tipo].setText(self.__formatar(fator))
+
+        # noinspection PyUnresolvedReferences
+        self.alterado.emit(tipo, fator)
+
+        # pelo teclado ou pela roda do mouse cada valor já é definitivo
+        if not self.__controles[tipo].isSliderDown():
+            self.__confirmado(tipo)
+
+    def __confirmado(self, tipo: str) -> None:
+        # noinspection PyUnresolvedReferences
+        self.confirmado.emit(tipo, self.__controles[tipo].value() / self.PASSOS)
+
+    def definir(self, tipo: str, fator: float) -> None:
+        """
+        Posiciona o controle sem emitir os sinais (ex: alteração pelo menu)
+        :param tipo: tipo do ajuste
+        :param fator: novo fator
+        :return: None
+        """
+        controle = self.__controles[tipo]
+        controle.blockSignals(True)
+        controle.setValue(round(fator * self.PASSOS))
+        controle.blockSignals(False)
+        self.__valores[tipo].setText(self.__formatar(controle.value() / self.PASSOS))
+
+    def arrastando(self) -> bool:
+        """
+        Indica se algum controle está sendo arrastado
+        :return: bool
+        """
+        return any(controle.isSliderDown() for controle in self.__controles.values())
+
+
+class GraficoHistograma(QWidget):
+    """
+    Histogramas de vermelho, verde e azul sobrepostos e a luminância em linha. A altura é a raiz da contagem,
+    para que os tons pouco frequentes continuem visíveis
+    """
+    CORES = (QColor(230, 60, 60, 110), QColor(60, 200, 80, 110), QColor(70, 120, 240, 110))
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+
+        self.__alturas = None
+        self.setMinimumSize(256, 120)
+
+    def definir(self, histogramas) -> None:
+        """
+        :param histogramas: array (4, 256) com as contagens ou None para limpar
+        :return: None
+        """
+        if histogramas is None:
+            self.__alturas = None
+        else:
+            alturas = histogramas ** 0.5
+            # os extremos (pixels cortados) aparecem na tabela, não definem a escala do gráfico
+            maximo = alturas[:, 1:255].max() or alturas.max() or 1
+            self.__alturas = (alturas / maximo).clip(0, 1)
+
+        self.update()
+
+    def paintEvent(self, paint_event: QPaintEvent) -> None:
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(0, 0, 0, 60))
+        if self.__alturas is None:
+            return
+
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        largura, altura = self.width(), self.height()
+
+        def pontos(canal: int) -> list:
+            return [QPointF(i * largura / 255, altura * (1 - valor)) for i, valor in enumerate(self.__alturas[canal])]
+
+        painter.setPen(Qt.PenStyle.NoPen)
+        for canal, cor in enumerate(self.CORES):
+            painter.setBrush(cor)
+            painter.drawPolygon(QPolygonF([QPointF(0, altura)] + pontos(canal) + [QPointF(largura, altura)]))
+
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+        painter.setPen(QPen(QColor(250, 250, 250, 200), 1.2))
+        painter.drawPolyline(QPolygonF(pontos(3)))
+
+
+class PainelHistograma(QWidget):
+    """
+    Gráfico dos histogramas e tabela com média, desvio padrão e pixels cortados de cada canal
+    """
+
+    def __init__(self, theme, parent=None) -> None:
+        super().__init__(parent)
+
+        self.setMinimumWidth(280)
+        self.setStyleSheet(
+            "QWidget {background-color: " + theme.color_primary + "; color: " + theme.color_text + ";}"
+        )
+
+        self.__grafico = GraficoHistograma(self)
+        self.__tabela = QLabel(self)
+        self.__tabela.setTextFormat(Qt.TextFormat.RichText)
+        self.__tabela.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        self.__precisao = QLabel(self)
+        self.__precisao.setStyleSheet("QLabel {color: " + theme.color_text + "; opacity: .7;}")
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.__grafico, 1)
+        layout.addWidget(self.__tabela)
+        layout.addWidget(self.__precisao)
+
+    def definir(self, estatisticas: Estatisticas | None) -> None:
+        """
+        Exibe os histogramas e as estatísticas
+        :param estatisticas: Estatisticas ou None para limpar
+        :return: None
+        """
+        if estatisticas is None:
+            self.__grafico.definir(None)
+            self.__tabela.clear()
+            self.__precisao.clear()
+            return
+
+        self.__grafico.definir(estatisticas.histogramas)
+
+        cabecalho = ('', 'Média', 'Desvio', 'Sombras %', 'Realces %')
+        linhas = ''.join(
+            '<tr>' + ''.join(
+                f'<td style="padding-right: 8px;" align="{"left" if i == 0 else "right"}">{html.escape(valor)}</td>'
+                for i, valor in enumerate(linha)
+            ) + '</tr>'
+            for linha in [cabecalho] + estatisticas.campos()
+        )
+        self.__tabela.setText(f'<table>{linhas}</table>')
+
+        pixels = f'{estatisticas.pixels:,}'.replace(',', '.')
+        self.__precisao.setText(f'Exato ({pixels} pixels)' if estatisticas.exatas else f'Prévia ({pixels} pixels)')
 
 
 class QLabelClick(QLabel):
@@ -406,6 +1014,87 @@ class QLabelClick(QLabel):
         self.clicked.emit()
 
 
+class PainelInformacoes(QLabel):
+    """
+    Painel com os metadados da imagem exibida
+    """
+
+    def __init__(self, theme, parent=None) -> None:
+        super().__init__(parent)
+
+        self.setAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignLeft)
+        self.setTextFormat(Qt.TextFormat.RichText)
+        self.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        self.setWordWrap(True)
+        self.setMinimumWidth(200)
+        self.setStyleSheet(
+            "QLabel {background-color: " + theme.color_primary + "; color: " + theme.color_text + "; padding: 8px;}"
+        )
+
+    def definir(self, campos: list) -> None:
+        """
+        Exibe os campos
+        :param campos: [(rótulo, valor), ...]
+        :return: None
+        """
+        linhas = ''.join(
+            f'<tr><td style="padding-right: 8px; opacity: .7;">{html.escape(rotulo)}</td>'
+            f'<td>{html.escape(valor)}</td></tr>'
+            for rotulo, valor in campos
+        )
+        self.setText(f'<table>{linhas}</table>')
+
+
+class SobreposicaoMemoria(QLabel):
+    """
+    Sobreposição de depuração com a memória ocupada pelas imagens, por consumidor, e a memória do processo
+    """
+    INTERVALO = 500
+
+    def __init__(self, parent: QWidget) -> None:
+        super().__init__(parent)
+
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.setTextFormat(Qt.TextFormat.PlainText)
+        self.setStyleSheet(
+            "QLabel {background-color: rgba(0, 0, 0, 170); color: #fafafa; padding: 6px; font-family: monospace;}"
+        )
+        self.move(8, 8)
+        self.hide()
+
+        self.__timer = QTimer(self)
+        self.__timer.setInterval(self.INTERVALO)
+        self.__timer.timeout.connect(self.atualizar)
+
+    def exibir(self, visivel: bool) -> None:
+        self.setVisible(visivel)
+        if visivel:
+            self.atualizar()
+            self.__timer.start()
+        else:
+            self.__timer.stop()
+
+    def atualizar(self) -> None:
+        estatisticas = GerenciadorMemoria.compartilhado().estatisticas()
+
+        linhas = [
+            f"Imagens: {estatisticas['ocupado'] / MB:.0f} de {estatisticas['limite'] / MB:.0f} MB "
+            f"(pico {estatisticas['pico'] / MB:.0f} MB, liberados {estatisticas['liberados'] / MB:.0f} MB)"
+        ]
+        linhas += [
+            f"  {nome:<20}{ocupado / MB:>8.1f} MB"
+            for nome, ocupado in sorted(estatisticas['consumidores'].items(), key=lambda item: -item[1])
+        ]
+        if estatisticas['rss'] is not None:
+            linhas.append(f"Processo (RSS): {estatisticas['rss'] / MB:.0f} MB")
+        if estatisticas['rss_pico'] is not None:
+            linhas.append(f"Pico do processo: {estatisticas['rss_pico'] / MB:.0f} MB")
+
+        self.setText('\n'.join(linhas))
+        self.adjustSize()
+        self.raise_()
+
+
 class SobreDialog(QDialog):
     def __init__(self, versao: str, theme, parent=None):
         super().__init__(parent)
@@ -0,0 +1,250 @@
+"""
+Processamento em lote, sem interface gráfica: aplica as mesmas operações do editor (filtros, cor, nitidez,
+recorte automático das bordas e rotação) a diretórios inteiros, distribuindo as imagens em um pool de processos.
+
+Uso: python -m src.lote ENTRADA [ENTRADA ...] -s SAIDA [--filtro NOME] [--cor FATOR] [--nitidez FATOR]
+     [--recortar-bordas] [--rotacionar {90,180,270}] [--processos N] [--qualidade Q]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from PIL import Image
+
+from src.core.bordas import detectar_bordas
+from src.core.edicao import FILTROS, FILTRO, COR, NITIDEZ, RECORTE, OPERACOES
+from src.core.ordenacao import chave_natural
+from src.core.orientacao import MATRIZES, TRANSPOSICOES, compor, gravar_orientacao_jpeg, orientacao_exif, orientar
+
+EXTENSOES = ('jpg', 'jpeg', 'png', 'bmp', 'tif', 'webp')
+EXTENSOES_JPEG = ('.jpg', '.jpeg', '.jpe', '.jfif')
+
+# rotação no sentido horário -> orientação EXIF equivalente
+ROTACOES = {90: 6, 180: 3, 270: 8}
+
+
+def listar_imagens(entradas: list) -> list:
+    """
+    Lista as imagens das entradas, na ordem natural dos nomes. Os diretórios não são percorridos recursivamente e
+    um arquivo informado mais de uma vez é listado apenas uma
+    :param entradas: arquivos e diretórios
+    :return: lista de caminhos
+    """
+    imagens = {}
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            with os.scandir(entrada) as arquivos:
+                nomes = [
+                    arquivo.name for arquivo in arquivos
+                    if arquivo.name.rsplit('.', 1)[-1].lower() in EXTENSOES and arquivo.is_file()
+                ]
+            for nome in sorted(nomes, key=chave_natural):
+                caminho = os.path.join(entrada, nome)
+                imagens.setdefault(os.path.abspath(caminho), caminho)
+        elif os.path.isfile(entrada):
+            imagens.setdefault(os.path.abspath(entrada), entrada)
+
+    return list(imagens.values())
+
+
+def destinos(imagens: list, saida: str) -> list:
+    """
+    Caminhos de saída das imagens. Com todas no mesmo diretório apenas o nome é mantido; com diretórios diferentes,
+    o caminho relativo ao diretório comum a eles é recriado na saída, para que arquivos de mesmo nome não se
+    sobrescrevam
+    :param imagens: arquivos de entrada
+    :param saida: diretório de saída
+    :return: lista de caminhos, na ordem das imagens
+    """
+    if not imagens:
+        return []
+
+    absolutos = [os.path.abspath(caminho) for caminho in imagens]
+    base = os.path.commonpath([os.path.dirname(caminho) for caminho in absolutos])
+    return [os.path.join(saida, os.path.relpath(caminho, base)) for caminho in absolutos]
+
+
+def __sem_perdas(caminho: str, destino: str, operacoes: tuple, rotacao: int) -> bool:
+    # apenas a rotação de um JPEG para JPEG é feita pela orientação EXIF, sem recomprimir
+    return not operacoes and rotacao in ROTACOES and \
+        os.path.splitext(caminho)[1].lower() in EXTENSOES_JPEG and \
+        os.path.splitext(destino)[1].lower() in EXTENSOES_JPEG
+
+
+def processar_imagem(caminho: str, destino: str, operacoes: tuple, rotacao: int = 0, qualidade: int = 95) -> tuple:
+    """
+    Aplica as operações a uma imagem e grava o resultado. Executada nos processos de trabalho
+    :param caminho: arquivo de entrada
+    :param destino: arquivo de saída
+    :param operacoes: ((tipo, parâmetro), ...), com os tipos da pilha de edição. O recorte usa as bordas detectadas
+    :param rotacao: 0, 90, 180 ou 270 graus no sentido horário
+    :param qualidade: qualidade dos formatos com perdas (JPEG e WEBP)
+    :return: (bytes lidos, bytes gravados, mensagem de erro ou None)
+    """
+    try:
+        lidos = os.path.getsize(caminho)
+
+        if __sem_perdas(caminho, destino, operacoes, rotacao):
+            with Image.open(caminho) as im:
+                orientacao = compor(orientacao_exif(im), MATRIZES[ROTACOES[rotacao]])
+            gravar_orientacao_jpeg(caminho, destino, orientacao)
+            return lidos, os.path.getsize(destino), None
+
+        with Image.open(caminho) as im:
+            im.load()
+            im = orientar(im, orientacao_exif(im))
+            if im.mode not in ('RGB', 'RGBA'):
+                im = im.convert('RGBA' if 'A' in im.getbands() or 'transparency' in im.info else 'RGB')
+
+        for tipo, parametro in operacoes:
+            if tipo == RECORTE:
+                esquerda, topo, direita, base = detectar_bordas(im)
+                parametro = (esquerda / im.width, topo / im.height, direita / im.width, base / im.height)
+            im = OPERACOES[tipo](im, parametro)
+
+        if rotacao in ROTACOES:
+            im = im.transpose(TRANSPOSICOES[ROTACOES[rotacao]])
+
+        if os.path.splitext(destino)[1].lower() in EXTENSOES_JPEG and im.mode != 'RGB':
+            im = im.convert('RGB')
+
+        im.save(destino, quality=qualidade)
+        return lidos, os.path.getsize(destino), None
+    except (OSError, ValueError, SyntaxError, Image.DecompressionBombError) as erro:
+        return 0, 0, str(erro)
+
+
+def processar_lote(imagens: list, saida: str, operacoes: tuple, rotacao: int = 0, qualidade: int = 95,
+                   processos: int = None, progresso=None) -> dict:
+    """
+    Processa as imagens em um pool de processos. As tarefas são enviadas aos poucos, para que a memória não
+    cresça com o tamanho do lote, e os resultados são gravados na saída assim que ficam prontos
+    :param imagens: arquivos de entrada
+    :param saida: diretório de saída
+    :param operacoes: ((tipo, parâmetro), ...)
+    :param rotacao: 0, 90, 180 ou 270 graus no sentido horário
+    :param qualidade: qualidade dos formatos com perdas
+    :param processos: quantidade de processos, todos os núcleos por padrão
+    :param progresso: função chamada a cada imagem concluída, com (concluídas, total, caminho, erro)
+    :return: estatísticas do lote
+    """
+    os.makedirs(saida, exist_ok=True)
+    processos = max(1, processos or os.cpu_count() or 1)
+
+    estatisticas = {'imagens': 0, 'erros': 0, 'bytes_lidos': 0, 'bytes_gravados': 0, 'segundos': 0.0}
+    pendentes = {}
+    restantes = zip(imagens, destinos(imagens, saida))
+    inicio = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        def enviar() -> None:
+            while len(pendentes) < processos * 2:
+                caminho, destino = next(restantes, (None, None))
+                if caminho is None:
+                    return
+
+                os.makedirs(os.path.dirname(destino), exist_ok=True)
+                futuro = executor.submit(processar_imagem, caminho, destino, operacoes, rotacao, qualidade)
+                pendentes[futuro] = caminho
+
+        enviar()
+        while pendentes:
+            concluidos, _ = wait(pendentes, return_when=FIRST_COMPLETED)
+
+            for futuro in concluidos:
+                caminho = pendentes.pop(futuro)
+                lidos, gravados, erro = futuro.result()
+
+                estatisticas['imagens' if erro is None else 'erros'] += 1
+                estatisticas['bytes_lidos'] += lidos
+                estatisticas['bytes_gravados'] += gravados
+
+                if progresso is not None:
+                    progresso(estatisticas['imagens'] + estatisticas['erros'], len(imagens), caminho, erro)
+
+            enviar()
+
+    estatisticas['segundos'] = time.perf_counter() - inicio
+    return estatisticas
+
+
+def __argumentos(argv: list) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='python -m src.lote',
+        description='Aplica filtros e correções do DoImageViewer a lotes de imagens, sem abrir a interface'
+    )
+    parser.add_argument('entradas', nargs='+', help='arquivos ou diretórios de entrada')
+    parser.add_argument('-s', '--saida', required=True, help='diretório de saída')
+    parser.add_argument('--filtro', choices=list(FILTROS), help='filtro do pilgram')
+    parser.add_argument('--cor', type=float, help='fator de correção da cor (1 mantém a original)')
+    parser.add_argument('--nitidez', type=float, help='fator de correção da nitidez (1 mantém a original)')
+    parser.add_argument('--recortar-bordas', action='store_true', help='recorta as margens de cor uniforme')
+    parser.add_argument('--rotacionar', type=int, choices=list(ROTACOES), default=0,
+                        help='rotação no sentido horário, sem perdas em JPEGs sem outras operações')
+    parser.add_argument('--processos', type=int, help='quantidade de processos (padrão: todos os núcleos)')
+    parser.add_argument('--qualidade', type=int, default=95, help='qualidade de JPEG e WEBP (padrão: 95)')
+
+    return parser.parse_args(argv)
+
+
+def main(argv: list = None) -> int:
+    """
+    :param argv: argumentos da linha de comando
+    :return: código de saída, 1 quando alguma imagem falhou
+    """
+    argumentos = __argumentos(sys.argv[1:] if argv is None else argv)
+
+    operacoes = []
+    if argumentos.recortar_bordas:
+        operacoes.append((RECORTE, None))
+    if argumentos.filtro:
+        operacoes.append((FILTRO, argumentos.filtro))
+    if argumentos.cor is not None and argumentos.cor != 1:
+        operacoes.append((COR, argumentos.cor))
+    if argumentos.nitidez is not None and argumentos.nitidez != 1:
+        operacoes.append((NITIDEZ, argumentos.nitidez))
+
+    if not operacoes and not argumentos.rotacionar:
+        print('Nenhuma operação informada', file=sys.stderr)
+        return 2
+
+    saida = os.path.abspath(argumentos.saida)
+    imagens = [
+        caminho for caminho in listar_imagens(argumentos.entradas)
+        if os.path.dirname(os.path.abspath(caminho)) != saida
+    ]
+    if not imagens:
+        print('Nenhuma imagem encontrada', file=sys.stderr)
+        return 2
+
+    interativo = sys.stderr.isatty()
+
+    def progresso(concluidas: int, total: int, caminho: str, erro: str | None) -> None:
+        if erro is not None:
+            print(f'\nErro em {caminho}: {erro}', file=sys.stderr)
+        elif interativo:
+            print(f'\r{concluidas}/{total}', end='', file=sys.stderr, flush=True)
+
+    estatisticas = processar_lote(
+        imagens, saida, tuple(operacoes), argumentos.rotacionar, argumentos.qualidade, argumentos.processos,
+        progresso
+    )
+
+    segundos = max(estatisticas['segundos'], 1e-9)
+    megabytes = estatisticas['bytes_lidos'] / 1024 / 1024
+    if interativo:
+        print(file=sys.stderr)
+
+    print(
+        f'{estatisticas["imagens"]} imagens ({estatisticas["erros"]} erros) em {segundos:.2f} s: '
+        f'{estatisticas["imagens"] / segundos:.1f} imagens/s, {megabytes / segundos:.1f} MB/s '
+        f'({megabytes:.1f} MB lidos, {estatisticas["bytes_gravados"] / 1024 / 1024:.1f} MB gravados)'
+    )
+
+    return 1 if estatisticas['erros'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+Benchmark do tempo de inicialização. Cada medição abre o programa em um processo novo e registra, a partir do
+início do processo, o fim das importações, a criação da janela, o primeiro quadro com a imagem desenhada
+(time-to-first-pixel) e a conclusão dos menus e da barra de ferramentas.
+
+Uso: python -m src.tempo_inicio IMAGEM [--repeticoes N]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+VARIAVEL_INICIO = 'DOIMAGEVIEWER_INICIO'
+ETAPAS = ('importacao', 'janela', 'primeiro_pixel', 'interface')
+
+
+def __medir(imagem: str) -> None:
+    # executado no processo filho, o tempo de referência é o do processo pai ao criá-lo
+    inicio = float(os.environ[VARIAVEL_INICIO])
+
+    from PyQt6.QtCore import QEvent, QObject, QTimer
+    from PyQt6.QtWidgets import QApplication
+
+    from src.app import DoImageViewer
+    from src.core.config import Config
+    from src.core.widgets import ImageViewer
+
+    tempos = {'importacao': time.time() - inicio}
+
+    def registrar(etapa: str) -> None:
+        tempos.setdefault(etapa, time.time() - inicio)
+        if all(nome in tempos for nome in ETAPAS):
+            print(json.dumps(tempos), flush=True)
+            app.quit()
+
+    class PrimeiroPixel(QObject):
+        def eventFilter(self, objeto: QObject, evento: QEvent) -> bool:
+            # o filtro recebe o evento antes do desenho, o registro é feito logo após ele
+            if evento.type() == QEvent.Type.Paint and isinstance(objeto, ImageViewer) and \
+                    not objeto.m_pixmap.isNull():
+                QTimer.singleShot(0, lambda: registrar('primeiro_pixel'))
+            return False
+
+    # as medições não devem alterar as configurações do usuário
+    Config.em_memoria()
+
+    app = QApplication(sys.argv[:1])
+    filtro = PrimeiroPixel()
+    app.installEventFilter(filtro)
+
+    janela = DoImageViewer(app, imagem)
+    janela.interface_pronta.connect(lambda: registrar('interface'))
+    janela.show()
+    tempos['janela'] = time.time() - inicio
+
+    QTimer.singleShot(10_000, app.quit)
+    app.exec()
+
+
+def medir_inicio(imagem: str, repeticoes: int = 5) -> dict:
+    """
+    Mede o tempo de inicialização em processos novos
+    :param imagem: imagem aberta na inicialização
+    :param repeticoes: quantidade de medições
+    :return: {etapa: [segundos, ...]}
+    """
+    resultados = {etapa: [] for etapa in ETAPAS}
+
+    for _ in range(repeticoes):
+        ambiente = dict(os.environ, **{VARIAVEL_INICIO: repr(time.time())})
+        processo = subprocess.run(
+            [sys.executable, '-m', 'src.tempo_inicio', '--filho', imagem],
+            env=ambiente, capture_output=True, text=True
+        )
+
+        linhas = [linha for linha in processo.stdout.splitlines() if linha.startswith('{')]
+        if not linhas:
+            raise RuntimeError(f'A medição falhou:\n{processo.stderr}')
+
+        for etapa, segundos in json.loads(linhas[-1]).items():
+            resultados[etapa].append(segundos)
+
+    return resultados
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m src.tempo_inicio', description=__doc__.strip().splitlines()[0])
+    parser.add_argument('imagem', help='imagem aberta na inicialização')
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--filho', action='store_true', help=argparse.SUPPRESS)
+    argumentos = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    if argumentos.filho:
+        __medir(argumentos.imagem)
+        return 0
+
+    resultados = medir_inicio(os.path.abspath(argumentos.imagem), argumentos.repeticoes)
+    for etapa in ETAPAS:
+        tempos = resultados[etapa]
+        print(
+            f'{etapa:>15}: mediana {statistics.median(tempos) * 1000:7.1f} ms, '
+            f'mínimo {min(tempos) * 1000:7.1f} ms'
+        )
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""
+Configuração comum dos testes: python -m pytest
+"""
+import ctypes
+import os
+import sys
+import time
+
+import pytest
+from PIL import Image
+
+# os testes que usam o Qt rodam sem janelas
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+
+def gerar_foto(largura: int, altura: int) -> Image.Image:
+    """
+    Fotografia sintética: gradientes suaves, ruído e áreas saturadas
+    :param largura: largura em pixels
+    :param altura: altura em pixels
+    :return: imagem RGB
+    """
+    return Image.merge('RGB', (
+        Image.linear_gradient('L').resize((largura, altura)),
+        Image.radial_gradient('L').resize((largura, altura)),
+        Image.effect_noise((largura, altura), 60)
+    ))
+
+
+@pytest.fixture(scope='session')
+def foto() -> Image.Image:
+    return gerar_foto(1600, 1200)
+
+
+@pytest.fixture
+def arquivo_foto(tmp_path, foto) -> str:
+    caminho = str(tmp_path / 'foto.png')
+    foto.save(caminho)
+    return caminho
+
+
+@pytest.fixture(scope='session')
+def app():
+    from PyQt6.QtGui import QGuiApplication
+
+    return QGuiApplication.instance() or QGuiApplication(sys.argv[:1])
+
+
+@pytest.fixture(scope='session')
+def buffers_devolvidos() -> None:
+    # na glibc as alocações grandes passam a ser sempre mapeadas e devolvidas ao sistema ao serem liberadas: o acesso
+    # aos pixels de um QImage sem dono encerra o processo em vez de ler dados antigos
+    try:
+        ctypes.CDLL(None).mallopt(-3, 1 << 16)  # M_MMAP_THRESHOLD
+    except (OSError, AttributeError):
+        pass
+
+
+@pytest.fixture
+def aguardar(app):
+    from PyQt6.QtCore import QEventLoop
+
+    def aguardar(condicao, segundos: float = 30) -> bool:
+        # processa os sinais enfileirados pelas threads de trabalho até a condição ser atendida
+        limite = time.monotonic() + segundos
+        while not condicao() and time.monotonic() < limite:
+            app.processEvents(QEventLoop.ProcessEventsFlag.AllEvents, 50)
+            time.sleep(.01)
+
+        return condicao()
+
+    return aguardar
@@ -0,0 +1,50 @@
+import pytest
+from PyQt6.QtGui import QColor, QImage
+
+from src.core.amostragem import AmostradorCor, visao_pixels
+
+FUNDO = (10, 20, 30)
+DESTAQUE = (250, 128, 3)
+
+
+@pytest.fixture(scope='module')
+def amostrador() -> AmostradorCor:
+    imagem = QImage(6000, 4000, QImage.Format.Format_RGB32)
+    imagem.fill(QColor(*FUNDO))
+    for coluna in range(0, 6000, 500):
+        imagem.setPixelColor(coluna, 100, QColor(*DESTAQUE))
+
+    return AmostradorCor(imagem)
+
+
+def test_pixel(amostrador):
+    assert amostrador.cor(500, 100) == DESTAQUE
+    assert amostrador.cor(501, 100) == FUNDO
+
+
+def test_media_area(amostrador):
+    esperada = tuple(round((destaque + 8 * fundo) / 9) for destaque, fundo in zip(DESTAQUE, FUNDO))
+    assert amostrador.cor(500, 100, 3) == esperada
+
+
+def test_fora_da_imagem(amostrador):
+    assert amostrador.cor(6000, 0) is None
+    assert amostrador.cor(0, -1) is None
+
+
+@pytest.mark.parametrize('formato', [
+    QImage.Format.Format_RGB32, QImage.Format.Format_ARGB32, QImage.Format.Format_RGB888,
+    QImage.Format.Format_RGBA8888, QImage.Format.Format_Grayscale8, QImage.Format.Format_ARGB32_Premultiplied
+])
+def test_formatos(formato):
+    # larguras ímpares: as linhas dos formatos de 3 bytes têm preenchimento no fim
+    imagem = QImage(7, 5, QImage.Format.Format_RGB32)
+    imagem.fill(QColor(*FUNDO))
+    imagem.setPixelColor(6, 4, QColor(*DESTAQUE))
+    imagem = imagem.convertToFormat(formato)
+
+    _, pixels, ordem = visao_pixels(imagem)
+    assert pixels.shape[:2] == (5, 7)
+
+    esperada = QColor(imagem.pixel(6, 4)).getRgb()[:3]
+    assert tuple(int(pixels[4, 6, canal]) for canal in ordem) == esperada
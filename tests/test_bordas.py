@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+from src.core.bordas import cor_borda, detectar_bordas
+
+
+def gerar_scan(largura: int, altura: int) -> tuple:
+    # borda branca irregular: o conteúdo é deslocado para não passar pelo centro de nenhum lado
+    fundo = Image.new('RGB', (largura, altura), (250, 250, 250))
+    ruido = Image.effect_noise((largura // 2, altura // 3), 60).convert('RGB')
+    fundo.paste(ruido, (largura // 10, altura // 8))
+    marca = Image.new('RGB', (largura // 20, altura // 20), (20, 20, 20))
+    fundo.paste(marca, (largura - largura // 6, altura // 2))
+
+    caixa = (largura // 10, altura // 8, largura - largura // 6 + largura // 20, altura // 2 + altura // 20)
+    return fundo, caixa
+
+
+@pytest.mark.parametrize('largura, altura', [(600, 400), (4200, 2800)])
+def test_detectar_bordas(largura, altura):
+    # a maior passa do limite da amostra e é estimada antes de ser refinada
+    imagem, caixa = gerar_scan(largura, altura)
+
+    assert detectar_bordas(imagem) == caixa
+    assert detectar_bordas(np.asarray(imagem)) == caixa
+
+
+@pytest.mark.parametrize('largura, altura', [(600, 400), (4200, 2800)])
+def test_conteudo_fino_nas_margens(largura, altura):
+    # fios de 1 pixel longe do conteúdo (ex: uma régua ou a linha de uma legenda) também fazem parte do recorte
+    imagem, (esquerda, topo, direita, base) = gerar_scan(largura, altura)
+    imagem.paste((0, 0, 0), (esquerda, 3, direita, 4))
+    imagem.paste((0, 0, 0), (largura - 7, topo, largura - 6, base))
+
+    esperada = (esquerda, 3, largura - 6, base)
+    assert detectar_bordas(imagem) == esperada
+    assert detectar_bordas(np.asarray(imagem)) == esperada
+
+
+def test_borda_transparente():
+    # apenas o canal alfa diferencia a borda do conteúdo
+    imagem = Image.new('RGBA', (400, 300), (0, 0, 0, 0))
+    imagem.paste((0, 0, 0, 255), (50, 40, 300, 200))
+
+    assert detectar_bordas(imagem) == (50, 40, 300, 200)
+    assert detectar_bordas(np.asarray(imagem)) == (50, 40, 300, 200)
+
+
+def test_tons_de_cinza():
+    imagem, caixa = gerar_scan(600, 400)
+
+    assert detectar_bordas(imagem.convert('L')) == caixa
+
+
+def test_sem_conteudo():
+    imagem = Image.new('RGB', (300, 200), (0, 0, 0))
+
+    assert detectar_bordas(imagem) == (0, 0, 300, 200)
+    assert detectar_bordas(Image.new('RGB', (1, 1))) == (0, 0, 1, 1)
+
+
+def test_cor_borda():
+    imagem, _ = gerar_scan(600, 400)
+    imagem.putpixel((0, 0), (0, 0, 0))
+
+    # a mediana dos cantos ignora um canto diferente
+    assert tuple(cor_borda(imagem)) == (250, 250, 250)
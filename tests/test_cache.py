@@ -0,0 +1,50 @@
+import pytest
+from PyQt6.QtCore import QSize
+
+from src.core.cache import CacheImagens, PrefetchImagens
+from src.core.imagem import carregar_qimage, carregar_qimage_reduzida
+
+
+@pytest.fixture
+def janelas(app) -> tuple:
+    cache = CacheImagens(PrefetchImagens.LIMITE_BYTES)
+    completa = PrefetchImagens(cache=cache)
+    tela = PrefetchImagens(cache=cache)
+    yield completa, tela
+    completa.encerrar()
+    tela.encerrar()
+    cache.limpar()
+
+
+def test_modo_de_outra_janela_nao_altera_o_cache(arquivo_foto, janelas):
+    completa, tela = janelas
+
+    assert completa.obter(arquivo_foto).size() == QSize(1600, 1200)
+    tela.definir_decodificador(lambda c: carregar_qimage_reduzida(c, 400, 300), 'tela:400x300')
+
+    # a janela na resolução da tela não recebe a imagem completa, nem descarta a da outra janela
+    assert not tela.pronto(arquivo_foto)
+    assert tela.obter(arquivo_foto).size() == QSize(400, 300)
+    assert completa.pronto(arquivo_foto)
+    assert completa.obter(arquivo_foto).size() == QSize(1600, 1200)
+
+
+def test_invalidar_descarta_todos_os_modos(arquivo_foto, janelas):
+    completa, tela = janelas
+    tela.definir_decodificador(lambda c: carregar_qimage_reduzida(c, 400, 300), 'tela:400x300')
+
+    completa.obter(arquivo_foto)
+    tela.obter(arquivo_foto)
+    completa.invalidar(arquivo_foto)
+
+    assert not completa.pronto(arquivo_foto)
+    assert not tela.pronto(arquivo_foto)
+
+
+def test_voltar_ao_modo_completo(arquivo_foto, janelas):
+    _, tela = janelas
+    tela.definir_decodificador(lambda c: carregar_qimage_reduzida(c, 400, 300), 'tela:400x300')
+    tela.obter(arquivo_foto)
+    tela.definir_decodificador(carregar_qimage)
+
+    assert tela.obter(arquivo_foto).size() == QSize(1600, 1200)
@@ -0,0 +1,59 @@
+import pytest
+from PIL import Image
+from PyQt6.QtCore import QSize
+
+from src.core.cache import PrefetchImagens
+from src.core.carregador import CarregadorImagens
+
+EXTENSOES = ['jpg', 'jpeg', 'png']
+
+
+@pytest.fixture
+def carregador(app) -> CarregadorImagens:
+    prefetch = PrefetchImagens()
+    carregador = CarregadorImagens(EXTENSOES, prefetch)
+    yield carregador
+    carregador.encerrar()
+    prefetch.encerrar()
+
+
+def resultados(carregador: CarregadorImagens) -> dict:
+    recebidos = {}
+    # noinspection PyUnresolvedReferences
+    carregador.carregado.connect(lambda pedido, info, imagem: recebidos.update(carregado=(pedido, info, imagem)))
+    # noinspection PyUnresolvedReferences
+    carregador.falhou.connect(lambda pedido, mensagem: recebidos.update(falhou=(pedido, mensagem)))
+    return recebidos
+
+
+def test_carregar(tmp_path, carregador, aguardar):
+    for nome in ('10.jpg', '2.jpg'):
+        Image.new('RGB', (64, 48), (200, 100, 50)).save(tmp_path / nome)
+    recebidos = resultados(carregador)
+
+    pedido = carregador.carregar(str(tmp_path / '10.jpg'), QSize(32, 24))
+    assert aguardar(lambda: recebidos)
+
+    assert recebidos['carregado'][0] == pedido
+    _, info, imagem = recebidos['carregado']
+    assert info['lista'] == ['2.jpg', '10.jpg'] and info['indice'] == 1
+    assert (imagem.width(), imagem.height()) == (64, 48)
+
+
+def test_inexistente(tmp_path, carregador, aguardar):
+    recebidos = resultados(carregador)
+
+    pedido = carregador.carregar(str(tmp_path / 'inexistente.jpg'), QSize(32, 24))
+    assert aguardar(lambda: recebidos)
+    assert recebidos['falhou'][0] == pedido
+
+
+def test_erro_do_pil_emite_falhou(tmp_path, carregador, aguardar, monkeypatch):
+    # exceções do PIL fora de OSError (aqui DecompressionBombError, na prévia) também encerram o carregamento
+    Image.new('RGB', (640, 480), (200, 100, 50)).save(tmp_path / 'grande.jpg')
+    monkeypatch.setattr(Image, 'MAX_IMAGE_PIXELS', 1000)
+    recebidos = resultados(carregador)
+
+    pedido = carregador.carregar(str(tmp_path / 'grande.jpg'), QSize(32, 24))
+    assert aguardar(lambda: recebidos, 5)
+    assert recebidos['falhou'][0] == pedido
@@ -0,0 +1,75 @@
+import os
+
+import pytest
+
+from src.core.diretorio import IndiceDiretorio, ObservadorDiretorio
+
+EXTENSOES = ['jpg', 'png']
+
+
+def criar(diretorio, nome: str, conteudo: bytes = b'x') -> None:
+    (diretorio / nome).write_bytes(conteudo)
+
+
+@pytest.fixture
+def diretorio(tmp_path):
+    for nome in ('1.jpg', '2.jpg', '10.jpg', 'leia.txt'):
+        criar(tmp_path, nome)
+    return tmp_path
+
+
+def test_lista_ordenada(diretorio):
+    indice = IndiceDiretorio(f'{diretorio}/', EXTENSOES)
+    assert indice.lista() == ['1.jpg', '2.jpg', '10.jpg']
+    assert indice.indice('10.jpg') == 2
+
+
+def test_varredura_sem_stat_dos_conhecidos(diretorio):
+    indice = IndiceDiretorio(f'{diretorio}/', EXTENSOES)
+    criar(diretorio, '3.jpg')
+
+    _, encontrados = indice.escanear_alteracoes()
+    assert encontrados['1.jpg'] is None
+    assert encontrados['3.jpg'] is not None
+
+
+def test_atualizar(diretorio):
+    indice = IndiceDiretorio(f'{diretorio}/', EXTENSOES)
+    criar(diretorio, '3.jpg')
+    os.remove(diretorio / '2.jpg')
+
+    # substituído por os.replace: mesmo nome, outro inode
+    criar(diretorio, 'novo.tmp', b'outro conteudo')
+    os.replace(diretorio / 'novo.tmp', diretorio / '10.jpg')
+
+    adicionados, removidos, alterados = indice.atualizar()
+    assert (adicionados, removidos, alterados) == (['3.jpg'], ['2.jpg'], ['10.jpg'])
+    assert indice.lista() == ['1.jpg', '3.jpg', '10.jpg']
+    assert indice.stat('10.jpg').st_size == len(b'outro conteudo')
+
+
+def test_regravado_no_lugar(diretorio):
+    indice = IndiceDiretorio(f'{diretorio}/', EXTENSOES)
+    with open(diretorio / '1.jpg', 'ab') as arquivo:
+        arquivo.write(b'mais')
+
+    assert indice.revalidar('1.jpg')
+    assert indice.stat('1.jpg').st_size == 5
+
+
+def test_observador(diretorio, app, aguardar):
+    caminho = f'{diretorio}/'
+    indice = IndiceDiretorio.obter(caminho, EXTENSOES)
+    observador = ObservadorDiretorio()
+    alterados = []
+    # noinspection PyUnresolvedReferences
+    observador.alterado.connect(alterados.append)
+    observador.observar(caminho)
+
+    try:
+        criar(diretorio, '5.jpg')
+        assert aguardar(lambda: alterados)
+        assert alterados == [caminho]
+        assert indice.lista() == ['1.jpg', '2.jpg', '5.jpg', '10.jpg']
+    finally:
+        observador.encerrar()
@@ -0,0 +1,63 @@
+import pilgram
+import pytest
+from PIL import Image, ImageChops
+
+from src.core.edicao import FILTROS, aplicar_filtro
+from src.core.filtros import FILTROS_LUT, TAMANHO_LUT, aplicar_lut, grade_cores
+
+# diferença por canal, em níveis de 0 a 255, entre a tabela de cor e o pilgram
+TOLERANCIA_P99 = 3
+TOLERANCIA_MAXIMA = 8
+
+
+def erros(esperada: Image.Image, obtida: Image.Image) -> tuple:
+    """
+    :return: (percentil 99, máximo) da diferença entre as imagens, no pior canal
+    """
+    histograma = ImageChops.difference(esperada.convert('RGB'), obtida.convert('RGB')).histogram()
+    p99 = maximo = 0
+
+    for canal in range(3):
+        contagens = histograma[canal * 256:(canal + 1) * 256]
+        total = sum(contagens)
+        acumulado = 0
+        for valor, quantidade in enumerate(contagens):
+            acumulado += quantidade
+            if acumulado >= total * 0.99:
+                p99 = max(p99, valor)
+                break
+        maximo = max(maximo, max(valor for valor, quantidade in enumerate(contagens) if quantidade))
+
+    return p99, maximo
+
+
+@pytest.mark.parametrize('nome', FILTROS)
+def test_igual_ao_pilgram(foto, nome):
+    p99, maximo = erros(getattr(pilgram, nome)(foto), aplicar_filtro(foto, nome))
+
+    assert p99 <= TOLERANCIA_P99
+    assert maximo <= TOLERANCIA_MAXIMA
+
+
+@pytest.mark.parametrize('nome', FILTROS_LUT)
+def test_tons_de_cinza_e_transparencia(foto, nome):
+    # a tabela só é aplicada em RGB, os demais modos são convertidos como no pilgram
+    for modo in ('L', 'RGBA'):
+        convertida = foto.resize((400, 300)).convert(modo)
+        obtida = aplicar_lut(convertida, nome)
+
+        assert obtida.mode == 'RGB'
+        assert erros(getattr(pilgram, nome)(convertida.convert('RGB')), obtida)[1] <= TOLERANCIA_MAXIMA
+
+
+def test_grade_cores():
+    grade = grade_cores()
+
+    assert grade.size == (TAMANHO_LUT, TAMANHO_LUT ** 2)
+    assert grade.getpixel((1, 0)) == (8, 0, 0)
+    assert grade.getpixel((0, TAMANHO_LUT ** 2 - 1)) == (0, 255, 255)
+
+
+def test_filtro_desconhecido(foto):
+    with pytest.raises(KeyError):
+        aplicar_filtro(foto, 'inexistente')
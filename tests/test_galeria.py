@@ -0,0 +1,56 @@
+import gc
+import time
+
+from src.core.edicao import FILTROS, aplicar_filtro
+from src.core.galeria import NOMES_PREVIAS, TAMANHO_PREVIA, GeradorPrevias, carregar_proxy
+from src.core.imagem import pil_para_qimage
+
+
+def test_carregar_proxy(arquivo_foto):
+    proxy = carregar_proxy(arquivo_foto, TAMANHO_PREVIA)
+
+    assert proxy.mode == 'RGB'
+    assert max(proxy.size) == TAMANHO_PREVIA
+
+
+def test_previas(arquivo_foto, aguardar, buffers_devolvidos):
+    gerador = GeradorPrevias()
+    recebidas = {}
+
+    # noinspection PyUnresolvedReferences
+    gerador.pronta.connect(lambda caminho, indice, previa: recebidas.__setitem__(indice, previa))
+
+    try:
+        assert gerador.gerar(arquivo_foto) == {}
+        assert aguardar(lambda: len(recebidas) == len(NOMES_PREVIAS))
+    finally:
+        gerador.encerrar()
+
+    # as prévias guardadas continuam iguais às calculadas depois que as threads de trabalho terminam
+    time.sleep(.3)
+    gc.collect()
+
+    reduzida = carregar_proxy(arquivo_foto, TAMANHO_PREVIA)
+    diferentes = []
+    for indice, previa in recebidas.items():
+        esperada = pil_para_qimage(reduzida if indice == 0 else aplicar_filtro(reduzida, FILTROS[indice - 1]))
+        if previa.convertToFormat(esperada.format()) != esperada:
+            diferentes.append(NOMES_PREVIAS[indice])
+
+    assert not diferentes
+
+
+def test_previas_em_cache(arquivo_foto, aguardar):
+    gerador = GeradorPrevias()
+    recebidas = {}
+
+    # noinspection PyUnresolvedReferences
+    gerador.pronta.connect(lambda caminho, indice, previa: recebidas.__setitem__(indice, previa))
+
+    try:
+        gerador.gerar(arquivo_foto)
+        assert aguardar(lambda: len(recebidas) == len(NOMES_PREVIAS))
+        assert sorted(gerador.gerar(arquivo_foto)) == list(range(len(NOMES_PREVIAS)))
+        assert gerador.memoria_ocupada() > 0
+    finally:
+        gerador.encerrar()
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+from PyQt6.QtGui import QImage
+
+from src.core.histograma import CANAIS, Estatisticas, estatisticas_qimage, histogramas, histogramas_pil
+from src.core.imagem import pil_para_qimage
+
+
+def test_igual_ao_pillow(foto):
+    esperado = histogramas_pil(foto)
+    obtido = histogramas(np.asarray(foto), (0, 1, 2))
+
+    assert obtido.shape == (len(CANAIS), 256)
+    assert (obtido == esperado).all()
+
+
+def test_ordem_dos_bytes(foto):
+    # QImage RGB32: os bytes ficam em BGRA nas máquinas little-endian
+    imagem = pil_para_qimage(foto).convertToFormat(QImage.Format.Format_RGB32)
+    estatisticas = estatisticas_qimage(imagem, limite=foto.width * foto.height)
+
+    assert estatisticas.exatas
+    assert (estatisticas.histogramas == histogramas_pil(foto)).all()
+
+
+def test_cancelado(foto):
+    assert histogramas(np.asarray(foto), (0, 1, 2), cancelado=lambda: True) is None
+
+
+def test_estimativa(foto):
+    exato = Estatisticas(histogramas_pil(foto), True)
+    estimativa = estatisticas_qimage(pil_para_qimage(foto))
+
+    assert not estimativa.exatas
+    assert estimativa.pixels < exato.pixels
+    assert estimativa.media == pytest.approx(exato.media, abs=1)
+    assert estimativa.desvio == pytest.approx(exato.desvio, abs=1)
+
+
+def test_exata_na_resolucao_total(foto):
+    pequena = foto.resize((400, 300))
+    estatisticas = estatisticas_qimage(pil_para_qimage(pequena))
+
+    assert estatisticas.exatas
+    assert (estatisticas.histogramas == histogramas_pil(pequena)).all()
+    assert not estatisticas_qimage(pil_para_qimage(pequena), completa=False).exatas
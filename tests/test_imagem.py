@@ -0,0 +1,18 @@
+import gc
+
+from PIL import Image
+from PyQt6.QtGui import QImage
+
+from src.core.imagem import pil_para_qimage
+
+
+def test_pil_para_qimage_dono_dos_pixels(buffers_devolvidos):
+    # a cópia implícita sobrevive ao QImage original, como ao atravessar um sinal entre threads
+    convertida = pil_para_qimage(Image.new('RGB', (2000, 1500), (10, 200, 30)))
+    compartilhada = QImage(convertida)
+    del convertida
+    gc.collect()
+    lixo = [Image.new('RGB', (2000, 1500), (99, 99, 99)).tobytes() for _ in range(5)]
+
+    assert compartilhada.pixelColor(1000, 700).getRgb()[:3] == (10, 200, 30)
+    assert len(lixo) == 5
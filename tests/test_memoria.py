@@ -0,0 +1,88 @@
+from collections import OrderedDict
+
+import pytest
+
+from src.core.memoria import (
+    GerenciadorMemoria, MB, PRIORIDADE_ATUAL, PRIORIDADE_ESCALAS, PRIORIDADE_PREFETCH, bytes_pil
+)
+
+
+class Cache:
+    def __init__(self, nome: str, prioridade: int, gerenciador: GerenciadorMemoria) -> None:
+        self.itens = OrderedDict()
+        self.ocupado = 0
+        self.gerenciador = gerenciador
+        gerenciador.registrar(self, nome, prioridade)
+
+    def adicionar(self, chave: str, tamanho: int) -> bool:
+        if not self.gerenciador.reservar(self, tamanho):
+            return False
+
+        self.itens[chave] = tamanho
+        self.ocupado += tamanho
+        return True
+
+    def memoria_ocupada(self) -> int:
+        return self.ocupado
+
+    def liberar_memoria(self, necessario: int) -> int:
+        liberado = 0
+        while self.itens and liberado < necessario:
+            liberado += self.itens.popitem(last=False)[1]
+        self.ocupado -= liberado
+        return liberado
+
+
+@pytest.fixture
+def caches() -> tuple:
+    gerenciador = GerenciadorMemoria(1000 * MB)
+    atual = Cache('imagem atual', PRIORIDADE_ATUAL, gerenciador)
+    prefetch = Cache('prefetch', PRIORIDADE_PREFETCH, gerenciador)
+    escalas = Cache('escalas', PRIORIDADE_ESCALAS, gerenciador)
+
+    for i in range(6):
+        assert prefetch.adicionar(f'vizinha {i}', 150 * MB)
+    assert escalas.adicionar('50%', 100 * MB)
+
+    return gerenciador, atual, prefetch, escalas
+
+
+def test_libera_menor_prioridade_primeiro(caches):
+    gerenciador, atual, prefetch, escalas = caches
+
+    # um scan gigante exibido: as escalas saem primeiro, depois as vizinhas mais antigas
+    assert atual.adicionar('scan', 700 * MB)
+
+    assert escalas.ocupado == 0
+    assert list(prefetch.itens) == ['vizinha 4', 'vizinha 5']
+    estatisticas = gerenciador.estatisticas()
+    assert estatisticas['ocupado'] == 1000 * MB
+    assert estatisticas['liberados'] == 700 * MB
+    assert estatisticas['consumidores'] == {'imagem atual': 700 * MB, 'prefetch': 300 * MB, 'escalas': 0}
+
+
+def test_nao_libera_prioridade_maior(caches):
+    gerenciador, _, prefetch, escalas = caches
+
+    # as escalas abrem espaço descartando apenas as próprias escalas antigas, nunca as vizinhas
+    assert escalas.adicionar('25%', 50 * MB)
+    assert list(escalas.itens) == ['25%']
+
+    # sem espaço suficiente o item simplesmente não é guardado
+    assert not escalas.adicionar('100%', 300 * MB)
+    assert prefetch.ocupado == 900 * MB
+    assert gerenciador.estatisticas()['pico'] == 1000 * MB
+
+
+def test_referencia_fraca():
+    gerenciador = GerenciadorMemoria(100 * MB)
+    Cache('temporário', PRIORIDADE_PREFETCH, gerenciador).adicionar('a', 10 * MB)
+
+    assert gerenciador.ocupado() == 0
+
+
+def test_bytes_pil():
+    from PIL import Image
+
+    assert bytes_pil(None) == 0
+    assert bytes_pil(Image.new('RGBA', (10, 20))) == 800
@@ -0,0 +1,61 @@
+import os
+
+from PIL import Image
+
+from src.core.metadados import CacheMetadados, DATA_FOTO, MODELO, ler_metadados
+from src.core.orientacao import TAG_ORIENTACAO
+
+
+def gravar_jpeg(caminho: str, tamanho: tuple, orientacao: int = 1) -> None:
+    exif = Image.Exif()
+    exif[MODELO] = 'Teste'
+    exif[TAG_ORIENTACAO] = orientacao
+    exif.get_ifd(0x8769)[DATA_FOTO] = '2020:01:02 03:04:05'
+    Image.new('RGB', tamanho, (200, 100, 50)).save(caminho, exif=exif)
+
+
+def test_ler_metadados(tmp_path):
+    caminho = str(tmp_path / 'foto.jpg')
+    gravar_jpeg(caminho, (300, 200))
+
+    metadados = ler_metadados(caminho, os.stat(caminho))
+    campos = dict(metadados.campos())
+
+    assert (metadados.largura, metadados.altura) == (300, 200)
+    assert metadados.formato == 'JPEG'
+    assert metadados.tamanho == os.path.getsize(caminho)
+    assert campos['Câmera'] == 'Teste'
+    assert campos['Data da foto'] == '2020:01:02 03:04:05'
+    assert 'Orientação' not in campos
+
+
+def test_orientacao_troca_eixos(tmp_path):
+    caminho = str(tmp_path / 'rotacionada.jpg')
+    gravar_jpeg(caminho, (300, 200), 6)
+
+    metadados = ler_metadados(caminho, os.stat(caminho))
+    assert (metadados.largura, metadados.altura, metadados.orientacao) == (200, 300, 6)
+
+
+def test_cache(tmp_path):
+    caminho = str(tmp_path / 'foto.jpg')
+    gravar_jpeg(caminho, (300, 200))
+    cache = CacheMetadados()
+
+    try:
+        primeira = cache.obter(caminho)
+        assert cache.obter(caminho) is primeira
+
+        # renomeado: mesmo inode, continua no cache
+        renomeado = str(tmp_path / 'renomeada.jpg')
+        os.rename(caminho, renomeado)
+        assert cache.obter(renomeado) is primeira
+
+        # alterado: lido novamente
+        gravar_jpeg(renomeado, (40, 30))
+        os.utime(renomeado, ns=(0, os.stat(renomeado).st_mtime_ns + 10 ** 9))
+        assert (cache.obter(renomeado).largura, cache.obter(renomeado).altura) == (40, 30)
+
+        assert cache.obter(str(tmp_path / 'inexistente.jpg')) is None
+    finally:
+        cache.encerrar()
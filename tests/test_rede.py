@@ -0,0 +1,99 @@
+import hashlib
+import io
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from PIL import Image
+from PyQt6.QtCore import QSize
+
+from src.core.imagem import tamanho_original
+from src.core.rede import CacheUrls, baixar, decodificar_parcial, formato_imagem
+
+
+@pytest.fixture(scope='module')
+def conteudo() -> bytes:
+    saida = io.BytesIO()
+    Image.effect_noise((3000, 2000), 40).convert('RGB').save(saida, 'JPEG', quality=90, progressive=True)
+    return saida.getvalue()
+
+
+@pytest.fixture(scope='module')
+def servidor(conteudo) -> tuple:
+    etag = f'"{hashlib.sha1(conteudo).hexdigest()}"'
+    respostas = {200: 0, 304: 0}
+
+    class Servidor(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.headers.get('If-None-Match') == etag:
+                respostas[304] += 1
+                self.send_response(304)
+                self.end_headers()
+                return
+
+            respostas[200] += 1
+            self.send_response(200)
+            self.send_header('Content-Type', 'image/jpeg')
+            self.send_header('Content-Length', str(len(conteudo)))
+            self.send_header('ETag', etag)
+            self.end_headers()
+
+            # a rota /lenta envia aos poucos, para testar o cancelamento
+            passo = 32 * 1024 if self.path == '/lenta' else len(conteudo)
+            try:
+                for inicio in range(0, len(conteudo), passo):
+                    self.wfile.write(conteudo[inicio:inicio + passo])
+                    if passo < len(conteudo):
+                        time.sleep(.01)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def log_message(self, *_) -> None:
+            pass
+
+    http = ThreadingHTTPServer(('127.0.0.1', 0), Servidor)
+    threading.Thread(target=http.serve_forever, daemon=True).start()
+
+    yield f'http://127.0.0.1:{http.server_address[1]}', respostas
+
+    http.shutdown()
+
+
+def test_revalidacao_pelo_etag(servidor, conteudo):
+    endereco, respostas = servidor
+    cache = CacheUrls()
+
+    assert baixar(f'{endereco}/foto.jpg', cache) == conteudo
+    assert respostas == {200: 1, 304: 0}
+
+    # a segunda vez o servidor responde 304 e o conteúdo vem do cache
+    assert baixar(f'{endereco}/foto.jpg', cache) == conteudo
+    assert respostas == {200: 1, 304: 1}
+    assert len(cache) == 1
+
+
+def test_cancelamento(servidor):
+    endereco, _ = servidor
+    blocos = []
+
+    resultado = baixar(
+        f'{endereco}/lenta', CacheUrls(), lambda: len(blocos) >= 3, lambda dados, total: blocos.append(len(dados))
+    )
+
+    assert resultado is None
+    assert len(blocos) == 3
+
+
+def test_decodificar_parcial(app, conteudo):
+    parcial = decodificar_parcial(conteudo[:len(conteudo) // 3], 1000, 1000)
+
+    assert parcial is not None
+    assert parcial.width() == 1000 and parcial.height() < 1000
+    assert tamanho_original(parcial) == QSize(3000, 2000)
+    assert decodificar_parcial(b'nada', 1000, 1000) is None
+
+
+def test_formato_imagem(app, conteudo):
+    assert formato_imagem(conteudo) == 'jpg'
+    assert formato_imagem(b'<html></html>') is None
@@ -0,0 +1,53 @@
+import gc
+import time
+
+from PIL import Image, ImageChops
+from PyQt6.QtGui import QPixmap
+
+from src.core.edicao import COR, FILTRO, FonteEdicao, aplicar_operacoes
+from src.core.renderizacao import RenderizadorEdicao
+
+OPERACOES = [(FILTRO, 'clarendon'), (COR, 1.5)]
+
+
+def test_gravar_apos_editar(tmp_path, arquivo_foto, aguardar, buffers_devolvidos):
+    # a imagem emitida pela thread de trabalho é convertida e gravada como em DoImageViewer.__gravar_exibida
+    fonte = FonteEdicao()
+    renderizador = RenderizadorEdicao(fonte)
+    resultado = {}
+
+    # noinspection PyUnresolvedReferences
+    renderizador.concluida.connect(lambda pedido, imagem: resultado.update(imagem=imagem))
+    # noinspection PyUnresolvedReferences
+    renderizador.falhou.connect(lambda pedido, mensagem: resultado.update(erro=mensagem))
+
+    try:
+        renderizador.renderizar(arquivo_foto, OPERACOES)
+        assert aguardar(lambda: resultado), 'renderização não concluída'
+        assert 'erro' not in resultado, resultado['erro']
+
+        # a thread de trabalho já terminou: os bytes criados nela só existem se o QImage for dono dos pixels
+        time.sleep(.3)
+        gc.collect()
+        QPixmap.fromImage(resultado['imagem']).toImage().save(str(tmp_path / 'gravada.png'))
+    finally:
+        renderizador.encerrar()
+
+    with Image.open(tmp_path / 'gravada.png') as gravada:
+        esperada = aplicar_operacoes(fonte.obter(arquivo_foto), OPERACOES).convert('RGB')
+        assert ImageChops.difference(gravada.convert('RGB'), esperada).getbbox() is None
+
+
+def test_falha(tmp_path, aguardar):
+    renderizador = RenderizadorEdicao(FonteEdicao())
+    falhas = []
+
+    # noinspection PyUnresolvedReferences
+    renderizador.falhou.connect(lambda pedido, mensagem: falhas.append(pedido))
+
+    try:
+        pedido = renderizador.renderizar(str(tmp_path / 'inexistente.png'), OPERACOES)
+        assert aguardar(lambda: falhas)
+        assert falhas == [pedido]
+    finally:
+        renderizador.encerrar()
@@ -0,0 +1,64 @@
+import pytest
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QImage, QPainter
+
+from src.core.memoria import GerenciadorMemoria, MB
+from src.core.tiles import PiramideTiles
+
+
+@pytest.fixture
+def imagem(app) -> QImage:
+    imagem = QImage(4096, 4096, QImage.Format.Format_RGB32)
+    imagem.fill(Qt.GlobalColor.darkCyan)
+    return imagem
+
+
+@pytest.fixture
+def gerenciador(monkeypatch) -> GerenciadorMemoria:
+    gerenciador = GerenciadorMemoria(1024 * MB)
+    monkeypatch.setattr(GerenciadorMemoria, 'compartilhado', classmethod(lambda cls: gerenciador))
+    return gerenciador
+
+
+def desenhar(piramide: PiramideTiles, escala: float) -> QImage:
+    destino = QImage(512, 512, QImage.Format.Format_RGB32)
+    destino.fill(Qt.GlobalColor.black)
+    painter = QPainter(destino)
+    painter.scale(escala, escala)
+    piramide.desenhar(painter, destino.rect())
+    painter.end()
+    return destino
+
+
+def niveis_prontos(piramide: PiramideTiles, aguardar, quantidade: int) -> bool:
+    prontos = []
+    # noinspection PyUnresolvedReferences
+    piramide.nivel_pronto.connect(lambda: prontos.append(1))
+    return aguardar(lambda: len(prontos) == quantidade)
+
+
+def test_niveis_liberados(imagem, gerenciador, aguardar):
+    piramide = PiramideTiles(imagem)
+    # 2048, 1024 e 512
+    assert niveis_prontos(piramide, aguardar, 3)
+    assert gerenciador.estatisticas()['consumidores']['pirâmide de tiles'] == (16 + 4 + 1) * MB
+
+    # o tile de 512 x 512 do nível menor
+    desenhar(piramide, 0.125)
+    assert piramide.memoria_ocupada() == (16 + 4 + 1 + 1) * MB
+    assert piramide.liberar_memoria(1024 * MB) == (16 + 4 + 1 + 1) * MB
+    assert piramide.memoria_ocupada() == 0
+
+    # sem os níveis o desenho usa o nível 0
+    assert desenhar(piramide, 0.125).pixelColor(10, 10) == imagem.pixelColor(0, 0)
+    piramide.cancelar()
+
+
+def test_reserva_recusada(imagem, gerenciador, aguardar):
+    gerenciador.limite = 18 * MB
+    piramide = PiramideTiles(imagem)
+
+    # apenas o nível de 2048 cabe no limite
+    assert aguardar(lambda: piramide.memoria_ocupada() == 16 * MB)
+    assert desenhar(piramide, 0.125).pixelColor(10, 10) == imagem.pixelColor(0, 0)
+    piramide.cancelar()